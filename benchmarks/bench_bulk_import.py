@@ -0,0 +1,66 @@
+"""Dictionary import throughput: per-row writes vs write-behind vs bulk
+
+Usage:
+    python benchmarks/bench_bulk_import.py [--entries N] [--chunk N]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from lingualearn.knowledge_base import KnowledgeBase, TranslationEntry
+
+
+def make_entries(count: int, offset: int = 0):
+    return [
+        TranslationEntry(
+            source_text=f"word{i}",
+            target_text=f"igama{i}",
+            source_lang="en",
+            target_lang="xho",
+            confidence_score=0.5
+        )
+        for i in range(offset, offset + count)
+    ]
+
+
+async def import_per_row(db_path: str, entries) -> None:
+    with KnowledgeBase(db_path) as kb:
+        for entry in entries:
+            await kb.add_translation(entry)
+
+
+async def import_write_behind(db_path: str, entries) -> None:
+    async with KnowledgeBase(db_path, write_behind_ms=5) as kb:
+        await asyncio.gather(*(kb.add_translation(entry) for entry in entries))
+
+
+async def import_bulk(db_path: str, entries, chunk: int) -> None:
+    with KnowledgeBase(db_path) as kb:
+        for i in range(0, len(entries), chunk):
+            await kb.add_translations_bulk(entries[i:i + chunk])
+
+
+async def timed(label: str, count: int, coro) -> None:
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} {count:>8} rows in {elapsed:7.2f}s  ({count / elapsed:10.0f} rows/s)")
+
+
+async def main(entries: int, chunk: int) -> None:
+    # Per-row commits are far too slow for the full set, so time a sample
+    sample = min(entries, 5000)
+    with tempfile.TemporaryDirectory() as tmp:
+        await timed("per row", sample, import_per_row(os.path.join(tmp, "a.db"), make_entries(sample)))
+        await timed("write-behind", sample, import_write_behind(os.path.join(tmp, "b.db"), make_entries(sample)))
+        await timed("bulk", entries, import_bulk(os.path.join(tmp, "c.db"), make_entries(entries), chunk))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500000)
+    parser.add_argument("--chunk", type=int, default=50000)
+    args = parser.parse_args()
+    asyncio.run(main(args.entries, args.chunk))
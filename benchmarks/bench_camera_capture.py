@@ -0,0 +1,106 @@
+"""Camera capture: read() on the event loop vs the capture thread and frame ring
+
+A stand-in camera blocks in read() until its next frame is due and then
+spends --decode-ms decoding it (as OpenCV does, with the GIL released),
+filling 1280x720 frames. While capture runs, a ticker measures
+event-loop lag; the report also gives frames delivered and how many
+frame buffers read() had to allocate.
+
+"on-loop" reproduces the old CameraInterface._capture_frames.
+
+Usage:
+    python benchmarks/bench_camera_capture.py [--fps F] [--decode-ms MS] [--seconds S]
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from lingualearn import camera_interface
+from lingualearn.camera_interface import CameraConfig, CameraInterface
+
+
+class StandInCamera:
+    def __init__(self, fps: float, decode_ms: float, shape=(720, 1280, 3)):
+        self.interval = 1 / fps
+        self.decode = decode_ms / 1000
+        self.shape = shape
+        self.frames = 0
+        self.allocations = 0
+        self._next = time.perf_counter()
+
+    def set(self, prop, value):
+        return True
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        # Block until the sensor's next frame is due
+        self._next = max(self._next + self.interval, time.perf_counter())
+        time.sleep(max(0.0, self._next - time.perf_counter()) + self.decode)
+        if image is None:
+            self.allocations += 1
+            image = np.empty(self.shape, dtype=np.uint8)
+        image[::64, ::64] = self.frames % 256
+        self.frames += 1
+        return True, image
+
+    def release(self):
+        pass
+
+
+async def on_loop_capture(camera, fps: float, deadline: float, delivered: list) -> None:
+    """The old _capture_frames: blocking read, then sleep, on the loop"""
+    while time.perf_counter() < deadline:
+        ret, frame = camera.read()
+        if ret:
+            delivered.append(frame)
+            delivered.pop()
+        await asyncio.sleep(1 / fps)
+
+
+async def ticker(deadline: float, lags: list) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def run(mode: str, fps: float, decode_ms: float, seconds: float) -> None:
+    camera = StandInCamera(fps, decode_ms)
+    camera_interface.cv2.VideoCapture = lambda index: camera
+    lags = []
+    deadline = time.perf_counter() + seconds
+
+    if mode == "on-loop":
+        delivered = []
+        await asyncio.gather(on_loop_capture(camera, fps, deadline, delivered), ticker(deadline, lags))
+        frames = camera.frames
+    else:
+        interface = CameraInterface(object_learner=None, config=CameraConfig(fps=int(fps)))
+        await interface.start()
+        first = interface.ring.sequence
+        await ticker(deadline, lags)
+        frames = interface.ring.sequence - first
+        await interface.stop()
+
+    lag_ms = np.array(lags) * 1000
+    print(f"{mode:12s} {frames / seconds:5.1f} fps delivered   loop lag p50 {np.percentile(lag_ms, 50):5.1f}"
+          f"  p99 {np.percentile(lag_ms, 99):5.1f}  max {lag_ms.max():5.1f} ms   {camera.allocations} frame allocations")
+
+
+def main(fps: float, decode_ms: float, seconds: float) -> None:
+    print(f"{fps:.0f} fps camera, 1280x720, {decode_ms:.0f} ms decode, {seconds:.0f}s each")
+    for mode in ["on-loop", "ring thread"]:
+        asyncio.run(run(mode, fps, decode_ms, seconds))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--decode-ms", type=float, default=8)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+    main(args.fps, args.decode_ms, args.seconds)
@@ -0,0 +1,136 @@
+"""Continuous identification: a capture_object loop vs CameraInterface.run_pipeline
+
+A stand-in 1280x720 camera delivers frames at --fps (decoding off the GIL
+as OpenCV does), and a real ObjectLearner runs with a stand-in YOLO that
+takes --detect-ms per frame (also GIL-free, like cv2.dnn) and reports a
+few boxes, so hashing and term lookup are the real code. The loop mode
+waits for a fresh frame and identifies it, as capture_object does, back
+to back; the pipeline mode runs capture, preprocess, detect and lookup
+concurrently, optionally capped at --target-fps.
+
+Reported: identified frames per second, and latency from a frame's
+capture to its result.
+
+Usage:
+    python benchmarks/bench_camera_pipeline.py [--fps F] [--detect-ms MS]
+        [--target-fps F] [--seconds S]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from lingualearn import camera_interface
+from lingualearn.camera_interface import CameraConfig, CameraInterface
+from lingualearn.model_registry import models
+from lingualearn.object_learning import ObjectLearner
+from lingualearn.pipeline import PipelineConfig
+
+
+class StandInCamera:
+    def __init__(self, fps: float, shape=(720, 1280, 3)):
+        self.interval = 1 / fps
+        self.shape = shape
+        self.frames = 0
+        rng = np.random.default_rng(0)
+        self.scene = rng.integers(0, 255, shape, dtype=np.uint8)
+        self._next = time.perf_counter()
+
+    def set(self, prop, value):
+        return True
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        self._next = max(self._next + self.interval, time.perf_counter())
+        time.sleep(max(0.0, self._next - time.perf_counter()))
+        if image is None:
+            image = np.empty(self.shape, dtype=np.uint8)
+        image[...] = self.scene
+        self.frames += 1
+        return True, image
+
+    def release(self):
+        pass
+
+
+class StandInYolo:
+    def __init__(self, detect_ms: float):
+        self.seconds = detect_ms / 1000
+
+    def detect(self, frame):
+        time.sleep(self.seconds)
+        height, width = frame.shape[:2]
+        boxes = np.array([[width // 8, height // 8, width // 4, height // 4],
+                          [width // 2, height // 3, width // 3, height // 2]])
+        return np.array([1, 2]), np.array([0.9, 0.8], dtype=np.float32), boxes
+
+
+async def loop_mode(interface: CameraInterface, seconds: float, latencies: list) -> int:
+    frames = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        with await interface.next_frame() as frame:
+            # What capture_object does, with the capture timestamp kept
+            await interface.learner.identify_objects(frame.image, "xho")
+            latencies.append(time.monotonic() - frame.timestamp)
+        frames += 1
+    return frames
+
+
+async def run(mode: str, fps: float, detect_ms: float, target_fps: float, seconds: float, db_path: str) -> None:
+    camera = StandInCamera(fps)
+    camera_interface.cv2.VideoCapture = lambda index: camera
+    learner = ObjectLearner(db_path)
+    models.get(learner.detector_key, lambda: StandInYolo(detect_ms))
+    interface = CameraInterface(learner, CameraConfig(fps=int(fps)))
+    await interface.start()
+
+    latencies = []
+    if mode == "loop":
+        frames = await loop_mode(interface, seconds, latencies)
+        stages = None
+    else:
+        asyncio.get_running_loop().call_later(seconds, interface.stop_pipeline)
+        config = PipelineConfig(target_fps=target_fps or None)
+        stages = await interface.run_pipeline(
+            "xho", lambda result: latencies.append(result["latency_ms"] / 1000), config
+        )
+        frames = len(latencies)
+    await interface.stop()
+    models.release(learner.detector_key)
+    learner.close()
+
+    latency_ms = np.array(latencies) * 1000
+    print(f"{mode:9s} {frames / seconds:5.1f} identified/s   latency p50 {np.percentile(latency_ms, 50):6.1f}"
+          f"  p95 {np.percentile(latency_ms, 95):6.1f} ms")
+    if stages:
+        for name, stats in stages.items():
+            print(f"    {name:10s} {stats['fps']:5.1f}/s  p50 {stats['latency_p50_ms']:6.1f} ms"
+                  f"  p95 {stats['latency_p95_ms']:6.1f} ms  dropped {stats['dropped']}")
+
+
+def main(fps: float, detect_ms: float, target_fps: float, seconds: float) -> None:
+    print(f"{fps:.0f} fps camera, 1280x720, {detect_ms:.0f} ms detector, {seconds:.0f}s each")
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "object_terms.db")
+        asyncio.run(run("loop", fps, detect_ms, target_fps, seconds, db_path))
+        asyncio.run(run("pipeline", fps, detect_ms, target_fps, seconds, db_path))
+        if target_fps:
+            return
+        print("pipeline capped at 5 fps:")
+        asyncio.run(run("pipeline", fps, detect_ms, 5, seconds, db_path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--detect-ms", type=float, default=40)
+    parser.add_argument("--target-fps", type=float, default=0, help="0: as fast as detection keeps up")
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+    main(args.fps, args.detect_ms, args.target_fps, args.seconds)
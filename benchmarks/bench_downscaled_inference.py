@@ -0,0 +1,74 @@
+"""Downscaled SAM inference: per-frame cost after the encoder, full vs reduced resolution
+
+SAM's image encoder always sees a 1024-pixel-long input, so its cost does
+not depend on the frame size. Everything after it does: upsampling each
+mask's logits to the frame (SamPredictor.postprocess_masks), boxes and
+areas, and mask encoding. The stand-in mask generator below performs that
+upsampling with the real interpolation calls on --masks random low-res
+logit maps; ObjectDetector.detect_objects does the rest as in production.
+
+Usage:
+    python benchmarks/bench_downscaled_inference.py [--size WxH] [--masks N] [--inference-size S [S ...]]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+from object_detection import ObjectDetector  # noqa: E402
+
+
+class StandInMaskGenerator:
+    def __init__(self, masks: int):
+        generator = torch.Generator().manual_seed(0)
+        # Smooth blobs, like SAM's 256x256 low-res logits
+        self.logits = F.interpolate(torch.randn(masks, 1, 16, 16, generator=generator) * 4,
+                                    size=(256, 256), mode="bilinear", align_corners=False)
+
+    def generate(self, image):
+        height, width = image.shape[:2]
+        long_side = 1024
+        scale = long_side / max(height, width)
+        input_h, input_w = round(height * scale), round(width * scale)
+        masks = F.interpolate(self.logits, (long_side, long_side), mode="bilinear", align_corners=False)
+        masks = masks[..., :input_h, :input_w]
+        masks = F.interpolate(masks, (height, width), mode="bilinear", align_corners=False)[:, 0] > 0
+        return [{"segmentation": mask, "predicted_iou": 0.9} for mask in masks.numpy()]
+
+
+def main(width: int, height: int, masks: int, sizes, repeats: int = 5) -> None:
+    detector = ObjectDetector.__new__(ObjectDetector)
+    detector.mask_generator = StandInMaskGenerator(masks)
+    detector.mask_encoding = "rle"
+    detector.crop_masks = True
+    detector.upsample_masks = False
+    frame = np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+    print(f"{width}x{height} frame, {masks} masks, rle cropped")
+    for size in sizes:
+        detector.inference_size = size
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = detector.process_frame_sync(frame)
+            times.append(time.perf_counter() - start)
+        payload = len(json.dumps(result))
+        label = "full" if not size else str(size)
+        print(f"  inference {label:>5s}  mask {result['mask_size'][1]}x{result['mask_size'][0]}"
+              f"  {np.median(times) * 1000:7.1f} ms  {payload / 1024:7.1f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--masks", type=int, default=32)
+    parser.add_argument("--inference-size", type=int, nargs="+", default=[0, 1024, 640, 480])
+    args = parser.parse_args()
+    width, height = map(int, args.size.split("x"))
+    main(width, height, args.masks, args.inference_size)
@@ -0,0 +1,79 @@
+"""Detection-server frame ingest: base64 data-URL JSON + PIL vs binary frames
+
+Measures message size and server-side decode time (message -> RGB array)
+for a camera-like 1280x720 frame.
+
+Usage:
+    python benchmarks/bench_frame_protocol.py [--size WxH] [--repeat N]
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+from frame_protocol import FORMAT_JPEG, FORMAT_PNG, FORMAT_RGB, FrameHeader, decode_frame, encode_frame  # noqa: E402
+
+
+def make_frame(width: int, height: int) -> np.ndarray:
+    # Smooth gradients plus sensor noise, roughly like a webcam frame
+    ys, xs = np.mgrid[:height, :width]
+    base = np.stack([xs * 255 / width, ys * 255 / height, (xs + ys) * 127 / (width + height)], axis=-1)
+    noise = np.random.default_rng(0).normal(0, 6, base.shape)
+    return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+
+def legacy_decode(text: str) -> np.ndarray:
+    """receive_json + ObjectDetector.process_image + np.array"""
+    image_data = json.loads(text)["image"]
+    if "base64," in image_data:
+        image_data = image_data.split("base64,")[1]
+    image = Image.open(io.BytesIO(base64.b64decode(image_data))).convert("RGB")
+    return np.array(image)
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(width: int, height: int, repeat: int) -> None:
+    frame = make_frame(width, height)
+    bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+    jpeg = cv2.imencode(".jpg", bgr, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+    png = cv2.imencode(".png", bgr)[1].tobytes()
+
+    messages = [
+        ("JSON data URL (jpeg)", json.dumps({
+            "type": "detect",
+            "image": "data:image/jpeg;base64," + base64.b64encode(jpeg).decode()
+        }), legacy_decode),
+        ("binary jpeg", encode_frame(FrameHeader(FORMAT_JPEG), jpeg), decode_frame),
+        ("binary png", encode_frame(FrameHeader(FORMAT_PNG), png), decode_frame),
+        ("binary raw rgb", encode_frame(FrameHeader(FORMAT_RGB, width=width, height=height), frame.tobytes()),
+         decode_frame),
+    ]
+
+    print(f"{width}x{height} frame")
+    print(f"{'mode':<22} {'KB':>9} {'decode ms':>10}")
+    for label, message, decode in messages:
+        elapsed = timed(lambda: decode(message), repeat)
+        print(f"{label:<22} {len(message) / 1024:9.1f} {elapsed * 1000:10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+    main(width, height, args.repeat)
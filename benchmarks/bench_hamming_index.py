@@ -0,0 +1,93 @@
+"""Object-term hash lookups: legacy SQL scan vs linear Hamming scan vs HammingIndex
+
+Usage:
+    python benchmarks/bench_hamming_index.py [--terms N] [--queries N]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from lingualearn.hamming_index import HammingIndex, hamming_distance
+
+RADIUS = 10
+
+
+def make_hashes(count: int, rng: random.Random):
+    # Photos of the same object give nearby hashes, so grow clusters around seeds
+    hashes = []
+    while len(hashes) < count:
+        seed = rng.getrandbits(64)
+        for _ in range(rng.randint(1, 8)):
+            value = seed
+            for bit in rng.sample(range(64), rng.randrange(6)):
+                value ^= 1 << bit
+            hashes.append(value)
+    return hashes[:count]
+
+
+def legacy_sql_lookup(conn: sqlite3.Connection, bits: str):
+    """The pre-index ObjectLearner._find_terms query"""
+    return conn.execute("""
+        SELECT * FROM object_terms
+        WHERE language = ? AND
+              (image_hash = ? OR
+               ABS(CAST(image_hash AS INTEGER) - CAST(? AS INTEGER)) < 10)
+        ORDER BY confidence DESC
+    """, ("xho", bits, bits)).fetchall()
+
+
+def timed(label: str, queries, fn) -> None:
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    elapsed = (time.perf_counter() - start) / len(queries)
+    print(f"{label:<22} {elapsed * 1000:9.3f} ms/query")
+
+
+def main(terms: int, queries: int) -> None:
+    rng = random.Random(0)
+    hashes = make_hashes(terms, rng)
+    probes = []
+    for _ in range(queries):
+        value = rng.choice(hashes)
+        for bit in rng.sample(range(64), rng.randrange(4)):
+            value ^= 1 << bit
+        probes.append(value)
+
+    start = time.perf_counter()
+    index = HammingIndex()
+    for i, value in enumerate(hashes):
+        index.add(i, value)
+    print(f"indexed {terms} hashes in {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "object_terms.db"))
+        conn.execute("""
+            CREATE TABLE object_terms (
+                id INTEGER PRIMARY KEY, object_name TEXT, local_term TEXT,
+                language TEXT, image_hash TEXT, confidence REAL
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO object_terms VALUES (?, 'cup', ?, 'xho', ?, 0.5)",
+            [(i, f"term{i}", format(value, "064b")) for i, value in enumerate(hashes)]
+        )
+        conn.commit()
+        timed("legacy SQL scan", probes[:20], lambda q: legacy_sql_lookup(conn, format(q, "064b")))
+        conn.close()
+
+    timed("linear Hamming scan", probes[:20], lambda q: [
+        i for i, value in enumerate(hashes) if hamming_distance(q, value) <= RADIUS
+    ])
+    timed("HammingIndex", probes, lambda q: index.query(q, RADIUS))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    main(args.terms, args.queries)
@@ -0,0 +1,97 @@
+"""Batch ingestion throughput: frames/s and objects/s by number of decode workers
+
+Generates a synthetic field recording (a 1280x720 MJPG video whose scene
+changes every few seconds) and a directory of photos, then ingests both
+with python -m lingualearn.ingest's code path for each --workers value,
+into a fresh database each time. The detector is a stand-in for YOLO
+that spends --detect-ms of CPU per frame and reports the saturated
+objects in it, so dedupe, crops and bulk writes are the real code.
+
+Usage:
+    python benchmarks/bench_ingest.py [--seconds S] [--photos N] [--detect-ms MS]
+        [--workers 0 1 2 ...] [--sample-fps F]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from lingualearn.ingest import ingest
+from lingualearn.model_registry import models
+from lingualearn.object_learning import ObjectLearner
+
+
+class StandInYolo:
+    def __init__(self, detect_ms: float):
+        self.seconds = detect_ms / 1000
+
+    def detect(self, frame):
+        end = time.perf_counter() + self.seconds
+        small = cv2.resize(frame, (416, 416))
+        while time.perf_counter() < end:
+            small = cv2.GaussianBlur(small, (9, 9), 0)
+        saturation = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)[:, :, 1]
+        count, _, stats, _ = cv2.connectedComponentsWithStats((saturation > 100).astype(np.uint8))
+        boxes = [stats[i, :4] for i in range(1, count) if stats[i, cv2.CC_STAT_AREA] > 400]
+        if not boxes:
+            return np.zeros(0), np.zeros(0, dtype=np.float32), np.zeros((0, 4))
+        return np.ones(len(boxes)), np.full(len(boxes), 0.9, dtype=np.float32), np.array(boxes)
+
+
+def field_scene(rng, size=(720, 1280)):
+    image = np.clip(110 + rng.normal(0, 6, (*size, 3)), 0, 255).astype(np.uint8)
+    for _ in range(3):
+        s = int(rng.integers(60, 200))
+        y, x = int(rng.integers(0, size[0] - s)), int(rng.integers(0, size[1] - s))
+        colour = np.eye(3)[rng.integers(0, 3)] * 180 + 40
+        texture = np.kron(rng.random((8, 8)), np.ones((s // 8 + 1, s // 8 + 1)))[:s, :s, None]
+        image[y:y + s, x:x + s] = (colour * (0.6 + 0.4 * texture)).astype(np.uint8)
+    return image
+
+
+def make_inputs(directory: str, seconds: float, photos: int) -> list:
+    rng = np.random.default_rng(0)
+    video = os.path.join(directory, "recording.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 30, (1280, 720))
+    for i in range(int(seconds * 30)):
+        if i % 90 == 0:  # a new scene every 3 seconds
+            scene = field_scene(rng)
+        writer.write(scene)
+    writer.release()
+
+    photo_dir = os.path.join(directory, "photos")
+    os.makedirs(photo_dir)
+    for i in range(photos):
+        cv2.imwrite(os.path.join(photo_dir, f"photo{i:04d}.jpg"), field_scene(rng))
+    return [video, photo_dir]
+
+
+def main(seconds: float, photos: int, detect_ms: float, workers: list, sample_fps: float) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        sources = make_inputs(directory, seconds, photos)
+        print(f"{seconds:.0f}s 1280x720 video sampled at {sample_fps:g} fps + {photos} photos, "
+              f"{detect_ms:.0f} ms detector, {os.cpu_count()} CPUs")
+        for count in workers:
+            db_path = os.path.join(directory, f"terms-{count}.db")
+            learner = ObjectLearner(db_path)
+            models.get(learner.detector_key, lambda: StandInYolo(detect_ms))
+            stats = asyncio.run(ingest(learner, sources, "xho", workers=count, sample_fps=sample_fps))
+            models.release(learner.detector_key)
+            learner.close()
+            print(f"\nworkers={count}")
+            print(stats.report())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--photos", type=int, default=100)
+    parser.add_argument("--detect-ms", type=float, default=30)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--sample-fps", type=float, default=2)
+    args = parser.parse_args()
+    main(args.seconds, args.photos, args.detect_ms, args.workers, args.sample_fps)
@@ -0,0 +1,67 @@
+"""Translation lookup throughput: connect-per-call vs pooled KnowledgeBase
+
+Usage:
+    python benchmarks/bench_knowledge_base.py [--rows N] [--lookups N]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+from lingualearn.knowledge_base import KnowledgeBase, TranslationEntry
+
+
+def lookup_connect_per_call(db_path: str, source_text: str, source_lang: str, target_lang: str):
+    """Lookup as KnowledgeBase.get_translation did before connections were pooled"""
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.execute("""
+            SELECT * FROM translations
+            WHERE source_text = ?
+            AND source_lang = ?
+            AND target_lang = ?
+            ORDER BY confidence_score DESC
+            LIMIT 1
+        """, (source_text, source_lang, target_lang))
+        return cursor.fetchone()
+
+
+async def populate(kb: KnowledgeBase, rows: int) -> None:
+    for i in range(rows):
+        await kb.add_translation(TranslationEntry(
+            source_text=f"word{i}",
+            target_text=f"igama{i}",
+            source_lang="en",
+            target_lang="xho",
+            confidence_score=0.5
+        ))
+
+
+async def main(rows: int, lookups: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "translations.db")
+        with KnowledgeBase(db_path) as kb:
+            await populate(kb, rows)
+
+            start = time.perf_counter()
+            for i in range(lookups):
+                lookup_connect_per_call(db_path, f"word{i % rows}", "en", "xho")
+            before = lookups / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for i in range(lookups):
+                await kb.get_translation(f"word{i % rows}", "en", "xho")
+            after = lookups / (time.perf_counter() - start)
+
+    print(f"rows={rows} lookups={lookups}")
+    print(f"connect per call: {before:10.0f} lookups/s")
+    print(f"pooled:           {after:10.0f} lookups/s  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.lookups))
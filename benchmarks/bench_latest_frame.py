@@ -0,0 +1,87 @@
+"""End-to-end lag of a camera-rate stream: queued frames vs latest-frame-only
+
+Starts backend/server.py in-process with the stand-in detector from
+bench_server_load.py and streams frames at --fps from one client, as the
+camera view does. For each result it reports the lag from the frame's
+capture (send) to its result arriving, plus how many frames were rejected
+(queued mode, pool busy) or replaced (latest-only mode).
+
+Usage:
+    python benchmarks/bench_latest_frame.py [--fps F] [--seconds S] [--inference-ms MS]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+
+import uvicorn
+import websockets
+
+from bench_server_load import StandInDetector, free_port, load_server, percentiles
+
+
+async def stream(url: str, fps: float, seconds: float, latest_only: bool) -> None:
+    sent, lag, server_ms = {}, [], []
+    counts = {"busy": 0, "dropped": 0}
+
+    async with websockets.connect(url) as ws:
+        await ws.recv()  # connection confirmation
+        await ws.send(json.dumps({"type": "hello", "latest_only": latest_only}))
+
+        async def send_frames():
+            for sequence in range(1, int(fps * seconds) + 1):
+                sent[sequence] = time.perf_counter()
+                await ws.send(json.dumps({"type": "detect", "image": "frame", "sequence": sequence}))
+                await asyncio.sleep(1 / fps)
+
+        async def receive_results():
+            while True:
+                message = json.loads(await ws.recv())
+                if message.get("type") == "dropped":
+                    counts["dropped"] += 1
+                elif message.get("busy"):
+                    counts["busy"] += 1
+                elif "success" in message:
+                    lag.append(time.perf_counter() - sent[message["sequence"]])
+                    server_ms.append(message["timings"]["total_ms"] / 1000)
+
+        receiver = asyncio.create_task(receive_results())
+        await send_frames()
+        await asyncio.sleep(0.5)
+        receiver.cancel()
+
+    print(f"  lag     {percentiles(lag)}  (results={len(lag)}, busy={counts['busy']}, dropped={counts['dropped']})")
+    print(f"  server  {percentiles(server_ms)}")
+
+
+def main(fps: float, seconds: float, inference_ms: float) -> None:
+    StandInDetector.inference_ms = inference_ms
+    server = load_server()
+    server.logger.setLevel(logging.WARNING)
+
+    port = free_port()
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=uvicorn_server.run, daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+
+    url = f"ws://127.0.0.1:{port}/ws"
+    print(f"{fps:.0f} fps stream, {inference_ms:.0f} ms inference, {seconds:.0f}s each")
+    for label, latest_only in [("queued", False), ("latest-only", True)]:
+        print(label)
+        asyncio.run(stream(url, fps, seconds, latest_only))
+
+    uvicorn_server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--inference-ms", type=float, default=100)
+    args = parser.parse_args()
+    main(args.fps, args.seconds, args.inference_ms)
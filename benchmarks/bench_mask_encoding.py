@@ -0,0 +1,71 @@
+"""Detection-response mask formats: nested lists vs RLE vs bit-packed (full and cropped)
+
+Measures JSON payload size and encode (+ json.dumps) / decode time for
+typical SAM masks at 1280x720.
+
+Usage:
+    python benchmarks/bench_mask_encoding.py [--masks N] [--size WxH]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+from mask_encoding import decode_mask, encode_mask  # noqa: E402
+
+
+def make_masks(count: int, width: int, height: int) -> list:
+    rng = np.random.default_rng(0)
+    ys, xs = np.mgrid[:height, :width]
+    masks = []
+    for _ in range(count):
+        cx, cy = rng.uniform(0, width), rng.uniform(0, height)
+        rx, ry = rng.uniform(20, width / 4), rng.uniform(20, height / 4)
+        # Slightly ragged outline, like a real segmentation
+        radius = ((xs - cx) / rx) ** 2 + ((ys - cy) / ry) ** 2
+        masks.append(radius <= 1 + 0.05 * rng.standard_normal((height, width)))
+    return masks
+
+
+def bbox(mask: np.ndarray):
+    ys, xs = np.where(mask)
+    return [int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max())]
+
+
+def main(count: int, width: int, height: int) -> None:
+    masks = make_masks(count, width, height)
+    boxes = [bbox(mask) for mask in masks]
+    print(f"{count} masks at {width}x{height}")
+    print(f"{'format':<16} {'KB/mask':>10} {'encode ms':>10} {'decode ms':>10}")
+
+    for name, crop in [("list", False), ("rle", False), ("rle", True), ("bitpack", False), ("bitpack", True)]:
+        start = time.perf_counter()
+        payloads = [
+            json.dumps(encode_mask(mask, name, box if crop else None))
+            for mask, box in zip(masks, boxes)
+        ]
+        encode = (time.perf_counter() - start) / count
+
+        decode = float("nan")
+        if name != "list":
+            start = time.perf_counter()
+            for payload in payloads:
+                decode_mask(json.loads(payload), (height, width))
+            decode = (time.perf_counter() - start) / count
+
+        size = sum(len(p) for p in payloads) / count / 1024
+        label = name + (" cropped" if crop else "")
+        print(f"{label:<16} {size:10.1f} {encode * 1000:10.2f} {decode * 1000:10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--masks", type=int, default=10)
+    parser.add_argument("--size", default="1280x720")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+    main(args.masks, width, height)
@@ -0,0 +1,74 @@
+"""Detection-box hashing: per-crop hashes vs batched pHash
+
+Usage:
+    python benchmarks/bench_phash.py [--frames N] [--boxes N]
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from lingualearn.phash import frames_box_phashes
+
+
+def legacy_hash(image: np.ndarray) -> str:
+    """ObjectLearner._compute_image_hash before batching (8x8 DCT, string output)"""
+    img = cv2.resize(image, (8, 8))
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    dct = cv2.dct(np.float32(gray))
+    dct_low = dct[:8, :8]
+    diff = dct_low > dct_low.mean()
+    return ''.join(['1' if b else '0' for b in diff.flatten()])
+
+
+def per_crop_phash(image: np.ndarray) -> int:
+    """The 32x32 pHash definition, one crop and one cv2.dct at a time"""
+    gray = cv2.cvtColor(cv2.resize(image, (32, 32)), cv2.COLOR_BGR2GRAY)
+    low = cv2.dct(np.float32(gray))[:8, :8]
+    bits = (low > np.median(low)).flatten()
+    return int(''.join(['1' if b else '0' for b in bits]), 2)
+
+
+def main(frames: int, boxes: int) -> None:
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(frames)]
+    sizes = rng.integers(40, 400, (frames, boxes, 2))
+    origins = rng.integers(0, 700, (frames, boxes, 2))
+    all_boxes = [np.concatenate([origins[i], sizes[i]], axis=1) for i in range(frames)]
+    total = frames * boxes
+
+    start = time.perf_counter()
+    for frame, frame_boxes in zip(images, all_boxes):
+        for x, y, w, h in frame_boxes:
+            legacy_hash(frame[y:y + h, x:x + w])
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for frame, frame_boxes in zip(images, all_boxes):
+        for x, y, w, h in frame_boxes:
+            per_crop_phash(frame[y:y + h, x:x + w])
+    per_crop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for frame, frame_boxes in zip(images, all_boxes):
+        frames_box_phashes([frame], [frame_boxes])
+    per_frame = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frames_box_phashes(images, all_boxes)
+    batched = time.perf_counter() - start
+
+    print(f"{total} boxes over {frames} frames of 1280x720")
+    print(f"legacy 8x8 hash:    {legacy / total * 1e6:8.1f} us/box  (not a pHash)")
+    print(f"pHash per crop:     {per_crop / total * 1e6:8.1f} us/box")
+    print(f"batched per frame:  {per_frame / total * 1e6:8.1f} us/box")
+    print(f"batched all frames: {batched / total * 1e6:8.1f} us/box")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--boxes", type=int, default=20)
+    args = parser.parse_args()
+    main(args.frames, args.boxes)
@@ -0,0 +1,123 @@
+"""SAM backbones for deployment: encoder/decoder latency and mask IoU against vit_h
+
+Runs every variant (vit_h, vit_l, vit_b, each optionally with the int8
+dynamic-quantized encoder) over the same images and click prompts, and
+compares each prompt's mask with the reference variant's (the first one,
+vit_h by default). Variants whose checkpoint is missing from
+--checkpoint-dir are skipped; --random-weights builds them untrained,
+which still gives honest latency but meaningless IoU except between a
+model and its own quantized version.
+
+Usage:
+    python benchmarks/bench_sam_backbones.py [--checkpoint-dir DIR] [--images DIR]
+        [--variants vit_h vit_b vit_b-int8 ...] [--points N] [--random-weights]
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+import numpy as np
+import torch
+
+from lingualearn.sam_integration import SAM_CHECKPOINTS, SAMObjectDetector
+
+
+def load_images(directory: Optional[str]) -> List[np.ndarray]:
+    if directory is None:
+        # A synthetic scene: a few flat shapes on a gradient
+        image = np.tile(np.linspace(40, 200, 640, dtype=np.uint8)[None, :, None], (480, 1, 3))
+        cv2.rectangle(image, (60, 80), (220, 260), (200, 40, 40), -1)
+        cv2.circle(image, (420, 200), 90, (40, 160, 60), -1)
+        cv2.rectangle(image, (300, 340), (600, 440), (30, 30, 180), -1)
+        return [image]
+    images = []
+    for path in sorted(Path(directory).iterdir()):
+        image = cv2.imread(str(path))
+        if image is not None:
+            images.append(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    return images
+
+
+def grid_points(image: np.ndarray, count: int) -> List[tuple]:
+    side = int(np.ceil(np.sqrt(count)))
+    height, width = image.shape[:2]
+    xs = np.linspace(0, width, side + 2)[1:-1]
+    ys = np.linspace(0, height, side + 2)[1:-1]
+    return [(int(x), int(y)) for y in ys for x in xs][:count]
+
+
+def build(variant: str, checkpoint_dir: str, random_weights: bool) -> Optional[SAMObjectDetector]:
+    model_type, _, suffix = variant.partition("-")
+    checkpoint = os.path.join(checkpoint_dir, SAM_CHECKPOINTS[model_type])
+    if not os.path.exists(checkpoint) and not random_weights:
+        print(f"{variant:12s} skipped: {checkpoint} not found")
+        return None
+    detector = SAMObjectDetector(model_type=model_type, cache_bytes=0,
+                                 checkpoint=checkpoint, quantize=suffix == "int8")
+    if not os.path.exists(checkpoint):
+        detector.checkpoint = None  # untrained weights
+    return detector
+
+
+def iou(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> float:
+    if a is None or b is None:
+        return float(a is None and b is None)
+    union = np.logical_or(a, b).sum()
+    return float(np.logical_and(a, b).sum() / union) if union else 1.0
+
+
+def main(checkpoint_dir: str, images_dir: Optional[str], variants: List[str],
+         points: int, random_weights: bool) -> None:
+    images = load_images(images_dir)
+    prompts = [grid_points(image, points) for image in images]
+    print(f"{len(images)} image(s), {points} point prompts each, {torch.get_num_threads()} threads")
+    print(f"{'variant':12s} {'encoder':>10s} {'decode':>10s} {'weights':>10s} {'IoU vs ' + variants[0]:>14s}")
+
+    reference: Optional[List[List[Optional[np.ndarray]]]] = None
+    for variant in variants:
+        detector = build(variant, checkpoint_dir, random_weights)
+        if detector is None:
+            continue
+        torch.manual_seed(0)  # untrained variants of one backbone get the same weights
+        weights_mb = sum(
+            t.numel() * t.element_size()
+            for t in list(detector.sam.parameters()) + list(detector.sam.buffers())
+        ) / 2 ** 20
+        # Dynamic-quantized linear weights are packed, not parameters
+        packed = [m for m in detector.sam.modules() if isinstance(m, torch.ao.nn.quantized.dynamic.Linear)]
+        weights_mb += sum(m.weight().numel() for m in packed) / 2 ** 20
+
+        encode_ms, decode_ms, masks = [], [], []
+        for image, image_points in zip(images, prompts):
+            start = time.perf_counter()
+            detector.set_image(image)
+            encode_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            objects = detector.detect_objects_at_points(image_points)
+            decode_ms.append((time.perf_counter() - start) * 1000)
+            masks.append([obj.mask if obj is not None else None for obj in objects])
+
+        if reference is None:
+            reference = masks
+            agreement = "reference"
+        else:
+            scores = [iou(a, b) for ref, got in zip(reference, masks) for a, b in zip(ref, got)]
+            agreement = f"{np.mean(scores):.3f}"
+        print(f"{variant:12s} {np.mean(encode_ms):8.0f}ms {np.mean(decode_ms):8.0f}ms "
+              f"{weights_mb:8.0f}MB {agreement:>14s}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checkpoint-dir", default="models")
+    parser.add_argument("--images", default=None, help="directory of images (default: a synthetic scene)")
+    parser.add_argument("--variants", nargs="+",
+                        default=["vit_h", "vit_h-int8", "vit_l", "vit_l-int8", "vit_b", "vit_b-int8"])
+    parser.add_argument("--points", type=int, default=16)
+    parser.add_argument("--random-weights", action="store_true")
+    args = parser.parse_args()
+    main(args.checkpoint_dir, args.images, args.variants, args.points, args.random_weights)
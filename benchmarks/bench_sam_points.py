@@ -0,0 +1,73 @@
+"""Multi-point SAM prompting: one predict() per point vs detect_objects_at_points
+
+The image encoder is shrunk to one block with random weights (set_image
+would otherwise dominate); the prompt encoder and mask decoder are the
+real SAM architecture, so decoder timings match a loaded checkpoint.
+
+Usage:
+    python benchmarks/bench_sam_points.py [--points N [N ...]] [--size WxH]
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+from segment_anything.build_sam import _build_sam
+
+from lingualearn import sam_integration
+
+
+def build_detector() -> sam_integration.SAMObjectDetector:
+    def small_encoder_sam(checkpoint=None):
+        return _build_sam(
+            encoder_embed_dim=16,
+            encoder_depth=1,
+            encoder_num_heads=1,
+            encoder_global_attn_indexes=[0],
+        )
+    sam_integration.segment_anything.sam_model_registry["vit_h"] = small_encoder_sam
+    return sam_integration.SAMObjectDetector()
+
+
+def sequential(detector, points):
+    """The pre-batching detect_object_at_point, once per point"""
+    results = []
+    for x, y in points:
+        masks, scores, _ = detector.predictor.predict(
+            point_coords=np.array([[x, y]]),
+            point_labels=np.array([1]),
+            multimask_output=True
+        )
+        best = int(np.argmax(scores))
+        results.extend(detector._segmented_objects(masks[best:best + 1], scores[best:best + 1]))
+    return results
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(point_counts, width: int, height: int) -> None:
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    detector = build_detector()
+    detector.set_image(rng.integers(0, 255, (height, width, 3), dtype=np.uint8))
+    print(f"{width}x{height} image, {torch.get_num_threads()} threads")
+
+    for count in point_counts:
+        points = [(int(x), int(y)) for x, y in zip(rng.integers(0, width, count), rng.integers(0, height, count))]
+        loop = timed(lambda: sequential(detector, points))
+        batched = timed(lambda: detector.detect_objects_at_points(points))
+        print(f"{count:4d} points  sequential {loop * 1000:8.0f} ms  "
+              f"batched {batched * 1000:8.0f} ms  ({loop / batched:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--size", default="1280x720")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+    main(args.points, width, height)
@@ -0,0 +1,148 @@
+"""Scene-change gate: detections and CPU for run_pipeline with the gate off and on
+
+A stand-in 1280x720 camera at --fps shows a static scene with sensor
+noise ("idle"), or the same scene with an object that jumps to a new
+place every --move-every seconds ("activity"). The stand-in detector
+burns --detect-ms of real CPU per frame (repeated blurs of a 416x416
+input), so process CPU time reflects the work the gate saves.
+
+Reported per scenario and gate setting: detections run per second,
+results delivered per second, process CPU use (100% = one core) and,
+for "activity", how long after each move the first result reflecting
+it arrived.
+
+Usage:
+    python benchmarks/bench_scene_gate.py [--fps F] [--detect-ms MS]
+        [--seconds S] [--move-every S] [--threshold T]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from lingualearn import camera_interface
+from lingualearn.camera_interface import CameraConfig, CameraInterface
+from lingualearn.model_registry import models
+from lingualearn.object_learning import ObjectLearner
+from lingualearn.pipeline import PipelineConfig
+
+
+class StandInCamera:
+    def __init__(self, fps: float, move_every: float, shape=(720, 1280, 3)):
+        self.interval = 1 / fps
+        self.move_every = move_every
+        rng = np.random.default_rng(0)
+        base = cv2.resize(rng.integers(0, 200, (18, 32, 3), dtype=np.uint8), shape[1::-1],
+                          interpolation=cv2.INTER_LINEAR)
+        # A few noisy versions of the scene, cycled (sigma ~4 grey levels)
+        self.noisy = [
+            np.clip(base + rng.normal(0, 4, shape), 0, 255).astype(np.uint8) for _ in range(4)
+        ]
+        self.frames = 0
+        self.moves = []  # (time, object x) per move
+        self.started = time.monotonic()
+        self._next = time.perf_counter()
+
+    def set(self, prop, value):
+        return True
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        self._next = max(self._next + self.interval, time.perf_counter())
+        time.sleep(max(0.0, self._next - time.perf_counter()))
+        if image is None:
+            image = np.empty(self.noisy[0].shape, dtype=np.uint8)
+        image[...] = self.noisy[self.frames % len(self.noisy)]
+        if self.move_every:
+            step = int((time.monotonic() - self.started) / self.move_every)
+            x = 100 + (step * 310) % 1000
+            if not self.moves or self.moves[-1][1] != x:
+                self.moves.append((time.monotonic(), x))
+            image[300:460, x:x + 160] = (30, 220, 240)
+        self.frames += 1
+        return True, image
+
+    def release(self):
+        pass
+
+
+class StandInYolo:
+    """Burns detect_ms of CPU and reports the bright object's box, if any"""
+
+    def __init__(self, detect_ms: float):
+        self.seconds = detect_ms / 1000
+
+    def detect(self, frame):
+        end = time.perf_counter() + self.seconds
+        small = cv2.resize(frame, (416, 416))
+        while time.perf_counter() < end:
+            small = cv2.GaussianBlur(small, (9, 9), 0)
+        mask = frame[:, :, 2] > 235
+        if not mask.any():
+            return np.zeros(0), np.zeros(0, dtype=np.float32), np.zeros((0, 4))
+        ys, xs = np.nonzero(mask)
+        box = [xs.min(), ys.min(), xs.max() - xs.min(), ys.max() - ys.min()]
+        return np.array([1]), np.array([0.9], dtype=np.float32), np.array([box])
+
+
+async def run(scenario: str, threshold, fps: float, detect_ms: float, seconds: float,
+              move_every: float, db_path: str) -> None:
+    camera = StandInCamera(fps, move_every if scenario == "activity" else 0)
+    camera_interface.cv2.VideoCapture = lambda index: camera
+    learner = ObjectLearner(db_path)
+    models.get(learner.detector_key, lambda: StandInYolo(detect_ms))
+    interface = CameraInterface(learner, CameraConfig(fps=int(fps)))
+    await interface.start()
+
+    results = []
+    asyncio.get_running_loop().call_later(seconds, interface.stop_pipeline)
+    cpu = time.process_time()
+    stats = await interface.run_pipeline(
+        "xho", lambda result: results.append((time.monotonic(), result)),
+        PipelineConfig(scene_threshold=threshold)
+    )
+    cpu = time.process_time() - cpu
+    await interface.stop()
+    models.release(learner.detector_key)
+    learner.close()
+
+    # Time from each move to the first result with the object in its new place
+    reaction = []
+    for moved_at, x in camera.moves[1:]:
+        for arrived, result in results:
+            if arrived >= moved_at and result["objects"] and abs(result["objects"][0]["bbox"][0] - x) <= 8:
+                reaction.append(arrived - moved_at)
+                break
+
+    gate = "off" if threshold is None else f"on ({threshold:g})"
+    line = (f"{scenario:9s} gate {gate:10s} {stats['detect']['frames'] / seconds:5.1f} detections/s"
+            f"  {len(results) / seconds:5.1f} results/s  CPU {100 * cpu / seconds:4.0f}%")
+    if reaction:
+        line += f"  move->result p50 {1000 * np.median(reaction):4.0f} ms"
+    print(line)
+
+
+def main(fps: float, detect_ms: float, seconds: float, move_every: float, threshold: float) -> None:
+    print(f"{fps:.0f} fps camera, 1280x720, {detect_ms:.0f} ms detector, {seconds:.0f}s each")
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "object_terms.db")
+        for scenario in ["idle", "activity"]:
+            for gate in [None, threshold]:
+                asyncio.run(run(scenario, gate, fps, detect_ms, seconds, move_every, db_path))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--detect-ms", type=float, default=60)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--move-every", type=float, default=1.0)
+    parser.add_argument("--threshold", type=float, default=0.01)
+    args = parser.parse_args()
+    main(args.fps, args.detect_ms, args.seconds, args.move_every, args.threshold)
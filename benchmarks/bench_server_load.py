@@ -0,0 +1,145 @@
+"""Detection websocket server under load: inline inference vs InferencePool
+
+Starts backend/server.py in-process with a stand-in detector that holds
+the worker for --inference-ms (as SAM does, without needing a checkpoint),
+then drives it with several detecting clients plus one client sending
+pings. Reports ping and detection latency percentiles.
+
+"inline" reproduces the old server, where process_frame ran SAM on the
+event loop.
+
+Usage:
+    python benchmarks/bench_server_load.py [--clients N] [--seconds S] [--inference-ms MS]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import uvicorn
+import websockets
+
+BACKEND = os.path.join(os.path.dirname(__file__), "..", "backend")
+
+
+class StandInDetector:
+    inference_ms = 100.0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def process_frame_sync(self, image_data, mask_encoding=None, crop_masks=None,
+                           inference_size=None, upsample_masks=None):
+        time.sleep(self.inference_ms / 1000)
+        return {"success": True, "objects": []}
+
+
+class InlinePool:
+    """The pre-pool behaviour: inference blocks the event loop"""
+
+    async def submit(self, client, fn, *args):
+        return fn(*args)
+
+    def cancel_client(self, client):
+        return 0
+
+    async def close(self):
+        pass
+
+
+def load_server():
+    sys.path.insert(0, BACKEND)
+    sys.modules["object_detection"] = types.SimpleNamespace(ObjectDetector=StandInDetector)
+    import server
+    return server
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def detecting_client(url: str, deadline: float, latencies: list, busy: list) -> None:
+    async with websockets.connect(url, max_size=None) as ws:
+        await ws.recv()  # connection confirmation
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await ws.send(json.dumps({"type": "detect", "image": "frame"}))
+            result = json.loads(await ws.recv())
+            if result.get("busy"):
+                busy.append(1)
+                await asyncio.sleep(0.01)
+            else:
+                latencies.append(time.perf_counter() - start)
+
+
+async def pinging_client(url: str, deadline: float, latencies: list) -> None:
+    async with websockets.connect(url) as ws:
+        await ws.recv()
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await ws.send(json.dumps({"type": "ping"}))
+            while json.loads(await ws.recv()).get("type") != "pong":
+                pass
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.02)
+
+
+def percentiles(values) -> str:
+    if not values:
+        return "n/a"
+    p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+    return f"p50 {p50:7.1f}  p95 {p95:7.1f}  p99 {p99:7.1f} ms"
+
+
+async def drive(url: str, clients: int, seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    detect_latency, ping_latency, busy = [], [], []
+    await asyncio.gather(
+        pinging_client(url, deadline, ping_latency),
+        *(detecting_client(url, deadline, detect_latency, busy) for _ in range(clients))
+    )
+    print(f"  ping    {percentiles(ping_latency)}  (n={len(ping_latency)})")
+    print(f"  detect  {percentiles(detect_latency)}  (n={len(detect_latency)}, busy={len(busy)})")
+
+
+def main(clients: int, seconds: float, inference_ms: float) -> None:
+    StandInDetector.inference_ms = inference_ms
+    server = load_server()
+    server.logger.setLevel(logging.WARNING)
+    pooled = server.pool
+
+    port = free_port()
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning")
+    uvicorn_server = uvicorn.Server(config)
+    thread = threading.Thread(target=uvicorn_server.run, daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+
+    url = f"ws://127.0.0.1:{port}/ws"
+    print(f"{clients} detecting clients + 1 pinging client, {inference_ms:.0f} ms inference, {seconds:.0f}s each")
+    for label, pool in [("inline", InlinePool()), ("InferencePool", pooled)]:
+        server.pool = pool
+        print(label)
+        asyncio.run(drive(url, clients, seconds))
+
+    uvicorn_server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--inference-ms", type=float, default=100)
+    args = parser.parse_args()
+    main(args.clients, args.seconds, args.inference_ms)
@@ -0,0 +1,176 @@
+"""Tracking between detections on recorded video: cost and accuracy vs detecting every frame
+
+Each video is decoded up front; the detector then runs on every frame
+to give the reference boxes (and, tracked with K=1, reference object
+identities). Each tracker variant runs the detector on every K-th frame
+only and propagates in between. Reported per variant:
+
+- ms per frame (detector + tracker)
+- detector runs and term lookups (one per track, vs one per detected
+  box per frame without tracking)
+- mean IoU of the reference boxes with the variant's boxes (0 for a box
+  the variant lost)
+- ID switches: times a reference object's matched track ID changed
+
+The detector is ObjectLearner's YOLO when yolov4-tiny.weights/.cfg are in
+the working directory, else a colour-blob stand-in. Without video files,
+a synthetic clip of textured objects moving over a noisy background is
+generated.
+
+Usage:
+    python benchmarks/bench_tracker.py [VIDEO ...] [--every 1 2 5 10]
+        [--max-frames N] [--width W]
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from lingualearn.model_registry import models
+from lingualearn.object_learning import ObjectLearner
+from lingualearn.tracker import (
+    CentroidAssociation, IoUAssociation, ObjectTracker, OpticalFlowPropagator, box_iou
+)
+
+
+class BlobDetector:
+    """Stand-in for YOLO: one box per saturated blob"""
+
+    def detect(self, frame):
+        saturation = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)[:, :, 1]
+        count, _, stats, _ = cv2.connectedComponentsWithStats((saturation > 100).astype(np.uint8))
+        boxes = [stats[i, :4] for i in range(1, count) if stats[i, cv2.CC_STAT_AREA] > 200]
+        if not boxes:
+            return np.zeros(0), np.zeros(0, dtype=np.float32), np.zeros((0, 4))
+        return np.ones(len(boxes)), np.full(len(boxes), 0.9, dtype=np.float32), np.array(boxes)
+
+
+def synthetic_video(path: str, frames: int = 300, size=(640, 480)) -> str:
+    rng = np.random.default_rng(0)
+    width, height = size
+    objects = [  # colour, size, start, velocity (px/frame)
+        ((40, 40, 220), 70, (50.0, 60.0), (3.0, 1.5)),
+        ((40, 200, 40), 90, (400.0, 300.0), (-2.5, -1.0)),
+        ((220, 120, 30), 50, (300.0, 80.0), (1.0, 4.0)),
+    ]
+    textures = [0.6 + 0.4 * np.kron(rng.random((8, 8)), np.ones((s // 8 + 1, s // 8 + 1)))[:s, :s, None]
+                for _, s, _, _ in objects]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, size)
+    for i in range(frames):
+        image = np.clip(110 + rng.normal(0, 4, (height, width, 3)), 0, 255).astype(np.uint8)
+        for (colour, s, (x, y), (vx, vy)), texture in zip(objects, textures):
+            # Bounce off the edges
+            x = (x + vx * i) % (2 * (width - s))
+            y = (y + vy * i) % (2 * (height - s))
+            x, y = int(min(x, 2 * (width - s) - x)), int(min(y, 2 * (height - s) - y))
+            image[y:y + s, x:x + s] = (np.array(colour) * texture).astype(np.uint8)
+        writer.write(image)
+    writer.release()
+    return path
+
+
+def decode(path: str, max_frames: int, width: int) -> List[np.ndarray]:
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        if frame.shape[1] > width:
+            frame = cv2.resize(frame, (width, round(frame.shape[0] * width / frame.shape[1])),
+                               interpolation=cv2.INTER_AREA)
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def track(frames, detect, tracker: ObjectTracker, every: int):
+    """Per-frame (boxes, ids), detector runs and elapsed seconds"""
+    outputs, runs = [], 0
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        if i % every == 0:
+            tracks = tracker.update(detect(frame), frame)
+            runs += 1
+        else:
+            tracks = tracker.propagate(frame)
+        outputs.append((np.array([t.bbox for t in tracks]).reshape(-1, 4), [t.track_id for t in tracks]))
+    return outputs, runs, time.perf_counter() - start
+
+
+def compare(reference, outputs):
+    """Mean best IoU per reference box, and ID switches"""
+    ious, switches = [], 0
+    matched: Dict[int, int] = {}  # reference ID -> last matched track ID
+    for (ref_boxes, ref_ids), (boxes, ids) in zip(reference, outputs):
+        if len(ref_boxes) == 0:
+            continue
+        if len(boxes) == 0:
+            ious.extend([0.0] * len(ref_boxes))
+            continue
+        overlap = box_iou(ref_boxes, boxes)
+        ious.extend(overlap.max(axis=1))
+        for r, ref_id in enumerate(ref_ids):
+            best = int(overlap[r].argmax())
+            if overlap[r, best] < 0.3:
+                continue
+            if ref_id in matched and matched[ref_id] != ids[best]:
+                switches += 1
+            matched[ref_id] = ids[best]
+    return float(np.mean(ious)) if ious else 0.0, switches
+
+
+def main(videos: List[str], every: List[int], max_frames: int, width: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        learner = ObjectLearner(os.path.join(directory, "object_terms.db"))
+        if not (os.path.exists("yolov4-tiny.weights") and os.path.exists("yolov4-tiny.cfg")):
+            models.get(learner.detector_key, BlobDetector)
+            print("detector: colour-blob stand-in (yolov4-tiny weights not found)")
+        if not videos:
+            videos = [synthetic_video(os.path.join(directory, "synthetic.avi"))]
+
+        for path in videos:
+            frames = decode(path, max_frames, width)
+            if not frames:
+                print(f"{path}: no frames decoded")
+                continue
+
+            start = time.perf_counter()
+            detections = [learner.detect_objects(frame) for frame in frames]
+            per_frame_ms = 1000 * (time.perf_counter() - start) / len(frames)
+            boxes_detected = sum(len(d) for d in detections)
+            reference, _, _ = track(frames, lambda f, it=iter(detections): next(it), ObjectTracker(), 1)
+
+            print(f"\n{os.path.basename(path)}: {len(frames)} frames {frames[0].shape[1]}x{frames[0].shape[0]}")
+            print(f"  detect every frame, no tracker: {per_frame_ms:6.1f} ms/frame, "
+                  f"{boxes_detected} term lookups")
+            print(f"  {'K':>3s} {'association':12s} {'propagation':12s} {'ms/frame':>9s} {'detector':>9s} "
+                  f"{'lookups':>8s} {'IoU':>6s} {'ID switches':>12s}")
+            variants = [
+                ("iou", "hold", lambda: ObjectTracker(IoUAssociation())),
+                ("iou", "flow", lambda: ObjectTracker(IoUAssociation(), OpticalFlowPropagator())),
+                ("centroid", "hold", lambda: ObjectTracker(CentroidAssociation())),
+                ("centroid", "flow", lambda: ObjectTracker(CentroidAssociation(), OpticalFlowPropagator())),
+            ]
+            for k in every:
+                for association, propagation, make in variants:
+                    tracker = make()
+                    outputs, runs, seconds = track(frames, learner.detect_objects, tracker, k)
+                    iou, switches = compare(reference, outputs)
+                    print(f"  {k:3d} {association:12s} {propagation:12s} {1000 * seconds / len(frames):9.1f} "
+                          f"{runs:9d} {tracker.created:8d} {iou:6.3f} {switches:12d}")
+        learner.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("videos", nargs="*", help="video files (default: a synthetic clip)")
+    parser.add_argument("--every", type=int, nargs="+", default=[1, 2, 5, 10])
+    parser.add_argument("--max-frames", type=int, default=600)
+    parser.add_argument("--width", type=int, default=640, help="frames are shrunk to this width")
+    args = parser.parse_args()
+    main(args.videos, args.every, args.max_frames, args.width)
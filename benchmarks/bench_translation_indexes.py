@@ -0,0 +1,82 @@
+"""Lookup latency on a large translations table, with and without the lookup indexes
+
+Usage:
+    python benchmarks/bench_translation_indexes.py [--rows N] [--lookups N]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from lingualearn.knowledge_base import (
+    KnowledgeBase,
+    TranslationEntry,
+    SELECT_RULES_SQL,
+    SELECT_TRANSLATION_SQL,
+)
+
+LANGUAGES = ["xho", "zul", "sot", "afr", "tsn"]
+
+
+async def populate(kb: KnowledgeBase, rows: int, chunk: int = 100000) -> None:
+    for start in range(0, rows, chunk):
+        await kb.add_translations_bulk(
+            TranslationEntry(
+                source_text=f"word{i // len(LANGUAGES)}",
+                target_text=f"igama{i}",
+                source_lang="en",
+                target_lang=LANGUAGES[i % len(LANGUAGES)],
+                confidence_score=random.random()
+            )
+            for i in range(start, min(start + chunk, rows))
+        )
+        await kb.learn_contextual_rules_bulk(
+            ("en", LANGUAGES[i % len(LANGUAGES)], "grammar", {"n": i})
+            for i in range(start, min(start + chunk, rows), 100)
+        )
+    with kb._engine.write_connection() as conn:
+        conn.execute("UPDATE contextual_rules SET confidence_score = (id % 100) / 100.0")
+
+
+def time_lookups(conn: sqlite3.Connection, rows: int, lookups: int):
+    words = rows // len(LANGUAGES)
+    start = time.perf_counter()
+    for _ in range(lookups):
+        conn.execute(SELECT_TRANSLATION_SQL, (f"word{random.randrange(words)}", "en", random.choice(LANGUAGES))).fetchone()
+    translation = (time.perf_counter() - start) / lookups
+
+    start = time.perf_counter()
+    for _ in range(max(1, lookups // 100)):
+        conn.execute(SELECT_RULES_SQL, ("en", random.choice(LANGUAGES), 0.9)).fetchall()
+    rules = (time.perf_counter() - start) / max(1, lookups // 100)
+    return translation, rules
+
+
+async def main(rows: int, lookups: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "translations.db")
+        with KnowledgeBase(db_path) as kb:
+            start = time.perf_counter()
+            await populate(kb, rows)
+            print(f"populated {rows} rows in {time.perf_counter() - start:.1f}s")
+
+            with kb._engine.write_connection() as conn:
+                indexed = time_lookups(conn, rows, lookups)
+                conn.execute("DROP INDEX idx_translations_lookup")
+                conn.execute("DROP INDEX idx_rules_lookup")
+                unindexed = time_lookups(conn, rows, lookups)
+
+    print(f"{'':<22}{'get_translation':>18}{'get_contextual_rules':>24}")
+    print(f"{'UNIQUE constraint only':<22}{unindexed[0] * 1e6:>15.1f} us{unindexed[1] * 1e6:>21.1f} us")
+    print(f"{'covering indexes':<22}{indexed[0] * 1e6:>15.1f} us{indexed[1] * 1e6:>21.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.lookups))
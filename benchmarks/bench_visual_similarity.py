@@ -0,0 +1,72 @@
+"""Visual-similarity search: per-term Python loop vs VisualFeatureIndex
+
+Usage:
+    python benchmarks/bench_visual_similarity.py [--terms N [N ...]] [--objects N]
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from lingualearn.visual_index import VisualFeatureIndex
+
+THRESHOLD = 0.8
+TOP_K = 10
+
+
+def random_attrs(rng: random.Random):
+    return {
+        "area": rng.randint(100, 200000),
+        "circularity": rng.random(),
+        "aspect_ratio": rng.uniform(0.2, 4.0),
+    }
+
+
+def loop_similarity(attrs1, attrs2) -> float:
+    """EnhancedObjectLearner._calculate_visual_similarity"""
+    area_diff = abs(attrs1["area"] - attrs2["area"]) / max(attrs1["area"], attrs2["area"])
+    circ_diff = abs(attrs1["circularity"] - attrs2["circularity"])
+    ratio_diff = abs(attrs1["aspect_ratio"] - attrs2["aspect_ratio"])
+    return (1 - area_diff) * 0.3 + (1 - circ_diff) * 0.4 + (1 - ratio_diff) * 0.3
+
+
+def loop_search(terms, queries):
+    """The pre-index _find_similar_objects, once per detected object"""
+    return [
+        [term for term in terms if loop_similarity(query, term.visual_attributes) >= THRESHOLD]
+        for query in queries
+    ]
+
+
+def timed(label: str, fn, repeat: int) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<20} {elapsed * 1000:9.2f} ms/frame")
+
+
+def main(term_counts, objects: int) -> None:
+    rng = random.Random(0)
+    queries = [random_attrs(rng) for _ in range(objects)]
+    for count in term_counts:
+        terms = [
+            SimpleNamespace(language="xho", visual_attributes=random_attrs(rng))
+            for _ in range(count)
+        ]
+        start = time.perf_counter()
+        index = VisualFeatureIndex()
+        for term in terms:
+            index.add(term)
+        print(f"{count} terms, {objects} objects/frame (indexed in {time.perf_counter() - start:.2f}s)")
+
+        timed("Python loop", lambda: loop_search(terms, queries), 1)
+        timed("VisualFeatureIndex", lambda: index.search(queries, THRESHOLD, top_k=TOP_K), 10)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--objects", type=int, default=20)
+    args = parser.parse_args()
+    main(args.terms, args.objects)
@@ -1,18 +1,28 @@
 from typing import Dict, Any, Optional
 import asyncio
 from fastapi import FastAPI, WebSocket, HTTPException
-from ..object_learning import EnhancedObjectLearner
+from ..enhanced_object_learning import EnhancedObjectLearner, EnhancedObjectTerm
 from ..voice_input import VoiceInput
-from ..sam_integration import SAMObjectDetector
 from ..knowledge_base import KnowledgeBase
+from ..translation_cache import CachedKnowledgeBase
 
 class LinguaLearnAPI:
-    def __init__(self):
+    def __init__(self, warm_up: bool = False):
+        """
+        Args:
+            warm_up: Start loading SAM and Whisper in the background now
+                instead of on the first request that needs them
+        """
         self.app = FastAPI()
-        self.kb = KnowledgeBase()
+        # Lookups repeat across requests and sessions; serve them from memory
+        self.kb = CachedKnowledgeBase(KnowledgeBase())
         self.object_learner = EnhancedObjectLearner(self.kb)
         self.voice_input = VoiceInput()
-        self.sam = SAMObjectDetector()
+        # One SAM detector (and embedding cache) for the whole API
+        self.sam = self.object_learner.sam
+        if warm_up:
+            self.sam.warm_up()
+            self.voice_input.warm_up()
         
         self._setup_routes()
         self._active_sessions = {}
@@ -106,6 +116,10 @@ class LinguaLearnAPI:
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
 
+        @self.app.get("/cache-stats")
+        async def cache_stats():
+            return self.kb.stats_dict()
+
         @self.app.get("/terms/{language}")
         async def get_terms(language: str):
             try:
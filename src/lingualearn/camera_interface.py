@@ -1,9 +1,15 @@
-import cv2
 import asyncio
+import threading
+import time
 import numpy as np
 from typing import Optional, Callable, Dict
 from dataclasses import dataclass
 from .object_learning import ObjectLearner, ObjectTerm
+from .frame_ring import FrameRef, FrameRing
+from .pipeline import DetectionPipeline, PipelineConfig
+from .lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
 
 @dataclass
 class CameraConfig:
@@ -11,6 +17,7 @@ class CameraConfig:
     height: int = 720
     fps: int = 30
     auto_focus: bool = True
+    ring_slots: int = 4  # preallocated frame buffers shared with consumers
 
 class CameraInterface:
     def __init__(self, 
@@ -20,8 +27,11 @@ class CameraInterface:
         self.config = config or CameraConfig()
         self.camera = None
         self.is_running = False
-        self._current_frame = None
-        self._frame_ready = asyncio.Event()
+        # Filled by the capture thread; consumers pin frames they're using
+        self.ring: Optional[FrameRing] = None
+        self._capture_thread: Optional[threading.Thread] = None
+        # Set while run_pipeline is active
+        self.pipeline: Optional[DetectionPipeline] = None
 
     async def start(self):
         """Start the camera interface"""
@@ -39,76 +49,130 @@ class CameraInterface:
         if not self.camera.isOpened():
             raise RuntimeError("Could not open camera")
 
+        # The camera may not honour the requested size: take it from a frame
+        loop = asyncio.get_running_loop()
+        ret, frame = await loop.run_in_executor(None, self.camera.read)
+        if not ret:
+            raise RuntimeError("Could not read from camera")
+        self.ring = FrameRing(frame.shape, slots=self.config.ring_slots, dtype=frame.dtype)
+        slot, buffer = self.ring.write_slot()
+        buffer[...] = frame
+        self.ring.commit(slot)
+
         self.is_running = True
-        asyncio.create_task(self._capture_frames())
+        self._capture_thread = threading.Thread(target=self._capture_frames, name="camera-capture", daemon=True)
+        self._capture_thread.start()
 
     async def stop(self):
         """Stop the camera interface"""
         self.is_running = False
+        if self._capture_thread is not None:
+            # The thread exits after its current read
+            await asyncio.get_running_loop().run_in_executor(None, self._capture_thread.join)
+            self._capture_thread = None
         if self.camera is not None:
             self.camera.release()
             self.camera = None
 
-    async def _capture_frames(self):
-        """Continuously capture frames from camera"""
+    def _capture_frames(self):
+        """Read frames into the ring until stopped (capture thread)
+
+        read() blocks until the camera delivers a frame, which paces the
+        loop at the camera's rate; frames are decoded straight into a ring
+        buffer, so nothing is allocated per frame.
+        """
         while self.is_running:
-            ret, frame = self.camera.read()
-            if ret:
-                self._current_frame = frame
-                self._frame_ready.set()
-            await asyncio.sleep(1/self.config.fps)
+            slot, buffer = self.ring.write_slot()
+            ret, frame = self.camera.read(image=buffer)
+            if not ret:
+                time.sleep(1 / self.config.fps)
+                continue
+            if frame is not buffer:
+                # Resolution changed mid-stream (or the backend ignored the
+                # buffer); keep frames that still fit the ring
+                if frame.shape != buffer.shape:
+                    self.ring.dropped += 1
+                    continue
+                buffer[...] = frame
+            self.ring.commit(slot)
+
+    async def next_frame(self, after: Optional[int] = None, timeout: Optional[float] = None) -> FrameRef:
+        """Wait for a frame newer than sequence `after` (default: the newest now)
+
+        The frame is pinned until released (use it as a context manager).
+        """
+        if not self.is_running:
+            raise RuntimeError("Camera not started")
+        return await self.ring.wait_for(self.ring.sequence if after is None else after, timeout)
 
     async def capture_object(self, 
                            language: str,
                            on_detection: Optional[Callable[[Dict], None]] = None
                            ) -> Optional[Dict]:
         """Capture and identify object in frame"""
-        if not self.is_running:
-            raise RuntimeError("Camera not started")
-
         # Wait for next frame
-        await self._frame_ready.wait()
-        self._frame_ready.clear()
-
-        if self._current_frame is None:
-            return None
-
-        # Get object terms for the frame
-        terms = await self.learner.identify_object(
-            self._current_frame,
-            language
-        )
-
-        result = {
-            'frame': self._current_frame,
-            'terms': terms
-        }
+        with await self.next_frame() as frame:
+            # Get object terms for the frame
+            terms = await self.learner.identify_object(
+                frame.image,
+                language
+            )
+
+            result = {
+                'frame': frame.image.copy(),
+                'sequence': frame.sequence,
+                'terms': terms
+            }
 
         if on_detection:
             on_detection(result)
 
         return result
 
+    async def run_pipeline(self,
+                           language: str,
+                           callback: Callable[[Dict], None],
+                           config: Optional[PipelineConfig] = None
+                           ) -> Dict[str, Dict[str, float]]:
+        """Identify objects continuously until stop_pipeline() or stop()
+
+        Frames flow through capture, preprocess, detect and lookup stages
+        that run concurrently (see DetectionPipeline); callback gets a dict
+        with sequence, timestamp, objects (as from identify_objects, bboxes
+        in frame pixels) and latency_ms for every frame that makes it
+        through. Live stats are on self.pipeline.stats().
+
+        Returns:
+            Final per-stage stats: frames, dropped, fps and latency percentiles
+        """
+        if not self.is_running:
+            raise RuntimeError("Camera not started")
+        if self.pipeline is not None:
+            raise RuntimeError("Pipeline already running")
+
+        self.pipeline = DetectionPipeline(self, self.learner, language, callback, config)
+        try:
+            return await self.pipeline.run()
+        finally:
+            self.pipeline = None
+
+    def stop_pipeline(self):
+        """Stop run_pipeline; frames still in flight are discarded"""
+        if self.pipeline is not None:
+            self.pipeline.stop()
+
     async def learn_new_term(self,
                            term: ObjectTerm,
                            on_learned: Optional[Callable[[Dict], None]] = None
                            ) -> Optional[Dict]:
         """Learn a new term for captured object"""
-        if not self.is_running:
-            raise RuntimeError("Camera not started")
-
         # Wait for next frame
-        await self._frame_ready.wait()
-        self._frame_ready.clear()
-
-        if self._current_frame is None:
-            return None
-
-        # Learn the new term
-        result = await self.learner.learn_object_term(
-            self._current_frame,
-            term
-        )
+        with await self.next_frame() as frame:
+            # Learn the new term
+            result = await self.learner.learn_object_term(
+                frame.image,
+                term
+            )
 
         if on_learned:
             on_learned(result)
@@ -116,8 +180,14 @@ class CameraInterface:
         return result
 
     def get_preview_frame(self) -> Optional[np.ndarray]:
-        """Get the current camera frame for preview"""
-        return self._current_frame
+        """Get (a copy of) the current camera frame for preview"""
+        if self.ring is None:
+            return None
+        frame = self.ring.latest()
+        if frame is None:
+            return None
+        with frame:
+            return frame.image.copy()
 
     async def toggle_flash(self, on: bool):
         """Toggle camera flash/torch if available"""
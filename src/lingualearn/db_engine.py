@@ -0,0 +1,264 @@
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+import asyncio
+import functools
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+T = TypeVar('T')
+
+# Prepared statements kept per connection; callers reuse their SQL verbatim
+STATEMENT_CACHE_SIZE = 64
+
+
+class AsyncSQLiteEngine:
+    """Runs SQLite work off the event loop
+
+    All writes go through one dedicated writer thread that owns the writer
+    connection, so they are serialized without blocking the loop. Reads run
+    on a thread pool, each borrowing a long-lived reader connection.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 4):
+        """Open the writer connection and the reader pool
+
+        Args:
+            db_path: Path to the SQLite database file
+            pool_size: Number of reader threads and pooled read connections
+        """
+        self.db_path = db_path
+        self._write_lock = threading.Lock()
+        self._writer = self.connect()
+        self._closed = False
+
+        # An in-memory database only exists on its own connection, so reads share the writer
+        self._shared_connection = db_path == ':memory:' or db_path.startswith('file::memory:')
+        self._readers: queue.Queue = queue.Queue()
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='kb-writer')
+        if self._shared_connection:
+            self._read_executor = self._write_executor
+        else:
+            pool_size = max(1, pool_size)
+            for _ in range(pool_size):
+                self._readers.put(self.connect())
+            self._read_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='kb-reader')
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a long-lived connection in WAL mode"""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def write_connection(self) -> Iterator[sqlite3.Connection]:
+        """Run a single transaction on the writer connection (blocking)"""
+        with self._write_lock, self._writer:
+            yield self._writer
+
+    @contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a reader connection from the pool (blocking)"""
+        if self._shared_connection:
+            with self._write_lock:
+                yield self._writer
+            return
+
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    async def write(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(conn, *args) in one transaction on the writer thread"""
+        return await self._submit(self._write_executor, self._run_write, fn, args)
+
+    async def read(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(conn, *args) on a reader thread"""
+        return await self._submit(self._read_executor, self._run_read, fn, args)
+
+    def write_blocking(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(conn, *args) in one transaction on the writer thread and wait for it
+
+        Ordered after writes already submitted. Must not be called from
+        the writer thread itself.
+        """
+        if self._closed:
+            raise RuntimeError("Database engine is closed")
+        return self._write_executor.submit(self._run_write, fn, args).result()
+
+    async def _submit(self, executor: ThreadPoolExecutor, runner: Callable, fn: Callable, args: tuple) -> Any:
+        if self._closed:
+            raise RuntimeError("Database engine is closed")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(runner, fn, args))
+
+    def _run_write(self, fn: Callable, args: tuple) -> Any:
+        with self.write_connection() as conn:
+            return fn(conn, *args)
+
+    def _run_read(self, fn: Callable, args: tuple) -> Any:
+        with self.read_connection() as conn:
+            return fn(conn, *args)
+
+    def close(self) -> None:
+        """Drain pending work, then close every connection"""
+        if self._closed:
+            return
+        self._closed = True
+        self._write_executor.shutdown(wait=True)
+        if self._read_executor is not self._write_executor:
+            self._read_executor.shutdown(wait=True)
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+        with self._write_lock:
+            self._writer.close()
+
+
+class WriteBehindQueue:
+    """Groups writes that arrive close together into a single commit
+
+    Each submitted statement waits at most `delay` seconds (or until
+    `max_batch` statements are pending) and is then committed together with
+    everything else that arrived in that window. Consecutive statements with
+    the same SQL are sent through executemany, and submission order is kept.
+    If the batch fails, its statements are replayed one transaction at a time.
+    """
+
+    def __init__(self, engine: AsyncSQLiteEngine, delay: float = 0.005, max_batch: int = 1000):
+        self.engine = engine
+        self.delay = delay
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, Sequence, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set = set()
+        # Flushed batches whose commit task hasn't reached the engine yet;
+        # close() commits these itself, so each batch is claimed exactly once
+        self._unclaimed: List[list] = []
+        self._claim_lock = threading.Lock()
+
+    async def submit(self, sql: str, params: Sequence) -> None:
+        """Queue a statement and wait until the batch holding it is committed"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((sql, params, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.delay, self._start_flush)
+
+        await future
+
+    async def flush(self) -> None:
+        """Commit everything pending now and wait for in-flight batches"""
+        if self._pending:
+            self._start_flush()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        with self._claim_lock:
+            self._unclaimed.append(batch)
+        task = asyncio.ensure_future(self._commit(batch))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    def _claim(self, batch: list) -> bool:
+        with self._claim_lock:
+            for i, unclaimed in enumerate(self._unclaimed):
+                if unclaimed is batch:
+                    del self._unclaimed[i]
+                    return True
+        return False
+
+    def close(self) -> None:
+        """Commit every queued write now (blocking)
+
+        For shutdown paths that can't await flush(); writers still waiting
+        in submit() are woken through their event loop.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        with self._claim_lock:
+            batches, self._unclaimed = self._unclaimed, []
+        pending, self._pending = self._pending, []
+        if pending:
+            batches.append(pending)
+
+        for batch in batches:
+            outcomes = []
+            try:
+                self.engine.write_blocking(self._execute_batch, [(sql, params) for sql, params, _ in batch])
+                outcomes = [(future, None) for _, _, future in batch]
+            except Exception:
+                for sql, params, future in batch:
+                    try:
+                        self.engine.write_blocking(self._execute_batch, [(sql, params)])
+                    except Exception as e:
+                        outcomes.append((future, e))
+                    else:
+                        outcomes.append((future, None))
+            for future, error in outcomes:
+                try:
+                    future.get_loop().call_soon_threadsafe(self._settle, future, error)
+                except RuntimeError:
+                    pass  # the loop is already closed; nobody is waiting
+
+    @staticmethod
+    def _settle(future: asyncio.Future, error: Optional[Exception]) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
+
+    async def _commit(self, batch: List[Tuple[str, Sequence, asyncio.Future]]) -> None:
+        if not self._claim(batch):
+            return  # committed by close()
+        try:
+            await self.engine.write(self._execute_batch, [(sql, params) for sql, params, _ in batch])
+        except Exception:
+            # Replay one statement per transaction so only the failing writer sees the error
+            for sql, params, future in batch:
+                try:
+                    await self.engine.write(self._execute_batch, [(sql, params)])
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(None)
+            return
+
+        for _, _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    @staticmethod
+    def _execute_batch(conn, statements: List[Tuple[str, Sequence]]) -> None:
+        # Runs of the same statement become one executemany call
+        i = 0
+        while i < len(statements):
+            sql = statements[i][0]
+            j = i
+            while j < len(statements) and statements[j][0] == sql:
+                j += 1
+            conn.executemany(sql, [params for _, params in statements[i:j]])
+            i = j
@@ -4,6 +4,7 @@ import numpy as np
 from .sam_integration import SAMObjectDetector, SegmentedObject
 from .object_learning import ObjectTerm
 from .knowledge_base import KnowledgeBase
+from .visual_index import VisualFeatureIndex
 
 @dataclass
 class EnhancedObjectTerm(ObjectTerm):
@@ -16,6 +17,19 @@ class EnhancedObjectLearner:
         self.kb = knowledge_base
         self.sam = SAMObjectDetector()
         self.min_confidence = 0.7
+        # Most similar terms returned per object
+        self.max_similar_terms = 10
+        # Feature matrix of all known terms, loaded on first use
+        self._feature_index: Optional[VisualFeatureIndex] = None
+
+    async def _get_feature_index(self) -> VisualFeatureIndex:
+        """Load every stored term into the feature index once"""
+        if self._feature_index is None:
+            index = VisualFeatureIndex()
+            for term in await self.kb.get_all_terms():
+                index.add(term)
+            self._feature_index = index
+        return self._feature_index
 
     async def learn_from_image(self,
                            image: np.ndarray,
@@ -49,8 +63,10 @@ class EnhancedObjectLearner:
         term.visual_attributes = visual_attrs
         term.segmentation_mask = segmented_obj.mask
 
-        # Store in knowledge base
+        # Store in knowledge base (index loaded first so the term isn't added twice)
+        index = await self._get_feature_index()
         await self.kb.add_translation(term)
+        index.add(term)
 
         # Find visually similar objects
         similar_terms = await self._find_similar_objects(visual_attrs)
@@ -71,53 +87,39 @@ class EnhancedObjectLearner:
         self.sam.set_image(image)
 
         # Detect all objects
-        objects = self.sam.detect_all_objects()
+        objects = [
+            obj for obj in self.sam.detect_all_objects()
+            if obj.confidence >= self.min_confidence
+        ]
 
-        results = []
-        for obj in objects:
-            if obj.confidence < self.min_confidence:
-                continue
-
-            # Get object attributes
-            visual_attrs = self.sam.get_object_attributes(obj)
-
-            # Find matching terms
-            similar_terms = await self._find_similar_objects(visual_attrs)
-            terms_in_language = [t for t in similar_terms if t.language == language]
-
-            results.append({
-                'bbox': obj.bbox,
-                'confidence': obj.confidence,
-                'center': obj.center_point,
-                'terms': terms_in_language,
-                'attributes': visual_attrs
-            })
+        # Get object attributes
+        attributes = [self.sam.get_object_attributes(obj) for obj in objects]
+
+        # Match every object against every term in one pass
+        index = await self._get_feature_index()
+        matches = index.search(
+            attributes,
+            threshold=0.8,
+            top_k=self.max_similar_terms,
+            language=language
+        )
 
-        return results
+        return [{
+            'bbox': obj.bbox,
+            'confidence': obj.confidence,
+            'center': obj.center_point,
+            'terms': [term for _, term in similar],
+            'attributes': visual_attrs
+        } for obj, visual_attrs, similar in zip(objects, attributes, matches)]
 
     async def _find_similar_objects(self,
                                 visual_attrs: Dict[str, any],
                                 threshold: float = 0.8
                                 ) -> List[EnhancedObjectTerm]:
-        """Find objects with similar visual attributes"""
-        # Get all terms from knowledge base
-        all_terms = await self.kb.get_all_terms()
-        similar_terms = []
-
-        for term in all_terms:
-            if not term.visual_attributes:
-                continue
-
-            # Calculate similarity score
-            similarity = self._calculate_visual_similarity(
-                visual_attrs,
-                term.visual_attributes
-            )
-
-            if similarity >= threshold:
-                similar_terms.append(term)
-
-        return similar_terms
+        """Find objects with similar visual attributes, most similar first"""
+        index = await self._get_feature_index()
+        matches = index.search([visual_attrs], threshold=threshold, top_k=self.max_similar_terms)
+        return [term for _, term in matches[0]]
 
     def _calculate_visual_similarity(self,
                                  attrs1: Dict[str, any],
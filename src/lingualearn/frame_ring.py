@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+@dataclass
+class FrameRef:
+    """A committed frame, pinned in its ring slot until released
+
+    image is a view into the ring's buffer: it stays valid (the capture
+    thread won't overwrite the slot) until release(), or the end of a
+    `with` block. Copy it to keep it longer.
+    """
+    sequence: int
+    image: np.ndarray
+    timestamp: float
+    slot: int
+    ring: "FrameRing"
+    released: bool = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.ring._unpin(self.slot)
+
+    def __enter__(self) -> "FrameRef":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+class FrameRing:
+    """Preallocated frame buffers shared by one writer thread and async readers
+
+    The writer asks for a free slot, fills it in place (e.g. with
+    VideoCapture.read(image=buffer)) and commits it, which gives it the
+    next sequence number and wakes readers waiting on any event loop.
+    Slots pinned by readers are never handed to the writer; if every slot
+    is pinned the frame goes to a scratch buffer and is dropped.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], slots: int = 4, dtype=np.uint8):
+        if slots < 2:
+            raise ValueError("A frame ring needs at least two slots")
+        self.buffers = np.empty((slots, *shape), dtype=dtype)
+        self._scratch = np.empty(shape, dtype=dtype)
+        self._sequences = [0] * slots
+        self._timestamps = [0.0] * slots
+        self._pins = [0] * slots
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._next_slot = 0
+
+        self.sequence = 0        # last committed frame, 0 before the first
+        self.latest_slot = -1
+        self.dropped = 0
+
+    @property
+    def slots(self) -> int:
+        return len(self.buffers)
+
+    def write_slot(self) -> Tuple[int, np.ndarray]:
+        """Slot index and buffer for the writer's next frame (-1 = scratch)"""
+        with self._lock:
+            for offset in range(self.slots):
+                slot = (self._next_slot + offset) % self.slots
+                if self._pins[slot] == 0 and slot != self.latest_slot:
+                    self._next_slot = (slot + 1) % self.slots
+                    return slot, self.buffers[slot]
+        return -1, self._scratch
+
+    def commit(self, slot: int, timestamp: Optional[float] = None) -> int:
+        """Publish a filled slot as the newest frame; returns its sequence number"""
+        if slot < 0:
+            self.dropped += 1
+            return self.sequence
+        with self._lock:
+            self.sequence += 1
+            self._sequences[slot] = self.sequence
+            self._timestamps[slot] = time.monotonic() if timestamp is None else timestamp
+            self.latest_slot = slot
+            ready = [w for w in self._waiters if w[0] < self.sequence]
+            self._waiters = [w for w in self._waiters if w[0] >= self.sequence]
+        for _, loop, future in ready:
+            loop.call_soon_threadsafe(self._wake, future)
+        return self.sequence
+
+    def latest(self) -> Optional[FrameRef]:
+        """Pin and return the newest frame, or None before the first one"""
+        with self._lock:
+            if self.latest_slot < 0:
+                return None
+            return self._pin(self.latest_slot)
+
+    async def wait_for(self, after: int, timeout: Optional[float] = None) -> FrameRef:
+        """Pin and return the newest frame once its sequence exceeds `after`
+
+        Raises:
+            asyncio.TimeoutError: no such frame within timeout seconds
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.sequence > after:
+                return self._pin(self.latest_slot)
+            future = loop.create_future()
+            waiter = (after, loop, future)
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        return self.latest()
+
+    def _pin(self, slot: int) -> FrameRef:
+        # Caller holds the lock
+        self._pins[slot] += 1
+        return FrameRef(self._sequences[slot], self.buffers[slot],
+                        self._timestamps[slot], slot, self)
+
+    def _unpin(self, slot: int) -> None:
+        with self._lock:
+            self._pins[slot] -= 1
+
+    @staticmethod
+    def _wake(future: asyncio.Future) -> None:
+        if not future.done():
+            future.set_result(None)
@@ -0,0 +1,111 @@
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+from itertools import combinations
+
+HASH_BITS = 64
+UINT64_MASK = (1 << HASH_BITS) - 1
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+
+def to_signed64(value: int) -> int:
+    """Map an unsigned 64-bit hash onto SQLite's signed INTEGER range"""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned64(value: int) -> int:
+    """Inverse of to_signed64"""
+    return value & UINT64_MASK
+
+
+class HammingIndex:
+    """Multi-index hashing for Hamming-radius queries over 64-bit hashes
+
+    Each hash is split into `chunks` equal substrings, each kept in its own
+    table. If two hashes are within radius r, at least one pair of
+    substrings differs by at most r // chunks bits (pigeonhole). So probing
+    every chunk value within that distance finds every true match, and the
+    candidates are then checked against the full radius.
+    """
+
+    def __init__(self, chunks: int = 4):
+        if HASH_BITS % chunks:
+            raise ValueError(f"chunks must divide {HASH_BITS}")
+        self.chunks = chunks
+        self.chunk_bits = HASH_BITS // chunks
+        self._chunk_mask = (1 << self.chunk_bits) - 1
+        self._tables: List[Dict[int, Set[Hashable]]] = [{} for _ in range(chunks)]
+        self._hashes: Dict[Hashable, int] = {}
+        # Bit-flip masks by distance, shared by every probe
+        self._flips: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._hashes
+
+    def _split(self, value: int) -> Iterable[int]:
+        for i in range(self.chunks):
+            yield (value >> (i * self.chunk_bits)) & self._chunk_mask
+
+    def add(self, key: Hashable, value: int) -> None:
+        """Index a hash under key, replacing any previous hash for that key"""
+        value = to_unsigned64(value)
+        if key in self._hashes:
+            self.remove(key)
+        self._hashes[key] = value
+        for table, part in zip(self._tables, self._split(value)):
+            table.setdefault(part, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """Drop a key; unknown keys are ignored"""
+        value = self._hashes.pop(key, None)
+        if value is None:
+            return
+        for table, part in zip(self._tables, self._split(value)):
+            bucket = table.get(part)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[part]
+
+    def _flip_masks(self, distance: int) -> List[int]:
+        masks = self._flips.get(distance)
+        if masks is None:
+            masks = [
+                sum(1 << bit for bit in bits)
+                for bits in combinations(range(self.chunk_bits), distance)
+            ]
+            self._flips[distance] = masks
+        return masks
+
+    def _probe_count(self, chunk_radius: int) -> int:
+        return self.chunks * sum(len(self._flip_masks(d)) for d in range(chunk_radius + 1))
+
+    def query(self, value: int, radius: int) -> List[Tuple[int, Hashable]]:
+        """Return (distance, key) pairs within radius, nearest first"""
+        value = to_unsigned64(value)
+        chunk_radius = radius // self.chunks
+
+        # Wide radii probe more buckets than there are hashes; scan instead
+        if self._probe_count(chunk_radius) >= len(self._hashes):
+            candidates: Iterable[Hashable] = self._hashes
+        else:
+            candidates = set()
+            for table, part in zip(self._tables, self._split(value)):
+                for distance in range(chunk_radius + 1):
+                    for mask in self._flip_masks(distance):
+                        bucket = table.get(part ^ mask)
+                        if bucket:
+                            candidates.update(bucket)
+
+        matches = []
+        for key in candidates:
+            distance = hamming_distance(value, self._hashes[key])
+            if distance <= radius:
+                matches.append((distance, key))
+        matches.sort(key=lambda match: match[0])
+        return matches
@@ -0,0 +1,428 @@
+"""Batch-ingest field video and photos as candidate object terms
+
+Streams frames from video files (sampled at --sample-fps) and image
+directories, decoding on worker processes, and detects objects in the
+main process with ObjectLearner's YOLO or with SAMObjectDetector
+(a grid of point prompts decoded as one batch). Objects whose perceptual
+hash matches a stored candidate or an already known term are skipped;
+the rest are bulk-written to the object_candidates table, with a JPEG
+crop, for linguists to name. Every finished work unit (a run of video
+frames or a batch of images) is appended to a checkpoint file, so an
+interrupted run resumes where it stopped.
+
+Usage:
+    python -m lingualearn.ingest SOURCE [SOURCE ...] --language xho
+        [--db object_terms.db] [--detector yolo|sam] [--workers N]
+        [--sample-fps F] [--width W] [--checkpoint PATH] [--no-crops]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from .object_learning import ObjectCandidate, ObjectLearner
+from .phash import box_phashes
+from .tracker import box_iou
+from .lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.webp', '.tif', '.tiff'}
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """A checkpointable slice of the input: a run of video frames or a batch of images"""
+    source: str
+    start: int = 0                  # first video frame
+    stop: int = 0                   # frame after the last; -1 = end of video
+    images: Tuple[str, ...] = ()
+
+    @property
+    def keys(self) -> List[str]:
+        """Checkpoint keys: one per image, or one for the video segment"""
+        if self.images:
+            return list(self.images)
+        return [f"{self.source}#{self.start}-{self.stop}"]
+
+@dataclass
+class DecodedFrame:
+    source: str
+    frame_index: int
+    timestamp_s: float
+    image: np.ndarray
+
+@dataclass
+class IngestStats:
+    units: int = 0
+    frames: int = 0
+    objects: int = 0
+    candidates: int = 0
+    duplicates: int = 0   # matched a candidate already stored or found earlier
+    known: int = 0        # matched a term already learned in the language
+    elapsed_s: float = 0.0
+    decode_wait_s: float = 0.0
+    detect_s: float = 0.0
+    write_s: float = 0.0
+
+    def add(self, other: "IngestStats") -> None:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+    def report(self) -> str:
+        seconds = max(self.elapsed_s, 1e-9)
+        return (
+            f"{self.frames} frames, {self.objects} objects in {self.elapsed_s:.1f}s: "
+            f"{self.frames / seconds:.1f} frames/s, {self.objects / seconds:.1f} objects/s\n"
+            f"{self.candidates} candidates written; skipped {self.duplicates} duplicates "
+            f"and {self.known} known objects\n"
+            f"waiting for decode {self.decode_wait_s:.1f}s, detecting {self.detect_s:.1f}s, "
+            f"writing {self.write_s:.1f}s"
+        )
+
+class IngestCheckpoint:
+    """Append-only record of finished work units and their stats
+
+    One JSON line per unit, so saving stays cheap however many units are
+    done; a line cut short by a crash is ignored on load.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        self.totals = IngestStats()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.done.update(entry['keys'])
+                    self.totals.add(IngestStats(**entry['stats']))
+
+    def mark_done(self, unit: WorkUnit, stats: IngestStats) -> None:
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'keys': unit.keys, 'stats': asdict(stats)}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(unit.keys)
+        self.totals.add(stats)
+
+def plan_units(sources: Sequence[str],
+               segment_frames: int = 900,
+               images_per_unit: int = 32,
+               done: Optional[Set[str]] = None) -> List[WorkUnit]:
+    """Split video files, image files and image directories into work units
+
+    Units whose checkpoint keys are all in `done` are left out. Video
+    segment keys depend on segment_frames, so keep it the same when
+    resuming.
+    """
+    done = done or set()
+    images: List[str] = []
+    units: List[WorkUnit] = []
+    for source in sources:
+        source = os.path.abspath(source)
+        if os.path.isdir(source):
+            images.extend(sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(source)
+                for name in names
+                if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+            ))
+        elif os.path.splitext(source)[1].lower() in IMAGE_EXTENSIONS:
+            images.append(source)
+        else:
+            capture = cv2.VideoCapture(source)
+            count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            capture.release()
+            if count <= 0:
+                segments = [WorkUnit(source, 0, -1)]  # length unknown: one unit
+            else:
+                segments = [WorkUnit(source, start, min(start + segment_frames, count))
+                            for start in range(0, count, segment_frames)]
+            units.extend(unit for unit in segments if unit.keys[0] not in done)
+
+    images = [path for path in images if path not in done]
+    for start in range(0, len(images), images_per_unit):
+        batch = tuple(images[start:start + images_per_unit])
+        units.append(WorkUnit(os.path.dirname(batch[0]), images=batch))
+    return units
+
+def _shrink(image: np.ndarray, width: int) -> np.ndarray:
+    if width and image.shape[1] > width:
+        height = max(1, round(image.shape[0] * width / image.shape[1]))
+        image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    return image
+
+def _init_worker() -> None:
+    # One decode per process; OpenCV's own threads would just contend
+    cv2.setNumThreads(1)
+
+def decode_unit(unit: WorkUnit, width: int, sample_fps: Optional[float]) -> List[DecodedFrame]:
+    """Decode a work unit's frames, shrunk to at most `width` pixels wide (worker process)
+
+    Video frames are sampled every round(fps / sample_fps) frames,
+    counted from the start of the video so segments line up; skipped
+    frames are grabbed without being converted.
+    """
+    frames = []
+    if unit.images:
+        for path in unit.images:
+            image = cv2.imread(path)
+            if image is not None:
+                frames.append(DecodedFrame(path, 0, 0.0, _shrink(image, width)))
+        return frames
+
+    capture = cv2.VideoCapture(unit.source)
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    step = max(1, round(fps / sample_fps)) if sample_fps else 1
+    if unit.start:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, unit.start)
+    index = unit.start
+    while unit.stop < 0 or index < unit.stop:
+        if index % step == 0:
+            ok, image = capture.read()
+            if not ok:
+                break
+            frames.append(DecodedFrame(unit.source, index, index / fps, _shrink(image, width)))
+        elif not capture.grab():
+            break
+        index += 1
+    capture.release()
+    return frames
+
+def sam_detections(detector, frame: np.ndarray,
+                   points_per_side: int = 8,
+                   min_confidence: float = 0.85,
+                   max_overlap: float = 0.8) -> List[Dict]:
+    """Objects in a BGR frame from a grid of SAM point prompts
+
+    All prompts go through the mask decoder together; near-identical masks
+    (from several points on one object) are kept once. Results have the
+    same keys as ObjectLearner.detect_objects, with object_class 'segment'.
+    """
+    height, width = frame.shape[:2]
+    detector.set_image(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    xs = (np.arange(points_per_side) + 0.5) * width / points_per_side
+    ys = (np.arange(points_per_side) + 0.5) * height / points_per_side
+    points = [(int(x), int(y)) for y in ys for x in xs]
+
+    objects = [obj for obj in detector.detect_objects_at_points(points)
+               if obj is not None and obj.confidence >= min_confidence]
+    objects.sort(key=lambda obj: obj.confidence, reverse=True)
+    boxes: List[Tuple[int, int, int, int]] = []
+    kept = []
+    for obj in objects:
+        x1, y1, x2, y2 = obj.bbox
+        box = (x1, y1, x2 - x1 + 1, y2 - y1 + 1)
+        if boxes and box_iou([box], boxes).max() > max_overlap:
+            continue
+        boxes.append(box)
+        kept.append(obj)
+    if not kept:
+        return []
+
+    hashes = box_phashes(frame, np.array(boxes))
+    return [{
+        'object_class': 'segment',
+        'confidence': obj.confidence,
+        'bbox': box,
+        'image_hash': int(image_hash)
+    } for obj, box, image_hash in zip(kept, boxes, hashes)]
+
+class BatchIngester:
+    """Detects objects in decoded frames, dedupes them by pHash and stores the new ones"""
+
+    def __init__(self,
+                 learner: ObjectLearner,
+                 language: str,
+                 detect: Optional[Callable[[np.ndarray], List[Dict]]] = None,
+                 crops: bool = True):
+        self.learner = learner
+        self.language = language
+        self.detect = detect or learner.detect_objects
+        self.crops = crops
+        # Candidates stored by earlier runs, plus those found in this one
+        self.index = learner.candidate_index(language)
+        self._found = 0
+
+    async def ingest_frames(self, frames: List[DecodedFrame], stats: IngestStats) -> None:
+        candidates = []
+        for frame in frames:
+            start = time.perf_counter()
+            detections = self.detect(frame.image)
+            stats.detect_s += time.perf_counter() - start
+            stats.frames += 1
+            stats.objects += len(detections)
+
+            for detection in detections:
+                image_hash = detection['image_hash']
+                if self.learner.knows(image_hash, self.language):
+                    stats.known += 1
+                    continue
+                if self.index.query(image_hash, self.learner.hash_match_radius):
+                    stats.duplicates += 1
+                    continue
+                # Negative keys can't collide with stored row ids
+                self._found += 1
+                self.index.add(-self._found, image_hash)
+                candidates.append(ObjectCandidate(
+                    object_class=str(detection['object_class']),
+                    language=self.language,
+                    image_hash=image_hash,
+                    source=frame.source,
+                    frame_index=frame.frame_index,
+                    timestamp_s=frame.timestamp_s,
+                    bbox=tuple(int(v) for v in detection['bbox']),
+                    confidence=float(detection['confidence']),
+                    crop=self._crop(frame.image, detection['bbox']) if self.crops else None
+                ))
+
+        start = time.perf_counter()
+        stats.candidates += await self.learner.add_candidates_bulk(candidates)
+        stats.write_s += time.perf_counter() - start
+
+    @staticmethod
+    def _crop(image: np.ndarray, bbox) -> Optional[bytes]:
+        x, y, w, h = (int(v) for v in bbox)
+        crop = image[max(y, 0):max(y + h, 0), max(x, 0):max(x + w, 0)]
+        if crop.size == 0:
+            return None
+        ok, encoded = cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        return encoded.tobytes() if ok else None
+
+async def ingest(learner: ObjectLearner,
+                 sources: Sequence[str],
+                 language: str,
+                 detect: Optional[Callable[[np.ndarray], List[Dict]]] = None,
+                 workers: int = 0,
+                 sample_fps: Optional[float] = 1.0,
+                 width: int = 1280,
+                 segment_frames: int = 900,
+                 images_per_unit: int = 32,
+                 checkpoint: Optional[IngestCheckpoint] = None,
+                 crops: bool = True,
+                 on_unit: Optional[Callable[[WorkUnit, IngestStats], None]] = None) -> IngestStats:
+    """Ingest sources into learner's candidate table; returns this run's stats
+
+    Args:
+        workers: Decoding processes (0 decodes on a thread of this process)
+        sample_fps: Video frames per second to ingest (None: every frame)
+        width: Frames are shrunk to at most this width before detection
+        checkpoint: Skip units it has done and record the ones finished now
+        on_unit: Called with each finished unit and its stats
+    """
+    units = plan_units(sources, segment_frames, images_per_unit,
+                       checkpoint.done if checkpoint is not None else None)
+    ingester = BatchIngester(learner, language, detect, crops)
+    stats = IngestStats()
+    started = time.perf_counter()
+
+    loop = asyncio.get_running_loop()
+    executor = None
+    if workers > 0:
+        # spawn, not fork: the parent may already hold OpenCV/torch threads
+        executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_worker)
+    # Decode a couple of units per worker ahead of detection
+    lookahead = max(2, 2 * workers)
+    remaining = iter(units)
+    pending = deque()
+
+    def submit() -> None:
+        unit = next(remaining, None)
+        if unit is not None:
+            pending.append((unit, loop.run_in_executor(executor, decode_unit, unit, width, sample_fps)))
+
+    try:
+        for _ in range(lookahead):
+            submit()
+        while pending:
+            unit, decoding = pending.popleft()
+            unit_stats = IngestStats(units=1)
+            start = time.perf_counter()
+            frames = await decoding
+            unit_stats.decode_wait_s = time.perf_counter() - start
+            submit()
+
+            await ingester.ingest_frames(frames, unit_stats)
+            unit_stats.elapsed_s = time.perf_counter() - start
+            if checkpoint is not None:
+                checkpoint.mark_done(unit, unit_stats)
+            stats.add(unit_stats)
+            if on_unit is not None:
+                on_unit(unit, unit_stats)
+    finally:
+        # Don't decode ahead for a run that stopped early (shutdown's
+        # cancel_futures would do this, but needs Python 3.9)
+        for _, decoding in pending:
+            decoding.cancel()
+        if executor is not None:
+            # Let the cancellations reach the pool's futures first
+            await asyncio.sleep(0)
+            executor.shutdown(wait=True)
+    stats.elapsed_s = time.perf_counter() - started
+    return stats
+
+def main(argv: Optional[Sequence[str]] = None) -> IngestStats:
+    parser = argparse.ArgumentParser(prog="python -m lingualearn.ingest", description=__doc__.splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="video files, images and image directories")
+    parser.add_argument("--language", required=True, help="language the candidates need terms in")
+    parser.add_argument("--db", default="object_terms.db")
+    parser.add_argument("--detector", choices=["yolo", "sam"], default="yolo")
+    parser.add_argument("--sam-model", default="vit_b", help="SAM backbone for --detector sam")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="decoding processes (0: decode in this process)")
+    parser.add_argument("--sample-fps", type=float, default=1.0, help="video frames per second to ingest (0: all)")
+    parser.add_argument("--width", type=int, default=1280, help="frames are shrunk to at most this width")
+    parser.add_argument("--segment-frames", type=int, default=900, help="video frames per checkpointed unit")
+    parser.add_argument("--checkpoint", default=None, help="progress file (default: DB path + .ingest.jsonl)")
+    parser.add_argument("--no-checkpoint", action="store_true")
+    parser.add_argument("--no-crops", action="store_true", help="don't store a JPEG of each candidate")
+    args = parser.parse_args(argv)
+
+    learner = ObjectLearner(args.db)
+    detect = None
+    if args.detector == "sam":
+        from .sam_integration import SAMObjectDetector
+        sam = SAMObjectDetector(model_type=args.sam_model)
+        detect = lambda frame: sam_detections(sam, frame)
+
+    checkpoint = None
+    if not args.no_checkpoint:
+        checkpoint = IngestCheckpoint(args.checkpoint or args.db + ".ingest.jsonl")
+        if checkpoint.done:
+            print(f"Resuming: {checkpoint.totals.units} units already done")
+
+    def progress(unit: WorkUnit, stats: IngestStats) -> None:
+        where = f"{len(unit.images)} images in {unit.source}" if unit.images else \
+            f"{unit.source} frames {unit.start}-{unit.stop if unit.stop >= 0 else 'end'}"
+        print(f"{where}: {stats.frames} frames, {stats.candidates} new candidates")
+
+    try:
+        stats = asyncio.run(ingest(
+            learner, args.sources, args.language, detect,
+            workers=args.workers,
+            sample_fps=args.sample_fps or None,
+            width=args.width,
+            segment_frames=args.segment_frames,
+            checkpoint=checkpoint,
+            crops=not args.no_crops,
+            on_unit=progress
+        ))
+    finally:
+        learner.close()
+    print(stats.report())
+    if checkpoint is not None and checkpoint.totals.units > stats.units:
+        print(f"All runs: {checkpoint.totals.frames} frames, {checkpoint.totals.candidates} candidates")
+    return stats
+
+if __name__ == "__main__":
+    main()
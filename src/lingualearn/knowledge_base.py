@@ -1,8 +1,103 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
 import sqlite3
 import json
 from dataclasses import dataclass
 from datetime import datetime
+from .db_engine import AsyncSQLiteEngine, WriteBehindQueue
+
+# Applied in order by _init_database; PRAGMA user_version records how many have run.
+# Append new steps, never edit old ones.
+SCHEMA_MIGRATIONS: List[List[str]] = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS translations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_text TEXT NOT NULL,
+            target_text TEXT NOT NULL,
+            source_lang TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            context TEXT,
+            confidence_score REAL DEFAULT 0.0,
+            usage_count INTEGER DEFAULT 0,
+            last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(source_text, target_text, source_lang, target_lang)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS contextual_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_lang TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            rule_type TEXT NOT NULL,
+            rule_content TEXT NOT NULL,
+            confidence_score REAL DEFAULT 0.0,
+            UNIQUE(source_lang, target_lang, rule_type, rule_content)
+        )
+        """,
+    ],
+    [
+        # Covers get_translation: equality on the language pair and text,
+        # ordered by confidence, with every selected column in the index
+        """
+        CREATE INDEX IF NOT EXISTS idx_translations_lookup ON translations (
+            source_lang, target_lang, source_text, confidence_score DESC,
+            target_text, context, usage_count, last_used
+        )
+        """,
+        # Covers get_contextual_rules: language pair plus a confidence range
+        """
+        CREATE INDEX IF NOT EXISTS idx_rules_lookup ON contextual_rules (
+            source_lang, target_lang, confidence_score, rule_type, rule_content
+        )
+        """,
+    ],
+]
+
+SELECT_TRANSLATION_SQL = """
+    SELECT * FROM translations
+    WHERE source_text = ?
+    AND source_lang = ?
+    AND target_lang = ?
+    ORDER BY confidence_score DESC
+    LIMIT 1
+"""
+
+SELECT_RULES_SQL = """
+    SELECT rule_type, rule_content, confidence_score
+    FROM contextual_rules
+    WHERE source_lang = ?
+    AND target_lang = ?
+    AND confidence_score >= ?
+"""
+
+INSERT_TRANSLATION_SQL = """
+    INSERT OR REPLACE INTO translations
+    (source_text, target_text, source_lang, target_lang, context,
+     confidence_score, usage_count, last_used)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_RULE_SQL = """
+    INSERT OR REPLACE INTO contextual_rules
+    (source_lang, target_lang, rule_type, rule_content)
+    VALUES (?, ?, ?, ?)
+"""
+
+UPDATE_CONFIDENCE_SQL = """
+    UPDATE translations
+    SET confidence_score = ROUND(CASE
+        WHEN confidence_score + ? > 1.0 THEN 1.0
+        WHEN confidence_score + ? < 0.0 THEN 0.0
+        ELSE confidence_score + ?
+        END, 2),
+        usage_count = usage_count + 1,
+        last_used = CURRENT_TIMESTAMP
+    WHERE source_text = ?
+    AND target_text = ?
+    AND source_lang = ?
+    AND target_lang = ?
+"""
 
 @dataclass
 class TranslationEntry:
@@ -16,94 +111,139 @@ class TranslationEntry:
     last_used: datetime = datetime.now()
 
 class KnowledgeBase:
-    def __init__(self, db_path: str = 'translations.db'):
-        """Initialize the knowledge base"""
+    def __init__(self,
+                 db_path: str = 'translations.db',
+                 pool_size: int = 4,
+                 write_behind_ms: Optional[float] = None):
+        """Initialize the knowledge base
+
+        Args:
+            db_path: Path to the SQLite database file
+            pool_size: Number of reader threads and pooled read connections
+            write_behind_ms: If set, single-row writes arriving within this
+                window are grouped into one commit
+        """
         self.db_path = db_path
+        self._engine = AsyncSQLiteEngine(db_path, pool_size=pool_size)
+        self._write_behind = (
+            WriteBehindQueue(self._engine, delay=write_behind_ms / 1000)
+            if write_behind_ms is not None else None
+        )
         self._init_database()
 
+    def close(self) -> None:
+        """Commit queued write-behind writes, finish pending database work and close all connections"""
+        if self._write_behind is not None:
+            self._write_behind.close()
+        self._engine.close()
+
+    def __enter__(self) -> 'KnowledgeBase':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    async def __aenter__(self) -> 'KnowledgeBase':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        # Closing waits for the DB threads, so keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def flush(self) -> None:
+        """Commit any writes still waiting in the write-behind queue"""
+        if self._write_behind is not None:
+            await self._write_behind.flush()
+
+    async def _execute_write(self, sql: str, params: Tuple) -> None:
+        """Run a single-row write, grouped with its neighbours if write-behind is on"""
+        if self._write_behind is not None:
+            await self._write_behind.submit(sql, params)
+        else:
+            await self._engine.write(self._execute, sql, params)
+
+    @staticmethod
+    def _execute(conn: sqlite3.Connection, sql: str, params: Tuple) -> None:
+        conn.execute(sql, params)
+
+    @staticmethod
+    def _execute_many(conn: sqlite3.Connection, sql: str, rows: Iterable[Tuple]) -> int:
+        return conn.executemany(sql, rows).rowcount
+
+    @staticmethod
+    def _translation_row(entry: TranslationEntry) -> Tuple:
+        return (
+            entry.source_text,
+            entry.target_text,
+            entry.source_lang,
+            entry.target_lang,
+            entry.context,
+            entry.confidence_score,
+            entry.usage_count,
+            entry.last_used
+        )
+
     def _init_database(self) -> None:
-        """Create the necessary database tables"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS translations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source_text TEXT NOT NULL,
-                    target_text TEXT NOT NULL,
-                    source_lang TEXT NOT NULL,
-                    target_lang TEXT NOT NULL,
-                    context TEXT,
-                    confidence_score REAL DEFAULT 0.0,
-                    usage_count INTEGER DEFAULT 0,
-                    last_used TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(source_text, target_text, source_lang, target_lang)
-                )
-            """)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS contextual_rules (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source_lang TEXT NOT NULL,
-                    target_lang TEXT NOT NULL,
-                    rule_type TEXT NOT NULL,
-                    rule_content TEXT NOT NULL,
-                    confidence_score REAL DEFAULT 0.0,
-                    UNIQUE(source_lang, target_lang, rule_type, rule_content)
-                )
-            """)
+        """Create the tables and bring the schema up to the latest version"""
+        with self._engine.write_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for step in SCHEMA_MIGRATIONS[version:]:
+                for statement in step:
+                    conn.execute(statement)
+            if version < len(SCHEMA_MIGRATIONS):
+                conn.execute(f"PRAGMA user_version = {len(SCHEMA_MIGRATIONS)}")
 
     async def add_translation(self, entry: TranslationEntry) -> bool:
         """Add a new translation entry or update existing one"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT OR REPLACE INTO translations
-                    (source_text, target_text, source_lang, target_lang, context,
-                     confidence_score, usage_count, last_used)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    entry.source_text,
-                    entry.target_text,
-                    entry.source_lang,
-                    entry.target_lang,
-                    entry.context,
-                    entry.confidence_score,
-                    entry.usage_count,
-                    entry.last_used
-                ))
-                return True
+            await self._execute_write(INSERT_TRANSLATION_SQL, self._translation_row(entry))
+            return True
         except Exception as e:
             print(f"Error adding translation: {e}")
             return False
 
+    async def add_translations_bulk(self, entries: Iterable[TranslationEntry]) -> int:
+        """Add or update many translation entries in a single transaction
+
+        Returns:
+            Number of rows written, or 0 if the transaction was rolled back
+        """
+        rows = [self._translation_row(entry) for entry in entries]
+        if not rows:
+            return 0
+        try:
+            return await self._engine.write(self._execute_many, INSERT_TRANSLATION_SQL, rows)
+        except Exception as e:
+            print(f"Error adding translations: {e}")
+            return 0
+
     async def get_translation(self, 
                             source_text: str,
                             source_lang: str,
                             target_lang: str) -> Optional[TranslationEntry]:
         """Retrieve a translation if it exists"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT * FROM translations
-                WHERE source_text = ? 
-                AND source_lang = ? 
-                AND target_lang = ?
-                ORDER BY confidence_score DESC
-                LIMIT 1
-            """, (source_text, source_lang, target_lang))
-            
-            row = cursor.fetchone()
-            if row:
-                return TranslationEntry(
-                    source_text=row[1],
-                    target_text=row[2],
-                    source_lang=row[3],
-                    target_lang=row[4],
-                    context=row[5],
-                    confidence_score=row[6],
-                    usage_count=row[7],
-                    last_used=datetime.fromisoformat(row[8])
-                )
+        row = await self._engine.read(self._select_translation, source_text, source_lang, target_lang)
+        if row:
+            return TranslationEntry(
+                source_text=row[1],
+                target_text=row[2],
+                source_lang=row[3],
+                target_lang=row[4],
+                context=row[5],
+                confidence_score=row[6],
+                usage_count=row[7],
+                last_used=datetime.fromisoformat(row[8])
+            )
         return None
 
+    @staticmethod
+    def _select_translation(conn: sqlite3.Connection,
+                            source_text: str,
+                            source_lang: str,
+                            target_lang: str) -> Optional[Tuple]:
+        cursor = conn.execute(SELECT_TRANSLATION_SQL, (source_text, source_lang, target_lang))
+        return cursor.fetchone()
+
     async def learn_contextual_rule(self,
                                   source_lang: str,
                                   target_lang: str,
@@ -111,40 +251,56 @@ class KnowledgeBase:
                                   rule_content: Dict) -> None:
         """Learn a new translation rule from context"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    INSERT OR REPLACE INTO contextual_rules
-                    (source_lang, target_lang, rule_type, rule_content)
-                    VALUES (?, ?, ?, ?)
-                """, (
-                    source_lang,
-                    target_lang,
-                    rule_type,
-                    json.dumps(rule_content)
-                ))
+            await self._execute_write(
+                INSERT_RULE_SQL,
+                (source_lang, target_lang, rule_type, json.dumps(rule_content))
+            )
         except Exception as e:
             print(f"Error learning rule: {e}")
 
+    async def learn_contextual_rules_bulk(self,
+                                        rules: Iterable[Tuple[str, str, str, Dict]]
+                                        ) -> int:
+        """Learn many rules in a single transaction
+
+        Args:
+            rules: (source_lang, target_lang, rule_type, rule_content) tuples
+
+        Returns:
+            Number of rows written, or 0 if the transaction was rolled back
+        """
+        rows = [
+            (source_lang, target_lang, rule_type, json.dumps(rule_content))
+            for source_lang, target_lang, rule_type, rule_content in rules
+        ]
+        if not rows:
+            return 0
+        try:
+            return await self._engine.write(self._execute_many, INSERT_RULE_SQL, rows)
+        except Exception as e:
+            print(f"Error learning rules: {e}")
+            return 0
+
     async def get_contextual_rules(self,
                                  source_lang: str,
                                  target_lang: str,
                                  min_confidence: float = 0.5
                                  ) -> List[Dict]:
         """Get learned translation rules for a language pair"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT rule_type, rule_content, confidence_score
-                FROM contextual_rules
-                WHERE source_lang = ?
-                AND target_lang = ?
-                AND confidence_score >= ?
-            """, (source_lang, target_lang, min_confidence))
-            
-            return [{
-                'type': row[0],
-                'content': json.loads(row[1]),
-                'confidence': row[2]
-            } for row in cursor.fetchall()]
+        rows = await self._engine.read(self._select_rules, source_lang, target_lang, min_confidence)
+        return [{
+            'type': row[0],
+            'content': json.loads(row[1]),
+            'confidence': row[2]
+        } for row in rows]
+
+    @staticmethod
+    def _select_rules(conn: sqlite3.Connection,
+                      source_lang: str,
+                      target_lang: str,
+                      min_confidence: float) -> List[Tuple]:
+        cursor = conn.execute(SELECT_RULES_SQL, (source_lang, target_lang, min_confidence))
+        return cursor.fetchall()
 
     async def update_confidence(self,
                               source_text: str,
@@ -153,20 +309,9 @@ class KnowledgeBase:
                               target_lang: str,
                               success: bool) -> None:
         """Update confidence score based on translation success"""
-        with sqlite3.connect(self.db_path) as conn:
-            # Increase or decrease confidence based on success
-            delta = 0.1 if success else -0.1
-            conn.execute("""
-                UPDATE translations
-                SET confidence_score = ROUND(CASE
-                    WHEN confidence_score + ? > 1.0 THEN 1.0
-                    WHEN confidence_score + ? < 0.0 THEN 0.0
-                    ELSE confidence_score + ?
-                    END, 2),
-                    usage_count = usage_count + 1,
-                    last_used = CURRENT_TIMESTAMP
-                WHERE source_text = ?
-                AND target_text = ?
-                AND source_lang = ?
-                AND target_lang = ?
-            """, (delta, delta, delta, source_text, target_text, source_lang, target_lang))
\ No newline at end of file
+        # Increase or decrease confidence based on success
+        delta = 0.1 if success else -0.1
+        await self._execute_write(
+            UPDATE_CONFIDENCE_SQL,
+            (delta, delta, delta, source_text, target_text, source_lang, target_lang)
+        )
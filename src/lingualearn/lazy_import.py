@@ -0,0 +1,49 @@
+import importlib
+import importlib.util
+import sys
+import types
+from typing import Dict
+
+class _MissingModule(types.ModuleType):
+    """Stands in for an optional dependency that is not installed"""
+
+    def __getattr__(self, attr: str):
+        raise ImportError(f"{self.__name__} is required for this feature but is not installed")
+
+class _DeferredModule(types.ModuleType):
+    """Stands in for a module until one of its attributes is used, then imports it
+
+    The real import runs through importlib.import_module, unchanged:
+    wrapping packages like torch in importlib's LazyLoader breaks their
+    own circular submodule imports.
+    """
+
+    def __getattr__(self, attr: str):
+        module = self.__dict__.get('_module')
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_module'] = module
+        return getattr(module, attr)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__name__))
+
+# One stand-in per name, so attributes patched on it are seen by every user
+_deferred: Dict[str, types.ModuleType] = {}
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Module that is only imported when one of its attributes is used
+
+    Keeps torch, OpenCV, Whisper and friends out of `import lingualearn`
+    so routes that never touch them start fast. A module that is not
+    installed raises ImportError on first use rather than on import.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if name not in _deferred:
+        if importlib.util.find_spec(name) is None:
+            _deferred[name] = _MissingModule(name)
+        else:
+            _deferred[name] = _DeferredModule(name)
+    return _deferred[name]
@@ -41,13 +41,15 @@ class LearningEngine:
 
     async def _analyze_patterns(self, entry: TranslationEntry) -> None:
         """Analyze translation for patterns to learn"""
+        rules = []
+
         # Look for grammatical patterns
         grammar_patterns = self._extract_grammar_patterns(
             entry.source_text,
             entry.target_text
         )
         for pattern in grammar_patterns:
-            await self.kb.learn_contextual_rule(
+            rules.append((
                 entry.source_lang,
                 entry.target_lang,
                 'grammar',
@@ -56,7 +58,7 @@ class LearningEngine:
                     'target_pattern': pattern.target_pattern,
                     'examples': pattern.examples
                 }
-            )
+            ))
 
         # Look for idiomatic expressions
         idiom_patterns = self._extract_idioms(
@@ -66,7 +68,7 @@ class LearningEngine:
             entry.target_lang
         )
         for pattern in idiom_patterns:
-            await self.kb.learn_contextual_rule(
+            rules.append((
                 entry.source_lang,
                 entry.target_lang,
                 'idiom',
@@ -75,7 +77,11 @@ class LearningEngine:
                     'target_idiom': pattern.target_pattern,
                     'context': entry.context
                 }
-            )
+            ))
+
+        # Store every learned rule in one transaction
+        if rules:
+            await self.kb.learn_contextual_rules_bulk(rules)
 
     def _extract_grammar_patterns(self,
                                 source_text: str,
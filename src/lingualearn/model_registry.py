@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+class ModelKey(NamedTuple):
+    kind: str                        # 'sam', 'yolo', 'whisper', 'spacy'
+    name: str                        # model type / size / package name
+    checkpoint: Optional[str] = None
+    device: Optional[str] = None
+
+@dataclass
+class ModelRecord:
+    key: ModelKey
+    model: Any
+    load_seconds: float
+    nbytes: Optional[int]            # None when it could not be measured
+    hits: int = 0
+
+def _module_nbytes(model: Any) -> Optional[int]:
+    """Parameter and buffer bytes of a torch module (Whisper, SAM)"""
+    try:
+        import torch
+    except ImportError:
+        return None
+    if not isinstance(model, torch.nn.Module):
+        return None
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux only)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+class ModelRegistry:
+    """Process-wide store of loaded models, one instance per ModelKey
+
+    Models load on first get() (or warm_up()); concurrent requests for the
+    same key wait for a single load instead of loading twice. Loaders are
+    supplied by the callers, which keeps framework imports out of here.
+    """
+
+    def __init__(self):
+        self._records: Dict[ModelKey, ModelRecord] = {}
+        self._locks: Dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: ModelKey, loader: Callable[[], Any]) -> Any:
+        """Return the model for key, calling loader() the first time"""
+        record = self._records.get(key)
+        if record is None:
+            with self._key_lock(key):
+                record = self._records.get(key)
+                if record is None:
+                    record = self._load(key, loader)
+                    self._records[key] = record
+                    return record.model
+        record.hits += 1
+        return record.model
+
+    def warm_up(self, key: ModelKey, loader: Callable[[], Any]) -> Future:
+        """Load a model on a background thread; the future yields the model"""
+        future: Future = Future()
+
+        def run():
+            try:
+                future.set_result(self.get(key, loader))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"warm-up-{key.kind}", daemon=True).start()
+        return future
+
+    def is_loaded(self, key: ModelKey) -> bool:
+        return key in self._records
+
+    def release(self, key: ModelKey) -> bool:
+        """Forget a model so it can be garbage collected; returns if it was loaded"""
+        return self._records.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def records(self) -> List[ModelRecord]:
+        return list(self._records.values())
+
+    def memory_usage(self) -> Dict[ModelKey, Optional[int]]:
+        """Bytes held by each loaded model
+
+        Torch modules report their parameter and buffer size; other models
+        (spaCy pipelines, OpenCV networks) the growth in RSS while loading,
+        which is approximate when several load at once.
+        """
+        return {key: record.nbytes for key, record in self._records.items()}
+
+    def _key_lock(self, key: ModelKey) -> threading.Lock:
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _load(self, key: ModelKey, loader: Callable[[], Any]) -> ModelRecord:
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        model = loader()
+        load_seconds = time.perf_counter() - start
+
+        nbytes = _module_nbytes(model)
+        if nbytes is None and rss_before is not None:
+            rss_after = _rss_bytes()
+            nbytes = max(rss_after - rss_before, 0) if rss_after is not None else None
+        return ModelRecord(key=key, model=model, load_seconds=load_seconds, nbytes=nbytes)
+
+# The registry shared by every detector, learner and recognizer in the process
+models = ModelRegistry()
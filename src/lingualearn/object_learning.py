@@ -1,8 +1,60 @@
 from typing import Dict, List, Optional, Tuple
-import cv2
 import numpy as np
 from dataclasses import dataclass
 from datetime import datetime
+from .db_engine import AsyncSQLiteEngine
+from .model_registry import ModelKey, models
+from .hamming_index import HammingIndex, to_signed64, to_unsigned64
+from .phash import box_phashes, image_phashes
+from .lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# Applied in order by _init_database; PRAGMA user_version records how many have run
+OBJECT_SCHEMA_MIGRATIONS: List[List[str]] = [
+    [
+        """
+        CREATE TABLE IF NOT EXISTS object_terms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            object_name TEXT NOT NULL,
+            local_term TEXT NOT NULL,
+            language TEXT NOT NULL,
+            region TEXT,
+            context TEXT,
+            dialect TEXT,
+            image_hash TEXT NOT NULL,
+            confidence REAL DEFAULT 0.5,
+            added_by TEXT,
+            verified BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(local_term, language, dialect)
+        )
+        """,
+    ],
+    [
+        # 64-bit pHash as a (signed) integer; image_hash keeps the bit string
+        "ALTER TABLE object_terms ADD COLUMN phash INTEGER",
+    ],
+    [
+        # Objects found by batch ingestion, waiting for a linguist to name them
+        """
+        CREATE TABLE IF NOT EXISTS object_candidates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            object_class TEXT,
+            language TEXT NOT NULL,
+            phash INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            frame_index INTEGER,
+            timestamp_s REAL,
+            bbox TEXT,
+            confidence REAL,
+            crop BLOB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_object_candidates_language ON object_candidates(language)",
+    ],
+]
 
 @dataclass
 class ObjectTerm:
@@ -12,49 +64,118 @@ class ObjectTerm:
     region: Optional[str]    # Geographic region
     context: Optional[str]   # Usage context
     dialect: Optional[str]   # Specific dialect
-    image_hash: str         # Hash of reference image
+    image_hash: int          # 64-bit perceptual hash of reference image
     confidence: float = 0.5
     added_by: Optional[str] = None  # Linguist ID who added it
     verified: bool = False
 
+@dataclass
+class ObjectCandidate:
+    object_class: str        # Detector's label, for the linguist to confirm
+    language: str            # Language the term is wanted in
+    image_hash: int          # 64-bit perceptual hash of the object region
+    source: str              # Video or image file it was found in
+    frame_index: int = 0     # Frame within a video (0 for images)
+    timestamp_s: float = 0.0 # Position within a video
+    bbox: Tuple[int, int, int, int] = (0, 0, 0, 0)  # x, y, w, h in the ingested frame
+    confidence: float = 0.0
+    crop: Optional[bytes] = None  # JPEG of the object region
+
 class ObjectLearner:
-    def __init__(self, db_path: str = 'object_terms.db'):
+    def __init__(self, db_path: str = 'object_terms.db', pool_size: int = 2):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            pool_size: Number of reader threads and pooled read connections
+        """
         self.db_path = db_path
+        # Long-lived connections; queries run on the engine's threads, off the event loop
+        self._engine = AsyncSQLiteEngine(db_path, pool_size=pool_size)
         self._init_database()
+
+        # Hamming-radius index over stored hashes, one per language
+        self._hash_indexes: Dict[str, HammingIndex] = {}
+        self._load_hash_indexes()
+
+        # Maximum Hamming distance for two hashes to count as the same object
+        self.hash_match_radius = 10
         
-        # Initialize object detection model
-        self.object_detector = cv2.dnn_DetectionModel('yolov4-tiny.weights', 'yolov4-tiny.cfg')
-        self.object_detector.setInputParams(size=(416, 416), scale=1/255)
+        # Object detection model, loaded from the shared registry on first use
+        self.detector_key = ModelKey("yolo", "yolov4-tiny", "yolov4-tiny.weights")
         
         # Minimum confidence for object detection
         self.detection_threshold = 0.6
 
+    def close(self) -> None:
+        """Finish pending database work and close all connections"""
+        self._engine.close()
+
+    def __enter__(self) -> 'ObjectLearner':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def object_detector(self):
+        return models.get(self.detector_key, self._load_detector)
+
+    def _load_detector(self):
+        detector = cv2.dnn_DetectionModel(self.detector_key.checkpoint, 'yolov4-tiny.cfg')
+        detector.setInputParams(size=(416, 416), scale=1/255)
+        return detector
+
     def _init_database(self) -> None:
         """Initialize SQLite database for storing object terms"""
-        import sqlite3
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS object_terms (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    object_name TEXT NOT NULL,
-                    local_term TEXT NOT NULL,
-                    language TEXT NOT NULL,
-                    region TEXT,
-                    context TEXT,
-                    dialect TEXT,
-                    image_hash TEXT NOT NULL,
-                    confidence REAL DEFAULT 0.5,
-                    added_by TEXT,
-                    verified BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(local_term, language, dialect)
-                )
-            """)
+        with self._engine.write_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for step in OBJECT_SCHEMA_MIGRATIONS[version:]:
+                for statement in step:
+                    conn.execute(statement)
+            if version < len(OBJECT_SCHEMA_MIGRATIONS):
+                conn.execute(f"PRAGMA user_version = {len(OBJECT_SCHEMA_MIGRATIONS)}")
+
+            # Rows stored before the phash column existed only have the bit string
+            legacy = conn.execute(
+                "SELECT id, image_hash FROM object_terms WHERE phash IS NULL"
+            ).fetchall()
+            conn.executemany(
+                "UPDATE object_terms SET phash = ? WHERE id = ?",
+                [
+                    (to_signed64(int(bits, 2)), row_id)
+                    for row_id, bits in legacy
+                    if len(bits) == 64 and set(bits) <= {'0', '1'}
+                ]
+            )
+
+    def _load_hash_indexes(self) -> None:
+        """Build the in-memory hash indexes from the stored terms"""
+        with self._engine.read_connection() as conn:
+            rows = conn.execute(
+                "SELECT id, language, phash FROM object_terms WHERE phash IS NOT NULL"
+            ).fetchall()
+        for row_id, language, phash in rows:
+            self._hash_index(language).add(row_id, to_unsigned64(phash))
+
+    def _hash_index(self, language: str) -> HammingIndex:
+        index = self._hash_indexes.get(language)
+        if index is None:
+            index = self._hash_indexes[language] = HammingIndex()
+        return index
+
+    def _detect(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Run the detector and flatten its outputs to (N,), (N,), (N, 4)"""
+        classes, scores, boxes = self.object_detector.detect(frame)
+        return (
+            np.asarray(classes).reshape(-1),
+            np.asarray(scores, dtype=np.float32).reshape(-1),
+            np.asarray(boxes).reshape(-1, 4)
+        )
 
     async def learn_object_term(self, frame: np.ndarray, term: ObjectTerm) -> Dict[str, any]:
         """Learn a new object term from camera frame"""
         # Detect objects in frame
-        classes, scores, boxes = self.object_detector.detect(frame)
+        classes, scores, boxes = self._detect(frame)
         
         if len(boxes) == 0:
             return {
@@ -71,9 +192,7 @@ class ObjectLearner:
             }
 
         # Generate image hash for the detected object region
-        box = boxes[best_idx]
-        object_img = frame[box[1]:box[1]+box[3], box[0]:box[0]+box[2]]
-        image_hash = self._compute_image_hash(object_img)
+        image_hash = int(box_phashes(frame, boxes[best_idx:best_idx + 1])[0])
         
         # Store the term with the image hash
         term.image_hash = image_hash
@@ -89,7 +208,7 @@ class ObjectLearner:
     async def identify_object(self, frame: np.ndarray, language: str) -> List[ObjectTerm]:
         """Identify object in frame and return known local terms"""
         # Detect objects
-        classes, scores, boxes = self.object_detector.detect(frame)
+        classes, scores, boxes = self._detect(frame)
         
         if len(boxes) == 0:
             return []
@@ -100,76 +219,194 @@ class ObjectLearner:
             return []
 
         # Get image hash
-        box = boxes[best_idx]
-        object_img = frame[box[1]:box[1]+box[3], box[0]:box[0]+box[2]]
-        image_hash = self._compute_image_hash(object_img)
+        image_hash = int(box_phashes(frame, boxes[best_idx:best_idx + 1])[0])
         
         # Find matching terms
         return await self._find_terms(image_hash, language)
 
-    def _compute_image_hash(self, image: np.ndarray) -> str:
+    async def identify_objects(self, frame: np.ndarray, language: str) -> List[Dict[str, any]]:
+        """Identify every confidently detected object in frame
+
+        All boxes are hashed in one batch and matched with a single index
+        pass and database query.
+
+        Returns:
+            One dict per box with object_class, confidence, bbox (x, y, w, h),
+            image_hash and the known local terms, highest confidence first
+        """
+        return await self.lookup_terms(self.detect_objects(frame), language)
+
+    def detect_objects(self, frame: np.ndarray) -> List[Dict[str, any]]:
+        """Detect and hash the confident objects in frame, without term lookup
+
+        The CPU-bound half of identify_objects, safe to run off the event loop.
+
+        Returns:
+            One dict per box with object_class, confidence, bbox (x, y, w, h)
+            and image_hash, highest confidence first
+        """
+        classes, scores, boxes = self._detect(frame)
+        keep = scores >= self.detection_threshold
+        classes, scores, boxes = classes[keep], scores[keep], boxes[keep]
+        if len(boxes) == 0:
+            return []
+
+        hashes = [int(h) for h in box_phashes(frame, boxes)]
+        detections = [{
+            'object_class': classes[i],
+            'confidence': float(scores[i]),
+            'bbox': tuple(int(v) for v in boxes[i]),
+            'image_hash': hashes[i]
+        } for i in range(len(boxes))]
+        detections.sort(key=lambda detection: detection['confidence'], reverse=True)
+        return detections
+
+    async def lookup_terms(self, detections: List[Dict[str, any]], language: str) -> List[Dict[str, any]]:
+        """Add the known local terms to each of detect_objects' results"""
+        if not detections:
+            return []
+        terms_per_box = await self._find_terms_many(
+            [detection['image_hash'] for detection in detections], language
+        )
+        return [{**detection, 'terms': terms} for detection, terms in zip(detections, terms_per_box)]
+
+    def _compute_image_hash(self, image: np.ndarray) -> int:
         """Compute perceptual hash of image for matching"""
-        # Resize image to 8x8
-        img = cv2.resize(image, (8, 8))
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        # Compute DCT
-        dct = cv2.dct(np.float32(gray))
-        # Compute hash
-        dct_low = dct[:8, :8]
-        avg = dct_low.mean()
-        diff = dct_low > avg
-        # Convert boolean array to hash string
-        return ''.join(['1' if b else '0' for b in diff.flatten()])
+        return int(image_phashes([image])[0])
 
     async def _store_term(self, term: ObjectTerm) -> None:
         """Store object term in database"""
-        import sqlite3
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO object_terms
-                (object_name, local_term, language, region, context, dialect,
-                 image_hash, confidence, added_by, verified)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                term.object_name,
-                term.local_term,
-                term.language,
-                term.region,
-                term.context,
-                term.dialect,
-                term.image_hash,
-                term.confidence,
-                term.added_by,
-                term.verified
-            ))
-
-    async def _find_terms(self, image_hash: str, language: str) -> List[ObjectTerm]:
+        replaced, row_id = await self._engine.write(self._insert_term, term)
+        index = self._hash_index(term.language)
+        if replaced is not None:
+            index.remove(replaced)
+        index.add(row_id, term.image_hash)
+
+    @staticmethod
+    def _insert_term(conn, term: ObjectTerm) -> Tuple[Optional[int], int]:
+        """(id of the row it replaced, if any, new row id)"""
+        # INSERT OR REPLACE deletes the conflicting row, so drop it from the index too
+        replaced = conn.execute("""
+            SELECT id FROM object_terms
+            WHERE local_term = ? AND language = ? AND dialect = ?
+        """, (term.local_term, term.language, term.dialect)).fetchone()
+
+        cursor = conn.execute("""
+            INSERT OR REPLACE INTO object_terms
+            (object_name, local_term, language, region, context, dialect,
+             image_hash, phash, confidence, added_by, verified)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            term.object_name,
+            term.local_term,
+            term.language,
+            term.region,
+            term.context,
+            term.dialect,
+            format(term.image_hash, '064b'),
+            to_signed64(term.image_hash),
+            term.confidence,
+            term.added_by,
+            term.verified
+        ))
+        return (replaced[0] if replaced else None), cursor.lastrowid
+
+    async def add_candidates_bulk(self, candidates: List[ObjectCandidate]) -> int:
+        """Store many object candidates in a single transaction
+
+        Returns:
+            Number of rows written
+        """
+        rows = [(
+            candidate.object_class,
+            candidate.language,
+            to_signed64(candidate.image_hash),
+            candidate.source,
+            candidate.frame_index,
+            candidate.timestamp_s,
+            ','.join(str(int(v)) for v in candidate.bbox),
+            candidate.confidence,
+            candidate.crop
+        ) for candidate in candidates]
+        if not rows:
+            return 0
+        return await self._engine.write(self._insert_candidates, rows)
+
+    @staticmethod
+    def _insert_candidates(conn, rows: List[Tuple]) -> int:
+        return conn.executemany("""
+            INSERT INTO object_candidates
+            (object_class, language, phash, source, frame_index, timestamp_s,
+             bbox, confidence, crop)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows).rowcount
+
+    def candidate_index(self, language: str) -> HammingIndex:
+        """Hamming index over the stored candidates' hashes for a language"""
+        index = HammingIndex()
+        with self._engine.read_connection() as conn:
+            for row_id, phash in conn.execute(
+                "SELECT id, phash FROM object_candidates WHERE language = ?", (language,)
+            ):
+                index.add(row_id, to_unsigned64(phash))
+        return index
+
+    def knows(self, image_hash: int, language: str) -> bool:
+        """Whether a stored term in language matches this hash"""
+        index = self._hash_indexes.get(language)
+        return index is not None and bool(index.query(image_hash, self.hash_match_radius))
+
+    async def _find_terms(self, image_hash: int, language: str) -> List[ObjectTerm]:
         """Find matching terms for an image hash in a specific language"""
-        import sqlite3
-        terms = []
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT * FROM object_terms
-                WHERE language = ? AND
-                      (image_hash = ? OR
-                       ABS(CAST(image_hash AS INTEGER) - CAST(? AS INTEGER)) < 10)
-                ORDER BY confidence DESC
-            """, (language, image_hash, image_hash))
-            
-            for row in cursor.fetchall():
-                terms.append(ObjectTerm(
-                    object_name=row[1],
-                    local_term=row[2],
-                    language=row[3],
-                    region=row[4],
-                    context=row[5],
-                    dialect=row[6],
-                    image_hash=row[7],
-                    confidence=row[8],
-                    added_by=row[9],
-                    verified=row[10]
-                ))
-                
-        return terms
\ No newline at end of file
+        return (await self._find_terms_many([image_hash], language))[0]
+
+    async def _find_terms_many(self, image_hashes: List[int], language: str) -> List[List[ObjectTerm]]:
+        """Find matching terms for several image hashes with one database query"""
+        index = self._hash_indexes.get(language)
+        if index is None:
+            return [[] for _ in image_hashes]
+
+        ids_per_hash = [
+            [row_id for _, row_id in index.query(image_hash, self.hash_match_radius)]
+            for image_hash in image_hashes
+        ]
+        ids = list({row_id for ids in ids_per_hash for row_id in ids})
+        if not ids:
+            return [[] for _ in image_hashes]
+
+        rows = await self._engine.read(self._select_terms, ids)
+        terms = {row[0]: ObjectTerm(
+            object_name=row[1],
+            local_term=row[2],
+            language=row[3],
+            region=row[4],
+            context=row[5],
+            dialect=row[6],
+            image_hash=to_unsigned64(row[7]),
+            confidence=row[8],
+            added_by=row[9],
+            verified=bool(row[10])
+        ) for row in rows}
+
+        return [
+            sorted(
+                (terms[row_id] for row_id in ids if row_id in terms),
+                key=lambda term: term.confidence,
+                reverse=True
+            )
+            for ids in ids_per_hash
+        ]
+
+    @staticmethod
+    def _select_terms(conn, ids: List[int]) -> List[Tuple]:
+        rows = []
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows.extend(conn.execute(f"""
+                SELECT id, object_name, local_term, language, region, context,
+                       dialect, phash, confidence, added_by, verified
+                FROM object_terms
+                WHERE id IN ({','.join('?' * len(chunk))})
+            """, chunk).fetchall())
+        return rows
@@ -1,7 +1,18 @@
 from typing import List, Dict, Tuple, Optional
-import spacy
 from dataclasses import dataclass
 from collections import defaultdict
+from .model_registry import ModelKey, models
+from .lazy_import import lazy_import
+
+spacy = lazy_import("spacy")
+
+# spaCy pipeline per language; the African languages share the multilingual one
+LANGUAGE_MODELS = {
+    'en': 'en_core_web_sm',
+    'xho': 'xx_ent_wiki_sm',  # Multilingual model for Xhosa
+    'zul': 'xx_ent_wiki_sm',  # Multilingual model for Zulu
+    'afr': 'xx_ent_wiki_sm',  # Multilingual model for Afrikaans
+}
 
 @dataclass
 class LanguagePattern:
@@ -14,20 +25,15 @@ class LanguagePattern:
 
 class PatternRecognizer:
     def __init__(self):
-        # Load language models for supported languages
-        self.nlp_models = {
-            'en': spacy.load('en_core_web_sm'),
-            'xho': spacy.load('xx_ent_wiki_sm'),  # Multilingual model for Xhosa
-            'zul': spacy.load('xx_ent_wiki_sm'),  # Multilingual model for Zulu
-            'afr': spacy.load('xx_ent_wiki_sm'),  # Multilingual model for Afrikaans
-        }
+        # Pipelines load from the shared registry when a language is first used
+        self.language_models = dict(LANGUAGE_MODELS)
         
         self.min_pattern_freq = 3
         self.pattern_cache = defaultdict(int)
 
     def extract_patterns(self, text: str, lang: str) -> List[LanguagePattern]:
         """Extract linguistic patterns from text"""
-        nlp = self.nlp_models.get(lang)
+        nlp = self._nlp(lang)
         if not nlp:
             raise ValueError(f"Language model not available for {lang}")
 
@@ -48,6 +54,13 @@ class PatternRecognizer:
 
         return patterns
 
+    def _nlp(self, lang: str):
+        """spaCy pipeline for a language, or None if unsupported"""
+        name = self.language_models.get(lang)
+        if name is None:
+            return None
+        return models.get(ModelKey("spacy", name), lambda: spacy.load(name))
+
     def _extract_grammar_patterns(self, doc) -> List[LanguagePattern]:
         """Extract grammatical patterns from parsed text"""
         patterns = []
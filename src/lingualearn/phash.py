@@ -0,0 +1,109 @@
+from typing import List, Sequence
+import numpy as np
+from .lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# pHash: DCT of a 32x32 grayscale image, keep the 8x8 lowest frequencies,
+# one bit per coefficient above their median
+IMAGE_SIZE = 32
+HASH_SIZE = 8
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis (same scaling as cv2.dct)"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    basis = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+# Only the low-frequency rows are ever needed
+_DCT_LOW_T = np.ascontiguousarray(_dct_matrix(IMAGE_SIZE)[:HASH_SIZE].T)
+
+# ITU-R BT.601 luma weights in OpenCV's BGR channel order
+_BGR_TO_GRAY = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+def phash_patches(patches: np.ndarray) -> np.ndarray:
+    """Hash a stack of 32x32 grayscale patches
+
+    Args:
+        patches: Array of shape (N, 32, 32)
+
+    Returns:
+        uint64 array of shape (N,), first coefficient in the top bit
+    """
+    patches = np.asarray(patches, dtype=np.float32)
+    n = patches.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    # Separable 2-D DCT restricted to the 8x8 corner (D @ X @ D.T per patch),
+    # done as two flat matrix products over the whole stack
+    rows = (patches.reshape(n * IMAGE_SIZE, IMAGE_SIZE) @ _DCT_LOW_T).reshape(n, IMAGE_SIZE, HASH_SIZE)
+    low = (rows.transpose(0, 2, 1).reshape(n * HASH_SIZE, IMAGE_SIZE) @ _DCT_LOW_T).reshape(n, HASH_SIZE, HASH_SIZE)
+    # low[n, col, row]; put it back in row-major coefficient order
+    flat = low.transpose(0, 2, 1).reshape(n, HASH_SIZE * HASH_SIZE)
+    bits = flat > np.median(flat, axis=1, keepdims=True)
+    return np.packbits(bits, axis=1).view('>u8').ravel().astype(np.uint64)
+
+
+def _resize_patch(image: np.ndarray) -> np.ndarray:
+    """Shrink a crop to 32x32x3; grayscale crops are broadcast to 3 channels"""
+    if image.size == 0:
+        return np.zeros((IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.uint8)
+    patch = cv2.resize(image, (IMAGE_SIZE, IMAGE_SIZE), interpolation=cv2.INTER_LINEAR)
+    if patch.ndim == 2:
+        patch = np.repeat(patch[:, :, None], 3, axis=2)
+    return patch
+
+
+def _hash_color_patches(patches: List[np.ndarray]) -> np.ndarray:
+    if not patches:
+        return np.zeros(0, dtype=np.uint64)
+    # Grayscale conversion on the small patches, all at once
+    return phash_patches(np.stack(patches).astype(np.float32) @ _BGR_TO_GRAY)
+
+
+def _box_patches(frame: np.ndarray, boxes: np.ndarray) -> List[np.ndarray]:
+    height, width = frame.shape[:2]
+    patches = []
+    for x, y, w, h in np.asarray(boxes, dtype=np.int64).reshape(-1, 4):
+        x1, y1 = max(int(x), 0), max(int(y), 0)
+        x2, y2 = min(int(x + w), width), min(int(y + h), height)
+        patches.append(_resize_patch(frame[y1:max(y1, y2), x1:max(x1, x2)]))
+    return patches
+
+
+def image_phashes(images: Sequence[np.ndarray]) -> np.ndarray:
+    """Hash whole images (BGR or grayscale) in one batched DCT"""
+    return _hash_color_patches([_resize_patch(image) for image in images])
+
+
+def box_phashes(frame: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Hash every (x, y, w, h) detection box in a frame
+
+    Boxes are clipped to the frame; a box entirely outside it hashes an
+    empty patch.
+    """
+    return frames_box_phashes([frame], [boxes])[0]
+
+
+def frames_box_phashes(frames: Sequence[np.ndarray],
+                       boxes_per_frame: Sequence[np.ndarray]) -> List[np.ndarray]:
+    """Hash the detection boxes of many frames in one batched DCT
+
+    Returns:
+        One uint64 array per frame, aligned with that frame's boxes
+    """
+    patches: List[np.ndarray] = []
+    counts = []
+    for frame, boxes in zip(frames, boxes_per_frame):
+        frame_patches = _box_patches(frame, boxes)
+        patches.extend(frame_patches)
+        counts.append(len(frame_patches))
+
+    hashes = _hash_color_patches(patches)
+    return np.split(hashes, np.cumsum(counts)[:-1]) if counts else []
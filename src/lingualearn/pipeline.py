@@ -0,0 +1,371 @@
+import asyncio
+import time
+import numpy as np
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+from .frame_ring import FrameRef
+from .scene_gate import SceneGate
+from .tracker import ObjectTracker
+from .lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# Stage names in pipeline order
+PIPELINE_STAGES = ("capture", "preprocess", "detect", "lookup")
+
+@dataclass
+class PipelineConfig:
+    target_fps: Optional[float] = None  # detection rate; None = as fast as detection keeps up
+    detect_width: Optional[int] = 640   # frames wider than this are shrunk before detection
+    queue_size: int = 1                 # frames waiting between stages; the oldest is dropped
+    frame_timeout: float = 1.0          # seconds to wait for the camera before re-checking for stop
+    # Scene-change gate: frames that barely differ from the last detected
+    # one reuse its result instead of being detected (see SceneGate)
+    scene_threshold: Optional[float] = 0.01  # fraction of changed pixels; None disables the gate
+    refresh_interval: float = 5.0            # seconds before an unchanged scene is detected again
+    # With a tracker, the detector runs on every detect_every-th frame and
+    # the tracker carries boxes (with stable track IDs) through the rest;
+    # terms are looked up once per track instead of once per frame
+    tracker: Optional[ObjectTracker] = None
+    detect_every: int = 1
+
+class DropOldestQueue(asyncio.Queue):
+    """Bounded asyncio queue whose put never blocks: when full, the oldest item is dropped
+
+    on_drop is called with each dropped item (e.g. to release a pinned frame).
+    """
+
+    def __init__(self, maxsize: int = 1, on_drop: Optional[Callable[[Any], None]] = None):
+        if maxsize < 1:
+            raise ValueError("A drop-oldest queue needs room for at least one item")
+        super().__init__(maxsize)
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def put_nowait(self, item: Any) -> None:
+        if self.full():
+            oldest = self.get_nowait()
+            self.dropped += 1
+            if self.on_drop is not None:
+                self.on_drop(oldest)
+        super().put_nowait(item)
+
+    def drain(self) -> List[Any]:
+        items = []
+        while not self.empty():
+            items.append(self.get_nowait())
+        return items
+
+class StageStats:
+    """Frames handled, throughput and recent latencies for one pipeline stage"""
+
+    def __init__(self, name: str, window: int = 256):
+        self.name = name
+        self.frames = 0
+        self.dropped = 0
+        self.started = time.monotonic()
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.frames += 1
+        self._latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        elapsed = time.monotonic() - self.started
+        latencies = np.array(self._latencies) * 1000 if self._latencies else np.zeros(1)
+        return {
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'fps': self.frames / elapsed if elapsed > 0 else 0.0,
+            'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+        }
+
+@dataclass
+class PipelineFrame:
+    """A frame on its way through the pipeline"""
+    sequence: int
+    timestamp: float               # capture time (time.monotonic)
+    frame: Optional[FrameRef]      # pinned ring frame, until preprocess copies it out
+    image: Optional[np.ndarray] = None
+    scale: float = 1.0             # frame pixels per detection-image pixel
+    detections: List[Dict] = field(default_factory=list)
+
+    def release(self) -> None:
+        if self.frame is not None:
+            self.frame.release()
+            self.frame = None
+
+def preprocess_frame(image: np.ndarray, detect_width: Optional[int]) -> tuple:
+    """Shrink a frame to detect_width and convert it to 3-channel BGR
+
+    Returns:
+        (detection image, frame pixels per detection-image pixel); the
+        image never aliases the input
+    """
+    height, width = image.shape[:2]
+    scale = 1.0
+    if detect_width and width > detect_width:
+        scale = width / detect_width
+        image = cv2.resize(image, (detect_width, max(1, round(height / scale))),
+                           interpolation=cv2.INTER_AREA)
+    else:
+        image = image.copy()
+
+    # The detector and the pHash both expect BGR
+    if image.ndim == 2 or image.shape[2] == 1:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    elif image.shape[2] == 4:
+        image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    return image, scale
+
+class DetectionPipeline:
+    """Continuous capture -> preprocess -> detect -> lookup over a running camera
+
+    Each stage is its own task, joined to the next by a DropOldestQueue, so
+    the camera keeps capturing while a frame is in detection and a slow
+    stage only ever works on the newest frame. Preprocess and detect run
+    in worker threads; lookup runs on the event loop. The capture stage
+    paces itself to config.target_fps, independent of the camera's rate.
+
+    With the scene gate on, preprocess first compares a thumbnail of the
+    frame with that of the last frame sent to detection. An unchanged
+    frame skips detection and lookup: it is answered with the last result
+    (marked reused), or, while that frame's detection is still in flight,
+    skipped, so results never arrive out of order.
+
+    With config.tracker set, detect runs the detector on every
+    detect_every-th frame it receives and propagates the tracker on the
+    others; every object then carries a track_id and detected flag, and
+    lookup only queries terms for tracks it hasn't seen before.
+    """
+
+    def __init__(self,
+                 camera,
+                 learner,
+                 language: str,
+                 callback: Callable[[Dict], None],
+                 config: Optional[PipelineConfig] = None):
+        self.camera = camera
+        self.learner = learner
+        self.language = language
+        self.callback = callback
+        self.config = config or PipelineConfig()
+
+        self.stages = {name: StageStats(name) for name in PIPELINE_STAGES}
+        self.end_to_end = StageStats("end_to_end")
+        self._queues = [
+            DropOldestQueue(self.config.queue_size, on_drop=self._dropped(name))
+            for name in PIPELINE_STAGES[1:]
+        ]
+        self._stopping = False
+
+        self.gate: Optional[SceneGate] = None
+        if self.config.scene_threshold is not None:
+            self.gate = SceneGate(self.config.scene_threshold, self.config.refresh_interval)
+        self._last_objects: List[Dict] = []
+        self._in_flight = 0  # frames past the gate that haven't been published or dropped
+        self.unchanged = 0   # frames the gate kept from detection
+        self.reused = 0      # ... of which were answered with the last result
+
+        self.tracker = self.config.tracker
+        self._until_detection = 0
+        self.detector_runs = 0
+        self.term_lookups = 0
+
+    def _dropped(self, stage: str) -> Callable[[PipelineFrame], None]:
+        def drop(item: PipelineFrame) -> None:
+            self.stages[stage].dropped += 1
+            if item.image is not None:
+                self._in_flight -= 1
+            item.release()
+        return drop
+
+    def stop(self) -> None:
+        """Ask the pipeline to finish; run() returns once capture notices"""
+        self._stopping = True
+
+    @property
+    def running(self) -> bool:
+        return not self._stopping and self.camera.is_running
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage frames, drops, throughput and latency, plus end to end"""
+        stats = {name: stage.snapshot() for name, stage in self.stages.items()}
+        stats['end_to_end'] = self.end_to_end.snapshot()
+        if self.gate is not None:
+            stats['scene_gate'] = {'unchanged': self.unchanged, 'reused': self.reused}
+        if self.tracker is not None:
+            stats['tracker'] = {
+                'detector_runs': self.detector_runs,
+                'tracks': self.tracker.created,
+                'term_lookups': self.term_lookups,
+            }
+        return stats
+
+    async def run(self) -> Dict[str, Dict[str, float]]:
+        """Run until stop() or the camera stops; returns the final stats
+
+        An error in any stage (e.g. the detector or callback raising) stops
+        the pipeline and is re-raised here.
+        """
+        now = time.monotonic()
+        for stage in [*self.stages.values(), self.end_to_end]:
+            stage.started = now
+        if self.tracker is not None:
+            self.tracker.reset()
+
+        tasks = [
+            asyncio.ensure_future(self._capture()),
+            asyncio.ensure_future(self._preprocess()),
+            asyncio.ensure_future(self._detect()),
+            asyncio.ensure_future(self._lookup()),
+        ]
+        try:
+            # Capture returns on stop; the other stages only ever finish by
+            # raising (the detector, lookup or callback failing)
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for queue in self._queues:
+                for item in queue.drain():
+                    item.release()
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+        return self.stats()
+
+    async def _capture(self) -> None:
+        interval = 1 / self.config.target_fps if self.config.target_fps else 0.0
+        stats, output = self.stages['capture'], self._queues[0]
+        sequence = self.camera.ring.sequence
+        next_tick = time.monotonic()
+        while self.running:
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            start = time.monotonic()
+            try:
+                frame = await self.camera.next_frame(after=sequence, timeout=self.config.frame_timeout)
+            except asyncio.TimeoutError:
+                continue
+            sequence = frame.sequence
+            # Don't make up for a slow camera with a burst of back-to-back frames
+            next_tick = max(next_tick + interval, time.monotonic())
+            stats.record(time.monotonic() - start)
+            output.put_nowait(PipelineFrame(frame.sequence, frame.timestamp, frame))
+
+    async def _preprocess(self) -> None:
+        stats, source, output = self.stages['preprocess'], self._queues[0], self._queues[1]
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await source.get()
+            start = time.monotonic()
+            try:
+                # Copies the frame out of the ring, so its slot is free again
+                await loop.run_in_executor(None, self._prepare, item)
+            finally:
+                item.release()
+            stats.record(time.monotonic() - start)
+            if item.image is None:
+                self.unchanged += 1
+                if self._in_flight == 0:
+                    self.reused += 1
+                    self._publish(item, [dict(obj) for obj in self._last_objects], reused=True)
+                continue
+            self._in_flight += 1
+            output.put_nowait(item)
+
+    def _prepare(self, item: PipelineFrame) -> None:
+        """Gate, then preprocess, item's frame (worker thread)
+
+        Leaves item.image None when the scene hasn't changed.
+        """
+        if self.gate is not None:
+            thumbnail = self.gate.thumbnail(item.frame.image)
+            if not self.gate.changed(thumbnail, item.timestamp):
+                return
+            # Later frames are compared with this one, the newest to reach
+            # detection (drop-oldest never drops the newest)
+            self.gate.update(thumbnail, item.timestamp)
+        item.image, item.scale = preprocess_frame(item.frame.image, self.config.detect_width)
+
+    async def _detect(self) -> None:
+        stats, source, output = self.stages['detect'], self._queues[1], self._queues[2]
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await source.get()
+            start = time.monotonic()
+            try:
+                item.detections = await loop.run_in_executor(None, self._detect_or_track, item.image)
+            except BaseException:
+                self._in_flight -= 1
+                raise
+            stats.record(time.monotonic() - start)
+            output.put_nowait(item)
+
+    def _detect_or_track(self, image: np.ndarray) -> List[Dict]:
+        """Detections for one frame, from the detector or the tracker (worker thread)"""
+        if self.tracker is None:
+            self.detector_runs += 1
+            return self.learner.detect_objects(image)
+        if self._until_detection <= 0:
+            self.detector_runs += 1
+            self._until_detection = self.config.detect_every
+            tracks = self.tracker.update(self.learner.detect_objects(image), image)
+        else:
+            tracks = self.tracker.propagate(image)
+        self._until_detection -= 1
+        return [track.to_dict() for track in tracks]
+
+    async def _lookup(self) -> None:
+        stats, source = self.stages['lookup'], self._queues[2]
+        while True:
+            item = await source.get()
+            start = time.monotonic()
+            try:
+                if self.tracker is None:
+                    objects = await self.learner.lookup_terms(item.detections, self.language)
+                else:
+                    objects = await self._lookup_tracks(item.detections)
+            except BaseException:
+                self._in_flight -= 1
+                raise
+            for obj in objects:
+                obj['bbox'] = tuple(int(round(v * item.scale)) for v in obj['bbox'])
+            stats.record(time.monotonic() - start)
+
+            self._in_flight -= 1
+            self._last_objects = objects
+            self._publish(item, objects, reused=False)
+
+    async def _lookup_tracks(self, detections: List[Dict]) -> List[Dict]:
+        """Terms for tracked objects, looked up the first time each track appears"""
+        terms = {}
+        for detection in detections:
+            track = self.tracker.get(detection['track_id'])
+            if track is not None and track.terms is not None:
+                terms[detection['track_id']] = track.terms
+
+        new = [detection for detection in detections if detection['track_id'] not in terms]
+        for detection in await self.learner.lookup_terms(new, self.language):
+            terms[detection['track_id']] = detection['terms']
+            track = self.tracker.get(detection['track_id'])
+            if track is not None:
+                track.terms = detection['terms']
+        self.term_lookups += len(new)
+        return [{**detection, 'terms': terms[detection['track_id']]} for detection in detections]
+
+    def _publish(self, item: PipelineFrame, objects: List[Dict], reused: bool) -> None:
+        now = time.monotonic()
+        self.end_to_end.record(now - item.timestamp)
+        self.callback({
+            'sequence': item.sequence,
+            'timestamp': item.timestamp,
+            'objects': objects,
+            'reused': reused,
+            'latency_ms': (now - item.timestamp) * 1000,
+        })
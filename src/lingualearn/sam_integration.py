@@ -1,8 +1,42 @@
+import hashlib
 import numpy as np
-import torch
-from segment_anything import SamPredictor, sam_model_registry
-from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Sequence, Tuple, Optional
 from dataclasses import dataclass
+from .mask_geometry import mask_geometry
+from .model_registry import ModelKey, models
+from .lazy_import import lazy_import
+
+torch = lazy_import("torch")
+segment_anything = lazy_import("segment_anything")
+
+# Default memory budget for cached image embeddings (a vit_h embedding is 4 MiB)
+DEFAULT_EMBEDDING_CACHE_BYTES = 256 * 1024 * 1024
+
+# detect_all_objects: lowest predicted IoU kept, and the box overlap that
+# makes a mask a duplicate of a better one
+MIN_OBJECT_SCORE = 0.5
+DUPLICATE_BOX_IOU = 0.7
+
+# Released checkpoint for each backbone, largest and most accurate first
+SAM_CHECKPOINTS = {
+    "vit_h": "sam_vit_h_4b8939.pth",
+    "vit_l": "sam_vit_l_0b3195.pth",
+    "vit_b": "sam_vit_b_01ec64.pth",
+}
+
+def quantize_image_encoder(sam):
+    """Replace the image encoder's linear layers with dynamic int8 ones (CPU only)
+
+    The encoder is nearly all of SAM's compute and its attention and MLP
+    blocks are linear layers, so this shrinks their weights 4x and speeds
+    up CPU inference; the prompt encoder and mask decoder stay float.
+    """
+    sam.image_encoder = torch.ao.quantization.quantize_dynamic(
+        sam.image_encoder, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return sam
 
 @dataclass
 class SegmentedObject:
@@ -11,23 +45,151 @@ class SegmentedObject:
     bbox: Tuple[int, int, int, int]  # x1, y1, x2, y2
     center_point: Tuple[int, int]
     area: int
+    centroid: Optional[Tuple[float, float]] = None  # x, y center of mass
+    perimeter: Optional[float] = None  # Boundary pixel count
+
+def image_content_hash(image: np.ndarray) -> str:
+    """Fast content hash of an image's pixels, shape and dtype"""
+    image = np.ascontiguousarray(image)
+    digest = hashlib.sha1(f"{image.shape}{image.dtype}".encode())
+    digest.update(image.data)
+    return digest.hexdigest()
+
+@dataclass
+class ImageEmbedding:
+    features: "torch.Tensor"
+    original_size: Tuple[int, int]
+    input_size: Tuple[int, int]
+
+    @property
+    def nbytes(self) -> int:
+        return self.features.element_size() * self.features.nelement()
+
+class EmbeddingCache:
+    """LRU cache of SAM image embeddings, bounded by total embedding bytes"""
+
+    def __init__(self, max_bytes: int = DEFAULT_EMBEDDING_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, ImageEmbedding]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[ImageEmbedding]:
+        embedding = self._entries.get(key)
+        if embedding is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return embedding
+
+    def put(self, key: str, embedding: ImageEmbedding) -> None:
+        if embedding.nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        self._entries[key] = embedding
+        self.nbytes += embedding.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
 
 class SAMObjectDetector:
-    def __init__(self, model_type: str = "vit_h"):
+    def __init__(self,
+                 model_type: str = "vit_h",
+                 cache_bytes: int = DEFAULT_EMBEDDING_CACHE_BYTES,
+                 checkpoint: Optional[str] = None,
+                 quantize: bool = False):
         """Initialize SAM model for object detection
         
         Args:
             model_type: One of 'vit_h', 'vit_l', 'vit_b' for different model sizes
+            cache_bytes: Memory budget for cached image embeddings (0 disables)
+            checkpoint: Weights file (defaults to the model type's released checkpoint)
+            quantize: Run the image encoder with dynamic int8 weights; CPU
+                only, ignored on CUDA
         """
+        if model_type not in SAM_CHECKPOINTS:
+            raise ValueError(f"Unknown SAM model type: {model_type}")
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        # Load SAM model
-        self.sam = sam_model_registry[model_type](checkpoint="sam_vit_h_4b8939.pth")
-        self.sam.to(device=self.device)
-        self.predictor = SamPredictor(self.sam)
+        self.model_type = model_type
+        self.checkpoint = checkpoint or SAM_CHECKPOINTS[model_type]
+        self.quantize = quantize and self.device.type == 'cpu'
+        # The SAM weights come from the shared registry on first use, so
+        # detectors with the same model share one copy; the predictor holds
+        # this detector's image state
+        self._predictor = None
+
+        # Image embeddings by content hash, so re-setting a frame skips the encoder
+        self.embedding_cache = EmbeddingCache(cache_bytes)
+        self._image_key: Optional[str] = None
+
+        # Prompts decoded together by detect_objects_at_points
+        self.point_batch_size = 32
+        # Prompt grid density for detect_all_objects
+        self.points_per_side = 32
+
+    @property
+    def model_key(self) -> ModelKey:
+        name = f"{self.model_type}-int8" if self.quantize else self.model_type
+        return ModelKey("sam", name, self.checkpoint, str(self.device))
+
+    @property
+    def sam(self):
+        return models.get(self.model_key, self._load_model)
+
+    @property
+    def predictor(self) -> "segment_anything.SamPredictor":
+        if self._predictor is None:
+            self._predictor = segment_anything.SamPredictor(self.sam)
+        return self._predictor
+
+    def warm_up(self) -> Future:
+        """Start loading the SAM weights in the background"""
+        return models.warm_up(self.model_key, self._load_model)
+
+    def _load_model(self):
+        sam = segment_anything.sam_model_registry[self.model_type](checkpoint=self.checkpoint)
+        sam.to(device=self.device)
+        if self.quantize:
+            quantize_image_encoder(sam)
+        return sam
 
     def set_image(self, image: np.ndarray) -> None:
-        """Set the image for SAM to process"""
-        self.predictor.set_image(image)
+        """Set the image for SAM to process
+
+        The image encoder only runs for frames not already in the embedding
+        cache; a cached frame just restores its embedding on the predictor.
+        """
+        key = image_content_hash(image)
+        if key == self._image_key and self.predictor.is_image_set:
+            return
+
+        embedding = self.embedding_cache.get(key)
+        if embedding is None:
+            self.predictor.set_image(image)
+            embedding = ImageEmbedding(
+                features=self.predictor.features,
+                original_size=tuple(self.predictor.original_size),
+                input_size=tuple(self.predictor.input_size)
+            )
+            self.embedding_cache.put(key, embedding)
+        else:
+            self.predictor.reset_image()
+            self.predictor.features = embedding.features
+            self.predictor.original_size = embedding.original_size
+            self.predictor.input_size = embedding.input_size
+            self.predictor.is_image_set = True
+        self._image_key = key
 
     def detect_object_at_point(self, point: Tuple[int, int]) -> Optional[SegmentedObject]:
         """Detect and segment object at given point
@@ -38,80 +200,144 @@ class SAMObjectDetector:
         Returns:
             SegmentedObject if found, None otherwise
         """
-        # Convert point to format expected by SAM
-        input_point = np.array([[point[0], point[1]]])
-        input_label = np.array([1])  # 1 indicates foreground
-
-        # Generate mask
-        masks, scores, _ = self.predictor.predict(
-            point_coords=input_point,
-            point_labels=input_label,
-            multimask_output=True
-        )
+        return self.detect_objects_at_points([point])[0]
 
-        if len(masks) == 0:
-            return None
+    def detect_objects_at_points(self,
+                                 points: Sequence[Tuple[int, int]]
+                                 ) -> List[Optional[SegmentedObject]]:
+        """Detect and segment the object at each of several points
 
-        # Get best mask
-        best_mask_idx = np.argmax(scores)
-        mask = masks[best_mask_idx]
-        score = scores[best_mask_idx]
+        Each point is a separate single-click prompt. All prompts go through
+        the mask decoder together (point_batch_size at a time), and only the
+        best of each prompt's candidate masks is upscaled to full resolution.
 
-        # Calculate bounding box
-        y_indices, x_indices = np.where(mask)
-        if len(y_indices) == 0 or len(x_indices) == 0:
-            return None
+        Args:
+            points: (x, y) coordinates, one object per point
+
+        Returns:
+            One SegmentedObject (or None if its mask is empty) per point
+        """
+        if not self.predictor.is_image_set:
+            raise RuntimeError("set_image must be called before detecting objects")
 
-        x1, x2 = np.min(x_indices), np.max(x_indices)
-        y1, y2 = np.min(y_indices), np.max(y_indices)
+        results: List[Optional[SegmentedObject]] = []
+        with torch.no_grad():
+            for start in range(0, len(points), self.point_batch_size):
+                batch = np.asarray(points[start:start + self.point_batch_size], dtype=np.float32).reshape(-1, 2)
+                if len(batch) == 0:
+                    break
+                masks, scores = self._decode_points(batch)
+                results.extend(self._segmented_objects(masks, scores))
+        return results
 
-        # Calculate center point
-        center_x = (x1 + x2) // 2
-        center_y = (y1 + y2) // 2
+    def _decode_points(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Best full-resolution mask and its score for each (x, y) prompt"""
+        predictor = self.predictor
+        coords = predictor.transform.apply_coords(points, predictor.original_size)
+        coords = torch.as_tensor(coords, dtype=torch.float, device=self.device)[:, None, :]
+        labels = torch.ones((len(points), 1), dtype=torch.int, device=self.device)  # foreground
 
-        return SegmentedObject(
-            mask=mask,
-            confidence=float(score),
-            bbox=(int(x1), int(y1), int(x2), int(y2)),
-            center_point=(int(center_x), int(center_y)),
-            area=int(np.sum(mask))
+        sparse, dense = self.sam.prompt_encoder(points=(coords, labels), boxes=None, masks=None)
+        low_res_masks, iou_predictions = self.sam.mask_decoder(
+            image_embeddings=predictor.features,
+            image_pe=self.sam.prompt_encoder.get_dense_pe(),
+            sparse_prompt_embeddings=sparse,
+            dense_prompt_embeddings=dense,
+            multimask_output=True
         )
 
-    def detect_all_objects(self) -> List[SegmentedObject]:
-        """Detect and segment all objects in the image"""
-        # Generate automatic mask proposals
-        masks = self.predictor.generate()
-        
-        objects = []
-        for i, (mask, score) in enumerate(zip(masks, scores)):
-            if score < 0.5:  # Filter low confidence detections
-                continue
-
-            y_indices, x_indices = np.where(mask)
-            if len(y_indices) == 0 or len(x_indices) == 0:
-                continue
+        # Keep the highest-scoring candidate per prompt before upscaling
+        best = iou_predictions.argmax(dim=1)
+        rows = torch.arange(len(points), device=self.device)
+        masks = self.sam.postprocess_masks(
+            low_res_masks[rows, best][:, None],
+            predictor.input_size,
+            predictor.original_size
+        )[:, 0] > self.sam.mask_threshold
+        return masks.cpu().numpy(), iou_predictions[rows, best].cpu().numpy()
 
-            x1, x2 = np.min(x_indices), np.max(x_indices)
-            y1, y2 = np.min(y_indices), np.max(y_indices)
-            center_x = (x1 + x2) // 2
-            center_y = (y1 + y2) // 2
+    def _segmented_objects(self,
+                           masks: np.ndarray,
+                           scores: np.ndarray) -> List[Optional[SegmentedObject]]:
+        """Wrap a stack of masks, with geometry computed for all at once
 
+        Empty masks give None.
+        """
+        geometry = mask_geometry(masks)
+        objects: List[Optional[SegmentedObject]] = []
+        for i in range(len(geometry)):
+            if geometry.area[i] == 0:
+                objects.append(None)
+                continue
+            x1, y1, x2, y2 = (int(v) for v in geometry.bbox[i])
             objects.append(SegmentedObject(
-                mask=mask,
-                confidence=float(score),
-                bbox=(int(x1), int(y1), int(x2), int(y2)),
-                center_point=(int(center_x), int(center_y)),
-                area=int(np.sum(mask))
+                mask=masks[i],
+                confidence=float(scores[i]),
+                bbox=(x1, y1, x2, y2),
+                center_point=((x1 + x2) // 2, (y1 + y2) // 2),
+                area=int(geometry.area[i]),
+                centroid=(float(geometry.centroid[i, 0]), float(geometry.centroid[i, 1])),
+                perimeter=float(geometry.perimeter[i])
             ))
+        return objects
+
+    def detect_all_objects(self) -> List[SegmentedObject]:
+        """Detect and segment all objects in the image
+
+        Prompts the mask decoder with a points_per_side x points_per_side
+        grid over the image set by set_image, reusing its (cached)
+        embedding. Masks scoring at least MIN_OBJECT_SCORE are kept, best
+        first, dropping any whose box overlaps a kept one by more than
+        DUPLICATE_BOX_IOU.
+        """
+        if not self.predictor.is_image_set:
+            raise RuntimeError("set_image must be called before detecting objects")
 
+        height, width = self.predictor.original_size
+        steps = (np.arange(self.points_per_side) + 0.5) / self.points_per_side
+        xs, ys = np.meshgrid(steps * width, steps * height)
+        grid = np.stack([xs.ravel(), ys.ravel()], axis=1).astype(np.float32)
+
+        objects: List[SegmentedObject] = []
+        with torch.no_grad():
+            for start in range(0, len(grid), self.point_batch_size):
+                masks, scores = self._decode_points(grid[start:start + self.point_batch_size])
+                keep = scores >= MIN_OBJECT_SCORE
+                objects.extend(obj for obj in self._segmented_objects(masks[keep], scores[keep])
+                               if obj is not None)
+                # De-duplicate per batch so only distinct masks stay in memory
+                objects = self._suppress_duplicates(objects)
         return objects
 
+    @staticmethod
+    def _suppress_duplicates(objects: List[SegmentedObject]) -> List[SegmentedObject]:
+        """Greedy box NMS, highest confidence first"""
+        objects = sorted(objects, key=lambda obj: obj.confidence, reverse=True)
+        if len(objects) < 2:
+            return objects
+        boxes = np.array([obj.bbox for obj in objects], dtype=np.float32)
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        kept: List[int] = []
+        for i in range(len(objects)):
+            if kept:
+                other = boxes[kept]
+                width = np.clip(np.minimum(other[:, 2], boxes[i, 2]) - np.maximum(other[:, 0], boxes[i, 0]), 0, None)
+                height = np.clip(np.minimum(other[:, 3], boxes[i, 3]) - np.maximum(other[:, 1], boxes[i, 1]), 0, None)
+                intersection = width * height
+                iou = intersection / np.maximum(areas[kept] + areas[i] - intersection, 1e-9)
+                if (iou > DUPLICATE_BOX_IOU).any():
+                    continue
+            kept.append(i)
+        return [objects[i] for i in kept]
+
     def get_object_attributes(self, segmented_obj: SegmentedObject) -> Dict[str, any]:
         """Get additional attributes about the segmented object"""
         mask = segmented_obj.mask
         
         # Calculate shape attributes
-        perimeter = self._calculate_perimeter(mask)
+        perimeter = segmented_obj.perimeter
+        if perimeter is None:
+            perimeter = self._calculate_perimeter(mask)
         circularity = 4 * np.pi * segmented_obj.area / (perimeter * perimeter) if perimeter > 0 else 0
         
         # Calculate position attributes
@@ -129,13 +355,9 @@ class SAMObjectDetector:
         }
 
     def _calculate_perimeter(self, mask: np.ndarray) -> float:
-        """Calculate the perimeter of a binary mask"""
-        from scipy import ndimage
-        
-        # Use morphological gradient to find boundary
-        struct = ndimage.generate_binary_structure(2, 2)
-        dilated = ndimage.binary_dilation(mask, struct)
-        eroded = ndimage.binary_erosion(mask, struct)
-        boundary = dilated & ~eroded
-        
-        return float(np.sum(boundary))
\ No newline at end of file
+        """Calculate the perimeter of a binary mask
+
+        Counts the 8-connected morphological-gradient boundary (dilation
+        minus erosion), computed within the mask's bounding box.
+        """
+        return float(mask_geometry(mask).perimeter[0])
\ No newline at end of file
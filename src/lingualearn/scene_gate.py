@@ -0,0 +1,72 @@
+import time
+import numpy as np
+from typing import Optional, Tuple
+from .lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+
+class SceneGate:
+    """Cheap test for whether a frame differs enough from the last detected one
+
+    Frames are shrunk to a small grayscale thumbnail (area averaging also
+    smooths out sensor noise) and compared pixel by pixel with the
+    thumbnail of the frame the current detection came from. The scene
+    counts as changed when more than `threshold` of the thumbnail's
+    pixels moved by over `pixel_threshold` grey levels, or when
+    `refresh_interval` seconds have passed since that detection.
+
+    Comparing against the detected frame rather than the previous one
+    means slow drift (lighting, a creeping pan) still adds up to a change.
+    """
+
+    def __init__(self,
+                 threshold: float = 0.01,
+                 refresh_interval: float = 5.0,
+                 pixel_threshold: int = 16,
+                 size: Tuple[int, int] = (64, 48)):
+        """
+        Args:
+            threshold: Fraction of thumbnail pixels that must change (lower
+                is more sensitive; 0 treats every frame as changed)
+            refresh_interval: Seconds after which a detection is rerun
+                even if nothing moved
+            pixel_threshold: Grey-level difference for a pixel to count as changed
+            size: Thumbnail (width, height)
+        """
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.pixel_threshold = pixel_threshold
+        self.size = size
+        self.reference: Optional[np.ndarray] = None
+        self.reference_time = 0.0
+
+    def thumbnail(self, image: np.ndarray) -> np.ndarray:
+        """Small grayscale copy of a BGR (or grayscale/BGRA) frame"""
+        small = cv2.resize(image, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3 and small.shape[2] == 4:
+            small = cv2.cvtColor(small, cv2.COLOR_BGRA2GRAY)
+        elif small.ndim == 3 and small.shape[2] == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.reshape(self.size[1], self.size[0])
+
+    def changed_fraction(self, thumbnail: np.ndarray) -> float:
+        """Fraction of pixels that differ from the reference (1.0 without one)"""
+        if self.reference is None:
+            return 1.0
+        difference = cv2.absdiff(thumbnail, self.reference)
+        return float(np.count_nonzero(difference > self.pixel_threshold)) / difference.size
+
+    def changed(self, thumbnail: np.ndarray, now: Optional[float] = None) -> bool:
+        """Whether the frame with this thumbnail needs a fresh detection"""
+        now = time.monotonic() if now is None else now
+        if self.reference is None or now - self.reference_time >= self.refresh_interval:
+            return True
+        return self.changed_fraction(thumbnail) > self.threshold
+
+    def update(self, thumbnail: np.ndarray, now: Optional[float] = None) -> None:
+        """Make this the reference thumbnail, e.g. when its frame goes to detection"""
+        self.reference = thumbnail
+        self.reference_time = time.monotonic() if now is None else now
+
+    def reset(self) -> None:
+        self.reference = None
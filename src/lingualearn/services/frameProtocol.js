@@ -0,0 +1,61 @@
+// Binary detect messages (see backend/frame_protocol.py): a 16-byte
+// little-endian header followed by JPEG/PNG bytes or raw RGB pixels
+
+const MAGIC = [0x4c, 0x4c, 0x46, 0x52]; // "LLFR"
+const VERSION = 1;
+const HEADER_SIZE = 16;
+
+export const FrameFormat = { JPEG: 0, PNG: 1, RGB: 2 };
+
+const MASK_ENCODING_CODES = { rle: 1, bitpack: 2, list: 3 };
+const FLAG_CROP_MASKS = 1;
+const FLAG_FULL_RESOLUTION = 2;
+
+/**
+ * Build a binary detect message.
+ *
+ * bytes: Uint8Array / ArrayBuffer of the encoded image (or RGB pixels)
+ * width, height: required for FrameFormat.RGB
+ * sequence: echoed back as `sequence` in the JSON response
+ * fullResolution: skip the server's downscaled inference and get
+ *   frame-sized masks (e.g. for a "learn term" capture)
+ */
+export function encodeFrame({
+    bytes,
+    format = FrameFormat.JPEG,
+    width = 0,
+    height = 0,
+    sequence = 0,
+    maskEncoding,
+    cropMasks = false,
+    fullResolution = false
+}) {
+    const payload = bytes instanceof Uint8Array ? bytes : new Uint8Array(bytes);
+    const message = new Uint8Array(HEADER_SIZE + payload.length);
+    const view = new DataView(message.buffer);
+
+    message.set(MAGIC, 0);
+    view.setUint8(4, VERSION);
+    view.setUint8(5, format);
+    view.setUint8(6, MASK_ENCODING_CODES[maskEncoding] || 0);
+    view.setUint8(7, (cropMasks ? FLAG_CROP_MASKS : 0) | (fullResolution ? FLAG_FULL_RESOLUTION : 0));
+    view.setUint32(8, sequence >>> 0, true);
+    view.setUint16(12, width, true);
+    view.setUint16(14, height, true);
+    message.set(payload, HEADER_SIZE);
+    return message.buffer;
+}
+
+/**
+ * Raw RGB frame from canvas ImageData (drops the alpha channel).
+ */
+export function encodeImageData(imageData, options = {}) {
+    const { data, width, height } = imageData;
+    const rgb = new Uint8Array(width * height * 3);
+    for (let i = 0, j = 0; i < data.length; i += 4, j += 3) {
+        rgb[j] = data[i];
+        rgb[j + 1] = data[i + 1];
+        rgb[j + 2] = data[i + 2];
+    }
+    return encodeFrame({ ...options, bytes: rgb, format: FrameFormat.RGB, width, height });
+}
@@ -0,0 +1,112 @@
+// Decoders for masks sent by the detection server (see backend/mask_encoding.py)
+
+// COCO uncompressed RLE: alternating background/foreground run lengths over
+// the mask in column-major order, starting with background
+function decodeRle({ size: [height, width], counts }) {
+    const columnMajor = new Uint8Array(height * width);
+    let index = 0;
+    for (let i = 0; i < counts.length; i++) {
+        if (i % 2 === 1) {
+            columnMajor.fill(1, index, index + counts[i]);
+        }
+        index += counts[i];
+    }
+
+    // Transpose to row-major for canvas use
+    const mask = new Uint8Array(height * width);
+    for (let x = 0; x < width; x++) {
+        const column = x * height;
+        for (let y = 0; y < height; y++) {
+            mask[y * width + x] = columnMajor[column + y];
+        }
+    }
+    return mask;
+}
+
+// Row-major bits, 8 per byte, most significant bit first, base64-encoded
+function decodeBitpack({ size: [height, width], data }) {
+    const bytes = Uint8Array.from(atob(data), (c) => c.charCodeAt(0));
+    const mask = new Uint8Array(height * width);
+    for (let i = 0; i < mask.length; i++) {
+        mask[i] = (bytes[i >> 3] >> (7 - (i & 7))) & 1;
+    }
+    return mask;
+}
+
+/**
+ * Decode a server mask into a row-major Uint8Array of 0/1 values.
+ *
+ * Cropped masks (with an `offset`) are placed into a frame of
+ * frameWidth x frameHeight when those are given.
+ * Returns { mask, width, height }.
+ */
+export function decodeMask(encoded, frameWidth, frameHeight) {
+    if (Array.isArray(encoded)) {
+        // Legacy nested-list format
+        const height = encoded.length;
+        const width = height ? encoded[0].length : 0;
+        const mask = new Uint8Array(height * width);
+        encoded.forEach((row, y) => row.forEach((v, x) => { mask[y * width + x] = v ? 1 : 0; }));
+        return { mask, width, height };
+    }
+
+    const [height, width] = encoded.size;
+    const mask = encoded.encoding === 'bitpack' ? decodeBitpack(encoded) : decodeRle(encoded);
+    if (!encoded.offset || frameWidth === undefined || frameHeight === undefined) {
+        return { mask, width, height };
+    }
+
+    const [offsetX, offsetY] = encoded.offset;
+    const frame = new Uint8Array(frameWidth * frameHeight);
+    for (let y = 0; y < height; y++) {
+        frame.set(mask.subarray(y * width, (y + 1) * width), (y + offsetY) * frameWidth + offsetX);
+    }
+    return { mask: frame, width: frameWidth, height: frameHeight };
+}
+
+/**
+ * Turn a decoded mask into ImageData, painting foreground pixels with rgba.
+ */
+export function maskToImageData({ mask, width, height }, rgba = [0, 255, 0, 77]) {
+    const pixels = new Uint8ClampedArray(width * height * 4);
+    for (let i = 0; i < mask.length; i++) {
+        if (mask[i]) {
+            pixels.set(rgba, i * 4);
+        }
+    }
+    return new ImageData(pixels, width, height);
+}
+
+/**
+ * Draw a server mask onto a 2D context in frame coordinates.
+ *
+ * Masks may come back at inference resolution: the detect response's
+ * mask_size and frame_size ([height, width]) scale the mask and its crop
+ * offset up to the frame. Without them the mask is drawn at its own size.
+ */
+export function drawMask(ctx, encoded, { maskSize, frameSize } = {}, rgba) {
+    const decoded = decodeMask(encoded);
+    if (!decoded.width || !decoded.height) {
+        return;
+    }
+    const scaleX = maskSize && frameSize ? frameSize[1] / maskSize[1] : 1;
+    const scaleY = maskSize && frameSize ? frameSize[0] / maskSize[0] : 1;
+    const [offsetX, offsetY] = encoded.offset ?? [0, 0];
+
+    const sprite = document.createElement('canvas');
+    sprite.width = decoded.width;
+    sprite.height = decoded.height;
+    sprite.getContext('2d').putImageData(maskToImageData(decoded, rgba), 0, 0);
+
+    // Nearest-neighbour upscaling keeps the mask edge hard
+    const smoothing = ctx.imageSmoothingEnabled;
+    ctx.imageSmoothingEnabled = false;
+    ctx.drawImage(
+        sprite,
+        offsetX * scaleX,
+        offsetY * scaleY,
+        decoded.width * scaleX,
+        decoded.height * scaleY
+    );
+    ctx.imageSmoothingEnabled = smoothing;
+}
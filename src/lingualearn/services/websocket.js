@@ -1,3 +1,8 @@
+import { encodeFrame, encodeImageData, FrameFormat } from './frameProtocol';
+
+// Server messages that are not replies to a detect request
+const CONTROL_MESSAGES = ['hello', 'connection', 'pong'];
+
 class WebSocketService {
     constructor() {
         this.ws = null;
@@ -6,6 +11,22 @@ class WebSocketService {
         this.maxReconnectAttempts = 5;
         this.reconnectTimeout = null;
         this.messageQueue = [];
+        // Set once the server answers our hello with binary frame support
+        this.binaryFrames = false;
+        this.sequence = 0;
+        // Ask the server to drop stale frames instead of queueing them
+        this.latestOnly = false;
+    }
+
+    /**
+     * Switch latest-frame-only mode. While a detection runs the server keeps
+     * just the newest frame; replaced frames resolve as { dropped: true }.
+     */
+    setLatestOnly(enabled) {
+        this.latestOnly = Boolean(enabled);
+        if (this.ws && this.isConnected) {
+            this.ws.send(JSON.stringify({ type: 'hello', latest_only: this.latestOnly }));
+        }
     }
 
     connect() {
@@ -18,6 +39,8 @@ class WebSocketService {
                     console.log('WebSocket connected successfully');
                     this.isConnected = true;
                     this.reconnectAttempts = 0;
+                    // Ask whether the server accepts binary frames; JSON works regardless
+                    this.ws.send(JSON.stringify({ type: 'hello', latest_only: this.latestOnly }));
                     this._processQueue();
                     resolve();
                 };
@@ -25,6 +48,9 @@ class WebSocketService {
                 this.ws.onmessage = (event) => {
                     const data = JSON.parse(event.data);
                     console.log('Received message:', data);
+                    if (data.type === 'hello') {
+                        this.binaryFrames = Boolean(data.binary);
+                    }
                     if (data.type === 'error') {
                         console.error('Server error:', data.message);
                     }
@@ -40,6 +66,7 @@ class WebSocketService {
                 this.ws.onclose = () => {
                     console.log('WebSocket connection closed');
                     this.isConnected = false;
+                    this.binaryFrames = false;
                     this._attemptReconnect();
                 };
 
@@ -70,42 +97,96 @@ class WebSocketService {
         }
     }
 
-    async detectObjects(imageData) {
+    /**
+     * Run detection on a frame.
+     *
+     * imageData is either a data URL string (sent as JSON) or, once the
+     * server has advertised binary support, a JPEG/PNG Blob or ArrayBuffer
+     * or canvas ImageData (sent as a binary frame). options.format picks
+     * JPEG or PNG for Blob/ArrayBuffer input; options.fullResolution
+     * asks for full-resolution inference instead of the server's
+     * downscaled preview (masks then come back frame-sized; otherwise
+     * the response's mask_size says how far to scale them up).
+     *
+     * The response carries the frame's sequence number and the server's
+     * timings; timings.round_trip_ms adds the client-side lag.
+     */
+    async detectObjects(imageData, options = {}) {
         if (!this.ws || !this.isConnected) {
             console.log('WebSocket not connected, queueing message...');
             return new Promise((resolve, reject) => {
                 this.messageQueue.push({
                     type: 'detect',
                     data: imageData,
+                    options,
                     resolve,
                     reject
                 });
             });
         }
 
+        let payload;
+        const sequence = this.sequence = (this.sequence + 1) >>> 0;
+        if (typeof imageData === 'string') {
+            payload = JSON.stringify({
+                type: 'detect',
+                image: imageData,
+                sequence,
+                ...(options.fullResolution && { inference_size: 0, upsample_masks: true })
+            });
+        } else if (this.binaryFrames) {
+            payload = imageData instanceof ImageData
+                ? encodeImageData(imageData, { ...options, sequence })
+                : encodeFrame({
+                    ...options,
+                    format: options.format ?? FrameFormat.JPEG,
+                    bytes: imageData instanceof Blob ? await imageData.arrayBuffer() : imageData,
+                    sequence
+                });
+        } else {
+            throw new Error('Server has not enabled binary frames; send a data URL');
+        }
+
+        const sentAt = performance.now();
         return new Promise((resolve, reject) => {
             const timeout = setTimeout(() => {
                 reject(new Error('Detection timeout'));
             }, 30000); // 30 second timeout
 
             const messageHandler = (event) => {
-                clearTimeout(timeout);
-                this.ws.removeEventListener('message', messageHandler);
+                let response;
                 try {
-                    const response = JSON.parse(event.data);
-                    resolve(response);
+                    response = JSON.parse(event.data);
                 } catch (error) {
+                    clearTimeout(timeout);
+                    this.ws.removeEventListener('message', messageHandler);
                     reject(error);
+                    return;
+                }
+                if (CONTROL_MESSAGES.includes(response.type)) {
+                    return;
                 }
+                if (response.sequence !== undefined && response.sequence !== sequence) {
+                    return;
+                }
+                clearTimeout(timeout);
+                this.ws.removeEventListener('message', messageHandler);
+                if (response.type === 'dropped') {
+                    // A newer frame replaced this one on the server
+                    resolve({ success: false, dropped: true, sequence });
+                    return;
+                }
+                response.timings = {
+                    ...response.timings,
+                    round_trip_ms: performance.now() - sentAt
+                };
+                resolve(response);
             };
 
             this.ws.addEventListener('message', messageHandler);
 
             try {
-                this.ws.send(JSON.stringify({
-                    type: 'detect',
-                    image: imageData
-                }));
+                this.ws.send(payload);
             } catch (error) {
                 clearTimeout(timeout);
                 this.ws.removeEventListener('message', messageHandler);
@@ -116,10 +197,10 @@ class WebSocketService {
 
     async _processQueue() {
         while (this.messageQueue.length > 0 && this.isConnected) {
-            const { type, data, resolve, reject } = this.messageQueue.shift();
+            const { type, data, options, resolve, reject } = this.messageQueue.shift();
             try {
                 if (type === 'detect') {
-                    const result = await this.detectObjects(data);
+                    const result = await this.detectObjects(data, options);
                     resolve(result);
                 }
             } catch (error) {
@@ -137,6 +218,7 @@ class WebSocketService {
             clearTimeout(this.reconnectTimeout);
         }
         this.isConnected = false;
+        this.binaryFrames = false;
         this.reconnectAttempts = 0;
         this.messageQueue = [];
     }
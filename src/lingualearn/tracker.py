@@ -0,0 +1,254 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .lazy_import import lazy_import
+
+cv2 = lazy_import("cv2")
+
+@dataclass
+class Track:
+    track_id: int
+    bbox: np.ndarray                   # x, y, w, h (float)
+    object_class: Any
+    confidence: float
+    image_hash: int                    # of the latest matched detection
+    hits: int = 1                      # detections matched to this track
+    misses: int = 0                    # consecutive detection runs without a match
+    detected: bool = True              # matched on the latest frame (vs propagated)
+    terms: Optional[List] = None       # local terms, looked up once per track
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'track_id': self.track_id,
+            'object_class': self.object_class,
+            'confidence': self.confidence,
+            'bbox': tuple(int(round(v)) for v in self.bbox),
+            'image_hash': self.image_hash,
+            'detected': self.detected,
+        }
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (N, 4) and (M, 4) x, y, w, h boxes, shape (N, M)"""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 0] + a[:, None, 2], b[None, :, 0] + b[None, :, 2])
+    y2 = np.minimum(a[:, None, 1] + a[:, None, 3], b[None, :, 1] + b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+class AssociationStrategy(ABC):
+    """Matches detections to tracks: subclasses score each track/detection pair
+
+    associate() pairs them greedily, best score first, ignoring pairs of
+    different classes or scoring below min_score.
+    """
+    min_score = 0.0
+
+    @abstractmethod
+    def scores(self, track_boxes: np.ndarray, detection_boxes: np.ndarray) -> np.ndarray:
+        """(tracks, detections) match scores, higher is better"""
+
+    def associate(self,
+                  tracks: Sequence[Track],
+                  detections: Sequence[Dict]
+                  ) -> Tuple[List[Tuple[int, int]], List[int], List[int]]:
+        """
+        Returns:
+            (track index, detection index) matches, unmatched track indices,
+            unmatched detection indices
+        """
+        if not tracks or not detections:
+            return [], list(range(len(tracks))), list(range(len(detections)))
+
+        scores = self.scores(
+            np.array([track.bbox for track in tracks], dtype=np.float32),
+            np.array([d['bbox'] for d in detections], dtype=np.float32)
+        ).astype(np.float64)
+        same_class = (np.array([track.object_class for track in tracks])[:, None]
+                      == np.array([d['object_class'] for d in detections])[None, :])
+        scores[~same_class | (scores < self.min_score)] = -np.inf
+
+        matches = []
+        while True:
+            t, d = np.unravel_index(np.argmax(scores), scores.shape)
+            if not np.isfinite(scores[t, d]):
+                break
+            matches.append((int(t), int(d)))
+            scores[t, :] = -np.inf
+            scores[:, d] = -np.inf
+        matched_tracks = {t for t, _ in matches}
+        matched_detections = {d for _, d in matches}
+        return (
+            matches,
+            [t for t in range(len(tracks)) if t not in matched_tracks],
+            [d for d in range(len(detections)) if d not in matched_detections],
+        )
+
+class IoUAssociation(AssociationStrategy):
+    """Match by box overlap; right when objects move less than their size between detections"""
+
+    def __init__(self, min_iou: float = 0.3):
+        self.min_score = min_iou
+
+    def scores(self, track_boxes: np.ndarray, detection_boxes: np.ndarray) -> np.ndarray:
+        return box_iou(track_boxes, detection_boxes)
+
+class CentroidAssociation(AssociationStrategy):
+    """Match by centre distance relative to the track's size; copes with
+    small, fast objects whose boxes stop overlapping between detections"""
+
+    def __init__(self, max_distance: float = 1.0):
+        """
+        Args:
+            max_distance: Largest centre shift to match, in track-box diagonals
+        """
+        self.min_score = -max_distance
+
+    def scores(self, track_boxes: np.ndarray, detection_boxes: np.ndarray) -> np.ndarray:
+        track_centres = track_boxes[:, :2] + track_boxes[:, 2:] / 2
+        detection_centres = detection_boxes[:, :2] + detection_boxes[:, 2:] / 2
+        distance = np.linalg.norm(track_centres[:, None] - detection_centres[None, :], axis=2)
+        diagonal = np.maximum(np.linalg.norm(track_boxes[:, 2:], axis=1), 1.0)
+        return -distance / diagonal[:, None]
+
+class OpticalFlowPropagator:
+    """Moves boxes between frames by the median sparse optical flow inside them
+
+    Corners are picked inside each box on the previous frame and followed
+    into the current one with pyramidal Lucas-Kanade; a box with too few
+    followed points stays where it was.
+    """
+
+    def __init__(self, max_corners: int = 20, min_points: int = 3):
+        self.max_corners = max_corners
+        self.min_points = min_points
+
+    def propagate(self, previous: np.ndarray, current: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """Shift (N, 4) x, y, w, h boxes from grayscale `previous` to `current`"""
+        boxes = np.array(boxes, dtype=np.float32).reshape(-1, 4)
+        height, width = previous.shape[:2]
+        points, owners = [], []
+        for i, (x, y, w, h) in enumerate(boxes):
+            x1, y1 = max(int(x), 0), max(int(y), 0)
+            x2, y2 = min(int(x + w), width), min(int(y + h), height)
+            if x2 - x1 < 4 or y2 - y1 < 4:
+                continue
+            corners = cv2.goodFeaturesToTrack(previous[y1:y2, x1:x2], self.max_corners, 0.01, 3)
+            if corners is None:
+                continue
+            points.append(corners.reshape(-1, 2) + (x1, y1))
+            owners.append(np.full(len(corners), i))
+        if not points:
+            return boxes
+
+        start = np.concatenate(points).astype(np.float32)
+        owner = np.concatenate(owners)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(previous, current, start.reshape(-1, 1, 2), None)
+        found = status.reshape(-1) == 1
+        shift = moved.reshape(-1, 2) - start
+        for i in range(len(boxes)):
+            followed = shift[found & (owner == i)]
+            if len(followed) >= self.min_points:
+                boxes[i, :2] += np.median(followed, axis=0)
+        return boxes
+
+class ObjectTracker:
+    """Keeps stable IDs for detected objects across frames
+
+    Call update() with a frame's detections (as from
+    ObjectLearner.detect_objects) whenever the detector runs, and
+    propagate() on the frames in between: boxes follow optical flow if a
+    propagator is set, otherwise they hold still. A track missed by more
+    than max_misses detection runs in a row is dropped.
+    """
+
+    def __init__(self,
+                 association: Optional[AssociationStrategy] = None,
+                 propagator: Optional[OpticalFlowPropagator] = None,
+                 max_misses: int = 1):
+        self.association = association or IoUAssociation()
+        self.propagator = propagator
+        self.max_misses = max_misses
+        self.tracks: Dict[int, Track] = {}
+        self._next_id = 1
+        self._previous: Optional[np.ndarray] = None  # grayscale, for the propagator
+
+    @property
+    def active(self) -> List[Track]:
+        """Tracks matched by the latest detection run, oldest first"""
+        return [track for track in self.tracks.values() if track.misses == 0]
+
+    @property
+    def created(self) -> int:
+        """Tracks started since the last reset"""
+        return self._next_id - 1
+
+    def get(self, track_id: int) -> Optional[Track]:
+        return self.tracks.get(track_id)
+
+    def reset(self) -> None:
+        self.tracks.clear()
+        self._next_id = 1
+        self._previous = None
+
+    def update(self, detections: Sequence[Dict], frame: Optional[np.ndarray] = None) -> List[Track]:
+        """Match a detector run's results to the tracks; returns the active tracks"""
+        tracks = list(self.tracks.values())
+        matches, missed, new = self.association.associate(tracks, detections)
+
+        for t, d in matches:
+            track, detection = tracks[t], detections[d]
+            track.bbox = np.array(detection['bbox'], dtype=np.float32)
+            track.confidence = detection['confidence']
+            track.image_hash = detection['image_hash']
+            track.hits += 1
+            track.misses = 0
+            track.detected = True
+        for t in missed:
+            track = tracks[t]
+            track.misses += 1
+            track.detected = False
+            if track.misses > self.max_misses:
+                del self.tracks[track.track_id]
+        for d in new:
+            detection = detections[d]
+            track = Track(
+                track_id=self._next_id,
+                bbox=np.array(detection['bbox'], dtype=np.float32),
+                object_class=detection['object_class'],
+                confidence=detection['confidence'],
+                image_hash=detection['image_hash']
+            )
+            self.tracks[track.track_id] = track
+            self._next_id += 1
+
+        self._remember(frame)
+        return self.active
+
+    def propagate(self, frame: Optional[np.ndarray] = None) -> List[Track]:
+        """Carry the active tracks to a frame the detector skipped"""
+        active = self.active
+        for track in active:
+            track.detected = False
+        if self.propagator is not None and frame is not None and active:
+            current = self._gray(frame)
+            if self._previous is not None and self._previous.shape == current.shape:
+                boxes = self.propagator.propagate(self._previous, current, [t.bbox for t in active])
+                for track, bbox in zip(active, boxes):
+                    track.bbox = bbox
+            self._previous = current
+        else:
+            self._remember(frame)
+        return active
+
+    def _remember(self, frame: Optional[np.ndarray]) -> None:
+        if self.propagator is not None and frame is not None:
+            self._previous = self._gray(frame)
+
+    @staticmethod
+    def _gray(frame: np.ndarray) -> np.ndarray:
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
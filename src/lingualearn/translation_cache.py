@@ -0,0 +1,177 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+import dataclasses
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from .knowledge_base import KnowledgeBase, TranslationEntry
+
+CacheKey = Tuple[str, str, str]  # source_text, source_lang, target_lang
+
+MISSING = object()
+
+
+@dataclass
+class CacheConfig:
+    max_size: int = 10000
+    ttl: float = 300.0  # seconds
+    negative_ttl: float = 30.0  # seconds, 0 disables caching of misses
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class TranslationCache:
+    """Bounded LRU cache with per-entry expiry
+
+    A cached value of None is a negative entry: the lookup is known to have
+    no result. Negative entries use their own, usually shorter, TTL.
+    """
+
+    def __init__(self,
+                 config: Optional[CacheConfig] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.config = config or CacheConfig()
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, float]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, or MISSING if absent or expired"""
+        item = self._entries.get(key)
+        if item is None:
+            self.stats.misses += 1
+            return MISSING
+
+        value, expires_at = item
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache a value; None is stored as a negative entry"""
+        ttl = self.config.ttl if value is not None else self.config.negative_ttl
+        if ttl <= 0 or self.config.max_size <= 0:
+            return
+
+        self._entries[key] = (value, self._clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single key"""
+        if self._entries.pop(key, None) is not None:
+            self.stats.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop every entry, keeping the counters"""
+        self._entries.clear()
+
+
+class CachedKnowledgeBase:
+    """KnowledgeBase wrapper that serves repeated get_translation calls from memory
+
+    Writes that can change a lookup result (add_translation,
+    add_translations_bulk, update_confidence) invalidate exactly the
+    affected (source_text, source_lang, target_lang) keys. Every other
+    attribute is passed through to the wrapped knowledge base, so this can
+    be handed to LearningEngine or anything else expecting a KnowledgeBase.
+    """
+
+    def __init__(self, kb: KnowledgeBase, config: Optional[CacheConfig] = None):
+        self.kb = kb
+        self.cache = TranslationCache(config)
+        # Bumped on every invalidation so a lookup racing a write is not cached
+        self._epoch = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.kb, name)
+
+    def __enter__(self) -> 'CachedKnowledgeBase':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.kb.close()
+
+    async def __aenter__(self) -> 'CachedKnowledgeBase':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.kb.__aexit__(exc_type, exc, tb)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self.cache.stats
+
+    def stats_dict(self) -> Dict[str, int]:
+        """Cache counters as a plain dict, e.g. for a metrics endpoint"""
+        return {**dataclasses.asdict(self.cache.stats), 'size': len(self.cache)}
+
+    async def get_translation(self,
+                              source_text: str,
+                              source_lang: str,
+                              target_lang: str) -> Optional[TranslationEntry]:
+        """Retrieve a translation, from the cache when possible"""
+        key = (source_text, source_lang, target_lang)
+        cached = self.cache.get(key)
+        if cached is not MISSING:
+            return dataclasses.replace(cached) if cached is not None else None
+
+        epoch = self._epoch
+        entry = await self.kb.get_translation(source_text, source_lang, target_lang)
+        if epoch == self._epoch:
+            self.cache.put(key, entry)
+        return dataclasses.replace(entry) if entry is not None else None
+
+    async def add_translation(self, entry: TranslationEntry) -> bool:
+        """Add a translation and invalidate its cached lookup"""
+        added = await self.kb.add_translation(entry)
+        self._invalidate(self._keys([entry]))
+        return added
+
+    async def add_translations_bulk(self, entries: Iterable[TranslationEntry]) -> int:
+        """Add many translations and invalidate their cached lookups"""
+        entries = list(entries)
+        written = await self.kb.add_translations_bulk(entries)
+        self._invalidate(self._keys(entries))
+        return written
+
+    async def update_confidence(self,
+                                source_text: str,
+                                target_text: str,
+                                source_lang: str,
+                                target_lang: str,
+                                success: bool) -> None:
+        """Update confidence and invalidate the cached lookup"""
+        try:
+            await self.kb.update_confidence(source_text, target_text, source_lang, target_lang, success)
+        finally:
+            self._invalidate([(source_text, source_lang, target_lang)])
+
+    @staticmethod
+    def _keys(entries: Iterable[Any]) -> List[CacheKey]:
+        # Callers also hand over other objects (e.g. EnhancedObjectTerm),
+        # which the knowledge base rejects and so never change a lookup
+        return [(e.source_text, e.source_lang, e.target_lang)
+                for e in entries if isinstance(e, TranslationEntry)]
+
+    def _invalidate(self, keys: Iterable[CacheKey]) -> None:
+        self._epoch += 1
+        for key in keys:
+            self.cache.invalidate(key)
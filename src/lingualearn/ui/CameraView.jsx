@@ -71,8 +71,9 @@ const CameraView = ({ onCapture, onRecordTerm }) => {
             // Get frame data
             const frameData = canvas.toDataURL('image/jpeg');
 
-            // Send to backend for object detection
-            const result = await wsService.detectObjects(frameData);
+            // Send to backend for object detection; a term is learned from
+            // this capture, so ask for full-resolution inference
+            const result = await wsService.detectObjects(frameData, { fullResolution: true });
             
             if (result.success) {
                 setDetectedObject(result.objects[0]); // Get first detected object
@@ -1,5 +1,6 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { Camera, Mic, X, Check, Edit2, Eye, EyeOff } from 'lucide-react';
+import { drawMask } from '../services/maskDecoding';
 
 export default function ObjectLearningView({
   onCapture,
@@ -60,15 +61,17 @@ export default function ObjectLearningView({
 
     setIsProcessing(true);
     try {
-      // Detect object at click point
+      // Detect object at click point; the mask is kept with the term, so
+      // skip the server's downscaled preview inference
       const result = await onCapture({
         point: [x * scaleX, y * scaleY],
-        frame: canvas.toDataURL('image/jpeg')
+        frame: canvas.toDataURL('image/jpeg'),
+        fullResolution: true
       });
 
       if (result.success) {
         setSelectedObject(result.object);
-        drawObjectOverlay(result.object);
+        drawObjectOverlay(result.object, result);
         setMode('recording');
       }
     } catch (err) {
@@ -79,8 +82,13 @@ export default function ObjectLearningView({
   };
 
   // Draw segmentation mask overlay
-  const drawObjectOverlay = (object) => {
+  // frame_size/mask_size come from the detect response
+  const drawObjectOverlay = (object, { frame_size, mask_size } = {}) => {
     const overlay = overlayRef.current;
+    if (frame_size) {
+      // Work in frame pixels, like the bbox; resizing also clears
+      [overlay.height, overlay.width] = frame_size;
+    }
     const ctx = overlay.getContext('2d');
     ctx.clearRect(0, 0, overlay.width, overlay.height);
 
@@ -92,12 +100,7 @@ export default function ObjectLearningView({
       ctx.strokeStyle = 'rgba(0, 255, 0, 0.8)';
       ctx.lineWidth = 2;
 
-      const imageData = new ImageData(
-        new Uint8ClampedArray(object.mask.buffer),
-        overlay.width,
-        overlay.height
-      );
-      ctx.putImageData(imageData, 0, 0);
+      drawMask(ctx, object.mask, { frameSize: frame_size, maskSize: mask_size });
     }
 
     // Draw bounding box
@@ -0,0 +1,116 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Shape attributes compared by EnhancedObjectLearner, with their weights
+FEATURES = ('area', 'circularity', 'aspect_ratio')
+WEIGHTS = np.array([0.3, 0.4, 0.3])
+
+
+class VisualFeatureIndex:
+    """In-memory feature matrix of every term with visual attributes
+
+    Rows are appended as terms are learned (capacity doubles as needed), and
+    similarity of many detected objects against all terms is computed in one
+    broadcast, using the same weighted score as
+    EnhancedObjectLearner._calculate_visual_similarity.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._features = np.empty((max(1, initial_capacity), len(FEATURES)))
+        self._terms: List[Any] = []
+        self._language_codes: Dict[str, int] = {}
+        self._language_ids = np.empty(max(1, initial_capacity), dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @staticmethod
+    def _vector(attrs: Dict[str, Any]) -> Optional[np.ndarray]:
+        if not attrs or any(attrs.get(name) is None for name in FEATURES):
+            return None
+        return np.array([float(attrs[name]) for name in FEATURES])
+
+    def add(self, term: Any) -> bool:
+        """Index a term; terms without the shape attributes are skipped"""
+        vector = self._vector(getattr(term, 'visual_attributes', None))
+        if vector is None:
+            return False
+
+        n = len(self._terms)
+        if n == len(self._features):
+            self._features = np.concatenate([self._features, np.empty_like(self._features)])
+            self._language_ids = np.concatenate([self._language_ids, np.empty_like(self._language_ids)])
+
+        language = getattr(term, 'language', None)
+        code = self._language_codes.setdefault(language, len(self._language_codes))
+        self._features[n] = vector
+        self._language_ids[n] = code
+        self._terms.append(term)
+        return True
+
+    def similarity(self, queries: np.ndarray) -> np.ndarray:
+        """Weighted similarity of each query row against every term, shape (Q, N)"""
+        terms = self._features[:len(self._terms)]
+        q = queries[:, None, :]
+        t = terms[None, :, :]
+
+        larger_area = np.maximum(q[..., 0], t[..., 0])
+        area_diff = np.divide(
+            np.abs(q[..., 0] - t[..., 0]),
+            larger_area,
+            out=np.zeros(larger_area.shape),
+            where=larger_area > 0
+        )
+        circ_diff = np.abs(q[..., 1] - t[..., 1])
+        ratio_diff = np.abs(q[..., 2] - t[..., 2])
+
+        return (
+            (1 - area_diff) * WEIGHTS[0] +
+            (1 - circ_diff) * WEIGHTS[1] +
+            (1 - ratio_diff) * WEIGHTS[2]
+        )
+
+    def search(self,
+               queries: Sequence[Dict[str, Any]],
+               threshold: float = 0.8,
+               top_k: Optional[int] = None,
+               language: Optional[str] = None) -> List[List[Tuple[float, Any]]]:
+        """Find the most similar terms for each query's visual attributes
+
+        Args:
+            queries: Visual attribute dicts, one per detected object
+            threshold: Minimum similarity for a term to be returned
+            top_k: Maximum results per query (None for all above threshold)
+            language: Only consider terms in this language
+
+        Returns:
+            Per query, (similarity, term) pairs, most similar first
+        """
+        vectors = [self._vector(attrs) for attrs in queries]
+        results: List[List[Tuple[float, Any]]] = [[] for _ in queries]
+        valid = [i for i, vector in enumerate(vectors) if vector is not None]
+        if not valid or not self._terms:
+            return results
+
+        scores = self.similarity(np.stack([vectors[i] for i in valid]))
+        if language is not None:
+            code = self._language_codes.get(language)
+            mask = self._language_ids[:len(self._terms)] == code
+            scores = np.where(mask[None, :], scores, -np.inf)
+        scores = np.where(scores >= threshold, scores, -np.inf)
+
+        k = scores.shape[1] if top_k is None else min(top_k, scores.shape[1])
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')
+
+        for row, query_index in enumerate(valid):
+            for j in order[row]:
+                score = candidate_scores[row, j]
+                if not np.isfinite(score):
+                    break
+                results[query_index].append((float(score), self._terms[candidates[row, j]]))
+        return results
@@ -1,10 +1,13 @@
-import torch
-import whisper
 import asyncio
-import sounddevice as sd
 import numpy as np
 from typing import Optional, Callable, Dict, List
 from dataclasses import dataclass
+from concurrent.futures import Future
+from .model_registry import ModelKey, models
+from .lazy_import import lazy_import
+
+whisper = lazy_import("whisper")
+sd = lazy_import("sounddevice")
 
 @dataclass
 class AudioConfig:
@@ -16,11 +19,19 @@ class AudioConfig:
 class VoiceInput:
     def __init__(self, config: Optional[AudioConfig] = None):
         self.config = config or AudioConfig()
-        # Initialize Whisper model for ASR
-        self.model = whisper.load_model("base")
+        # Whisper model for ASR, loaded from the shared registry on first use
+        self.model_key = ModelKey("whisper", "base")
         self.recording = False
         self._audio_buffer = []
 
+    @property
+    def model(self):
+        return models.get(self.model_key, lambda: whisper.load_model(self.model_key.name))
+
+    def warm_up(self) -> Future:
+        """Start loading Whisper in the background"""
+        return models.warm_up(self.model_key, lambda: whisper.load_model(self.model_key.name))
+
     async def start_recording(self):
         """Start recording audio"""
         if self.recording:
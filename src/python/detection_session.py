@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+from inference_pool import InferencePool, PoolBusy
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+class DetectionSession:
+    """Detect requests of one websocket connection
+
+    By default every frame is run (subject to the pool's in-flight limit).
+    In latest-only mode at most one frame runs at a time and one more waits:
+    a newer frame replaces the waiting one, which is dropped, counted and
+    reported to the client as {"type": "dropped", "sequence": n}, so latency
+    stays bounded when the camera outpaces SAM.
+
+    Every result carries the frame's sequence number (the client's, or one
+    assigned here) and server-side timings in milliseconds: queued (receipt
+    to inference start), inference, and total (receipt to send).
+    """
+
+    def __init__(self,
+                 pool: InferencePool,
+                 client: Hashable,
+                 process: Callable[..., Dict[str, Any]],
+                 send: Callable[[Dict[str, Any]], Awaitable[None]],
+                 latest_only: bool = False):
+        self.pool = pool
+        self.client = client
+        self.process = process
+        self.send = send
+        self.latest_only = latest_only
+
+        self.received = 0
+        self.dropped = 0
+        self.completed = 0
+        self._sequence = 0
+        self._tasks: Set[asyncio.Task] = set()
+        # Latest-only mode: the frame waiting for the running one to finish
+        self._waiting: Optional[Tuple[Dict[str, Any], float]] = None
+        self._runner: Optional[asyncio.Task] = None
+
+    def submit(self, message: Dict[str, Any]) -> None:
+        """Accept a detect message; its result is sent when ready"""
+        received_at = time.perf_counter()
+        self.received += 1
+        if message.get("sequence") is None:
+            self._sequence += 1
+            message["sequence"] = self._sequence
+
+        if not self.latest_only:
+            self._spawn(self._detect(message, received_at))
+            return
+
+        if self._waiting is not None:
+            stale, _ = self._waiting
+            self.dropped += 1
+            self._spawn(self._send_quietly({"type": "dropped", "sequence": stale["sequence"]}))
+        self._waiting = (message, received_at)
+        if self._runner is None or self._runner.done():
+            self._runner = self._spawn(self._run_latest())
+
+    async def close(self) -> None:
+        """Cancel outstanding work (on disconnect)"""
+        self._waiting = None
+        for task in list(self._tasks):
+            task.cancel()
+        self.pool.cancel_client(self.client)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"received": self.received, "dropped": self.dropped, "completed": self.completed}
+
+    def _spawn(self, coro: Awaitable) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run_latest(self) -> None:
+        while self._waiting is not None:
+            message, received_at = self._waiting
+            self._waiting = None
+            await self._detect(message, received_at)
+
+    def _timed_process(self, message: Dict[str, Any]) -> Tuple[Dict[str, Any], float, float]:
+        started = time.perf_counter()
+        result = self.process(message["image"], message.get("mask_encoding"), message.get("crop_masks"),
+                              message.get("inference_size"), message.get("upsample_masks"))
+        return result, started, time.perf_counter()
+
+    async def _detect(self, message: Dict[str, Any], received_at: float) -> None:
+        try:
+            result, started, finished = await self.pool.submit(self.client, self._timed_process, message)
+            timings = {"queued_ms": _ms(started - received_at), "inference_ms": _ms(finished - started)}
+            self.completed += 1
+        except PoolBusy as e:
+            result = {"success": False, "error": str(e), "busy": True}
+            timings = {}
+
+        result["sequence"] = message["sequence"]
+        timings["total_ms"] = _ms(time.perf_counter() - received_at)
+        result["timings"] = timings
+        result["dropped_frames"] = self.dropped
+        await self._send_quietly(result)
+
+    async def _send_quietly(self, message: Dict[str, Any]) -> None:
+        try:
+            await self.send(message)
+        except Exception:
+            # Connection went away; close() will clean up
+            pass
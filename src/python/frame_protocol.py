@@ -0,0 +1,122 @@
+import json
+import struct
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from fastapi import WebSocket, WebSocketDisconnect
+
+# Binary detect message: 16-byte little-endian header, then the image
+#
+#   0  4s  magic b"LLFR"
+#   4  B   protocol version
+#   5  B   image format (FORMAT_*)
+#   6  B   mask encoding (index into MASK_ENCODING_CODES, 0 = server default)
+#   7  B   flags (FLAG_*)
+#   8  I   sequence number, echoed back in the response
+#  12  H   width  (raw RGB only, else 0)
+#  14  H   height (raw RGB only, else 0)
+HEADER = struct.Struct("<4sBBBBIHH")
+MAGIC = b"LLFR"
+VERSION = 1
+
+FORMAT_JPEG = 0
+FORMAT_PNG = 1
+FORMAT_RGB = 2
+FORMAT_NAMES = {FORMAT_JPEG: "jpeg", FORMAT_PNG: "png", FORMAT_RGB: "rgb"}
+
+MASK_ENCODING_CODES = (None, "rle", "bitpack", "list")
+
+FLAG_CROP_MASKS = 1
+FLAG_FULL_RESOLUTION = 2  # skip downscaled inference, frame-sized masks
+
+@dataclass
+class FrameHeader:
+    format: int
+    sequence: int = 0
+    width: int = 0
+    height: int = 0
+    mask_encoding: Optional[str] = None
+    crop_masks: Optional[bool] = None  # None = server default
+    full_resolution: bool = False
+
+def hello_response() -> dict:
+    """Reply to a client's {"type": "hello"} advertising binary frame support"""
+    return {
+        "type": "hello",
+        "binary": True,
+        "version": VERSION,
+        "formats": list(FORMAT_NAMES.values())
+    }
+
+def encode_frame(header: FrameHeader, payload: bytes) -> bytes:
+    """Build a binary detect message (used by Python clients and tests)"""
+    flags = (FLAG_CROP_MASKS if header.crop_masks else 0) | (FLAG_FULL_RESOLUTION if header.full_resolution else 0)
+    return HEADER.pack(
+        MAGIC, VERSION, header.format,
+        MASK_ENCODING_CODES.index(header.mask_encoding), flags,
+        header.sequence, header.width, header.height
+    ) + payload
+
+def decode_frame(data: bytes) -> Tuple[FrameHeader, np.ndarray]:
+    """Parse a binary detect message into its header and an RGB (H, W, 3) array
+
+    JPEG/PNG payloads are decoded by OpenCV straight from the message
+    buffer; raw RGB payloads are wrapped without copying (read-only).
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Binary frame shorter than its header")
+    magic, version, fmt, encoding, flags, sequence, width, height = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Binary frame has bad magic")
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary frame version: {version}")
+    if encoding >= len(MASK_ENCODING_CODES):
+        raise ValueError(f"Unknown mask encoding code: {encoding}")
+
+    header = FrameHeader(
+        format=fmt,
+        sequence=sequence,
+        width=width,
+        height=height,
+        mask_encoding=MASK_ENCODING_CODES[encoding],
+        crop_masks=True if flags & FLAG_CROP_MASKS else None,
+        full_resolution=bool(flags & FLAG_FULL_RESOLUTION)
+    )
+    payload = np.frombuffer(data, dtype=np.uint8, offset=HEADER.size)
+
+    if fmt == FORMAT_RGB:
+        if payload.size != width * height * 3:
+            raise ValueError(f"Raw frame is {payload.size} bytes, expected {width}x{height}x3")
+        return header, payload.reshape(height, width, 3)
+
+    if fmt not in FORMAT_NAMES:
+        raise ValueError(f"Unknown binary frame format: {fmt}")
+    image = cv2.imdecode(payload, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"Could not decode {FORMAT_NAMES[fmt]} frame")
+    return header, cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+async def receive_message(websocket: WebSocket) -> Dict[str, Any]:
+    """Receive a JSON text message or a binary frame from the client
+
+    Binary frames come back as a detect message, shaped like the JSON one
+    but with the decoded RGB array as "image" and the header's sequence
+    number, so both modes share one dispatch.
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+
+    if message.get("bytes") is not None:
+        header, image = decode_frame(message["bytes"])
+        return {
+            "type": "detect",
+            "image": image,
+            "mask_encoding": header.mask_encoding,
+            "crop_masks": header.crop_masks,
+            "inference_size": 0 if header.full_resolution else None,
+            "upsample_masks": True if header.full_resolution else None,
+            "sequence": header.sequence
+        }
+    return json.loads(message["text"])
@@ -0,0 +1,126 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+
+class PoolBusy(Exception):
+    """The request queue or the client's in-flight limit is full"""
+
+@dataclass
+class PoolStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    cancelled: int = 0
+
+class InferencePool:
+    """Runs blocking inference off the event loop with bounded queueing
+
+    Jobs wait in a FIFO queue of at most max_queue entries and run on
+    `workers` threads. Each client (e.g. a websocket connection) may have
+    at most max_in_flight jobs queued or running; beyond either limit
+    submit raises PoolBusy rather than letting latency grow. Jobs still
+    queued when their client goes away are dropped; a job already running
+    finishes on its thread and its result is discarded.
+
+    With workers > 1 the submitted callables must be thread-safe (a single
+    SamPredictor is not: set_image and predict share state).
+    """
+
+    def __init__(self, workers: int = 1, max_queue: int = 16, max_in_flight: int = 2):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_in_flight = max_in_flight
+        self.stats = PoolStats()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending: Dict[Hashable, Set[asyncio.Future]] = {}
+
+    def start(self) -> None:
+        """Start the worker threads (called on first submit if not before)"""
+        if self._queue is not None:
+            return
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="inference")
+        self._queue = asyncio.Queue(self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        """Cancel queued jobs and stop the workers"""
+        for client in list(self._pending):
+            self.cancel_client(client)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+        self._queue = None
+        self._tasks = []
+
+    def in_flight(self, client: Hashable) -> int:
+        return len(self._pending.get(client, ()))
+
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, client: Hashable, fn: Callable, *args: Any) -> Any:
+        """Run fn(*args) on a worker thread and return its result
+
+        Raises:
+            PoolBusy: client already has max_in_flight jobs, or the queue is full
+        """
+        self.start()
+        if self.in_flight(client) >= self.max_in_flight:
+            self.stats.rejected += 1
+            raise PoolBusy(f"Too many requests in flight ({self.max_in_flight})")
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((future, fn, args))
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            raise PoolBusy(f"Inference queue full ({self.max_queue})")
+
+        self.stats.submitted += 1
+        pending = self._pending.setdefault(client, set())
+        pending.add(future)
+        try:
+            # Cancelling the caller cancels the future, so a queued job is skipped
+            return await future
+        finally:
+            pending.discard(future)
+            if not pending and self._pending.get(client) is pending:
+                del self._pending[client]
+
+    def cancel_client(self, client: Hashable) -> int:
+        """Cancel every job of a client (e.g. on disconnect); returns the count"""
+        futures = self._pending.pop(client, set())
+        for future in futures:
+            future.cancel()
+        return len(futures)
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            future, fn, args = await self._queue.get()
+            try:
+                if future.done():
+                    # Cancelled while waiting in the queue
+                    self.stats.cancelled += 1
+                    continue
+                try:
+                    result = await loop.run_in_executor(self._executor, fn, *args)
+                except Exception as e:
+                    self.stats.failed += 1
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                if future.done():
+                    self.stats.cancelled += 1
+                else:
+                    self.stats.completed += 1
+                    future.set_result(result)
+            finally:
+                self._queue.task_done()
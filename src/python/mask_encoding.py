@@ -0,0 +1,90 @@
+import base64
+import numpy as np
+from typing import Any, Dict, Optional, Sequence
+
+# Supported values for ObjectDetector(mask_encoding=...)
+MASK_ENCODINGS = ("rle", "bitpack", "list")
+
+def encode_rle(mask: np.ndarray) -> Dict[str, Any]:
+    """COCO-style uncompressed RLE of a binary mask
+
+    Counts alternate background/foreground runs over the mask in
+    column-major order, starting with background (so the first count may
+    be 0), as in pycocotools.
+    """
+    height, width = mask.shape
+    flat = np.asarray(mask, dtype=bool).ravel(order="F")
+    # Run boundaries: every index where the value changes, plus both ends
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    boundaries = np.concatenate(([0], changes, [flat.size]))
+    counts = np.diff(boundaries)
+    if flat.size and flat[0]:
+        counts = np.concatenate(([0], counts))
+    return {"size": [int(height), int(width)], "counts": counts.tolist()}
+
+def decode_rle(rle: Dict[str, Any]) -> np.ndarray:
+    """Inverse of encode_rle"""
+    height, width = rle["size"]
+    counts = np.asarray(rle["counts"], dtype=np.int64)
+    values = np.arange(len(counts)) % 2 == 1
+    flat = np.repeat(values, counts)
+    return flat.reshape((height, width), order="F")
+
+def encode_bitpack(mask: np.ndarray) -> Dict[str, Any]:
+    """Row-major mask bits packed 8 per byte (MSB first), base64-encoded"""
+    height, width = mask.shape
+    packed = np.packbits(np.asarray(mask, dtype=bool).ravel())
+    return {"size": [int(height), int(width)], "data": base64.b64encode(packed.tobytes()).decode("ascii")}
+
+def decode_bitpack(packed: Dict[str, Any]) -> np.ndarray:
+    """Inverse of encode_bitpack"""
+    height, width = packed["size"]
+    bits = np.unpackbits(np.frombuffer(base64.b64decode(packed["data"]), dtype=np.uint8), count=height * width)
+    return bits.astype(bool).reshape(height, width)
+
+def encode_mask(mask: np.ndarray,
+                encoding: str = "rle",
+                bbox: Optional[Sequence[int]] = None) -> Any:
+    """Serialize a mask for a JSON response
+
+    Args:
+        mask: Boolean (H, W) mask
+        encoding: 'rle', 'bitpack' or 'list' (nested lists, the old format)
+        bbox: Inclusive (x1, y1, x2, y2); if given, only that region is
+            encoded and 'offset' gives its top-left corner in the frame
+
+    Returns:
+        {'encoding', 'size', 'counts' | 'data', ['offset']}, or nested
+        lists for 'list'
+    """
+    if encoding not in MASK_ENCODINGS:
+        raise ValueError(f"Unknown mask encoding: {encoding}")
+
+    if bbox is not None:
+        x1, y1, x2, y2 = (int(v) for v in bbox)
+        mask = mask[y1:y2 + 1, x1:x2 + 1]
+
+    if encoding == "list":
+        return mask.tolist()
+
+    encoded = encode_rle(mask) if encoding == "rle" else encode_bitpack(mask)
+    encoded["encoding"] = encoding
+    if bbox is not None:
+        encoded["offset"] = [x1, y1]
+    return encoded
+
+def decode_mask(encoded: Dict[str, Any], frame_size: Optional[Sequence[int]] = None) -> np.ndarray:
+    """Decode an encode_mask result, optionally placed back into a full frame
+
+    Args:
+        encoded: Output of encode_mask for 'rle' or 'bitpack'
+        frame_size: (height, width) of the full frame for cropped masks
+    """
+    mask = decode_rle(encoded) if encoded["encoding"] == "rle" else decode_bitpack(encoded)
+    if frame_size is None or "offset" not in encoded:
+        return mask
+
+    x, y = encoded["offset"]
+    frame = np.zeros(tuple(frame_size), dtype=bool)
+    frame[y:y + mask.shape[0], x:x + mask.shape[1]] = mask
+    return frame
@@ -1,21 +1,97 @@
 import torch
+import cv2
 import numpy as np
-from segment_anything import sam_model_registry, SamPredictor
+from segment_anything import sam_model_registry, SamAutomaticMaskGenerator
 from PIL import Image
 import io
 import base64
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Union
+from mask_encoding import encode_mask
+
+# Lowest SAM predicted IoU for a mask to be reported
+MIN_MASK_SCORE = 0.8
+
+# Released checkpoint for each SAM backbone
+SAM_CHECKPOINTS = {
+    "vit_h": "sam_vit_h_4b8939.pth",
+    "vit_l": "sam_vit_l_0b3195.pth",
+    "vit_b": "sam_vit_b_01ec64.pth",
+}
+
+def inference_shape(frame_shape: Tuple[int, ...], max_side: Optional[int]) -> Tuple[int, int]:
+    """(height, width) to run SAM at: the frame scaled so its longer side
+    is at most max_side (None or 0 = full resolution, never upscaled)"""
+    height, width = frame_shape[:2]
+    if not max_side or max(height, width) <= max_side:
+        return height, width
+    scale = max_side / max(height, width)
+    return max(1, round(height * scale)), max(1, round(width * scale))
+
+def downscale(frame: np.ndarray, max_side: Optional[int]) -> np.ndarray:
+    """The frame resized to inference_shape (uncopied if already small enough)"""
+    height, width = inference_shape(frame.shape, max_side)
+    if (height, width) == frame.shape[:2]:
+        return frame
+    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+def bbox_to_frame(bbox: List[int], mask_shape: Tuple[int, int], frame_shape: Tuple[int, ...]) -> List[int]:
+    """Map an inclusive (x1, y1, x2, y2) box from mask to frame pixels"""
+    scale_y = frame_shape[0] / mask_shape[0]
+    scale_x = frame_shape[1] / mask_shape[1]
+    x1, y1, x2, y2 = bbox
+    return [
+        int(x1 * scale_x),
+        int(y1 * scale_y),
+        min(int(np.ceil((x2 + 1) * scale_x)) - 1, frame_shape[1] - 1),
+        min(int(np.ceil((y2 + 1) * scale_y)) - 1, frame_shape[0] - 1)
+    ]
+
+def upsample_mask(mask: np.ndarray, frame_shape: Tuple[int, ...]) -> np.ndarray:
+    """Nearest-neighbour resize of a boolean mask to the frame's size"""
+    height, width = frame_shape[:2]
+    if mask.shape == (height, width):
+        return mask
+    return cv2.resize(mask.astype(np.uint8), (width, height), interpolation=cv2.INTER_NEAREST) > 0
 
 class ObjectDetector:
-    def __init__(self, model_path: str = "models/sam_vit_h_4b8939.pth"):
-        """Initialize the SAM model for object detection"""
+    def __init__(self, model_path: Optional[str] = None,
+                 mask_encoding: str = "rle", crop_masks: bool = False,
+                 model_type: str = "vit_h", quantize: bool = False,
+                 inference_size: Optional[int] = None, upsample_masks: bool = False):
+        """Initialize the SAM model for object detection
+
+        Args:
+            model_path: SAM checkpoint (defaults to model_type's file in models/)
+            mask_encoding: Default mask format in responses: 'rle' (COCO),
+                'bitpack' (base64 bits) or 'list' (nested lists)
+            crop_masks: Only encode each mask's bounding box by default
+            model_type: SAM backbone, 'vit_h', 'vit_l' or 'vit_b' (smaller is faster)
+            quantize: Dynamic int8 image encoder, for CPU-only machines
+            inference_size: Longest side frames are downscaled to before
+                SAM runs (None = full resolution)
+            upsample_masks: Return frame-sized masks for downscaled frames
+                instead of inference-sized ones
+        """
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         print(f"Using device: {self.device}")
         
         # Initialize SAM
-        self.sam = sam_model_registry["vit_h"](checkpoint=model_path)
+        if model_type not in SAM_CHECKPOINTS:
+            raise ValueError(f"Unknown SAM model type: {model_type}")
+        model_path = model_path or f"models/{SAM_CHECKPOINTS[model_type]}"
+        self.sam = sam_model_registry[model_type](checkpoint=model_path)
         self.sam.to(device=self.device)
-        self.predictor = SamPredictor(self.sam)
+        if quantize and self.device.type == 'cpu':
+            self.sam.image_encoder = torch.ao.quantization.quantize_dynamic(
+                self.sam.image_encoder, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        # Prompts a grid of points over the frame and de-duplicates the masks
+        self.mask_generator = SamAutomaticMaskGenerator(self.sam, pred_iou_thresh=MIN_MASK_SCORE)
+
+        self.mask_encoding = mask_encoding
+        self.crop_masks = crop_masks
+        self.inference_size = inference_size
+        self.upsample_masks = upsample_masks
         
     def process_image(self, image_data: str) -> Image.Image:
         """Convert base64 image data to PIL Image"""
@@ -32,20 +108,36 @@ class ObjectDetector:
         except Exception as e:
             raise ValueError(f"Error processing image: {str(e)}")
     
-    def detect_objects(self, image: Image.Image) -> List[Dict[str, Any]]:
-        """Detect objects in the image using SAM"""
-        # Convert PIL Image to numpy array
-        image_array = np.array(image)
-        
-        # Set image in predictor
-        self.predictor.set_image(image_array)
+    def detect_objects(self, image: Union[Image.Image, np.ndarray],
+                       mask_encoding: Optional[str] = None,
+                       crop_masks: Optional[bool] = None,
+                       inference_size: Optional[int] = None,
+                       upsample_masks: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Detect objects in the image using SAM
+
+        The arguments override the detector defaults (inference_size=0 runs
+        at full resolution). Boxes and areas are always in frame pixels;
+        masks are at inference resolution (see inference_shape) unless
+        upsample_masks is set, and the client scales them when drawing.
+        """
+        mask_encoding = mask_encoding or self.mask_encoding
+        crop_masks = self.crop_masks if crop_masks is None else crop_masks
+        inference_size = self.inference_size if inference_size is None else inference_size
+        upsample_masks = self.upsample_masks if upsample_masks is None else upsample_masks
+
+        # Convert PIL Image to numpy array (arrays pass through uncopied)
+        image_array = np.asarray(image)
+        small = downscale(image_array, inference_size)
+        scale = (image_array.shape[0] * image_array.shape[1]) / (small.shape[0] * small.shape[1])
         
-        # Generate automatic masks
-        masks = self.predictor.generate()
+        # Generate automatic masks, each a dict with a boolean
+        # 'segmentation' at the size of `small' and its 'predicted_iou'
+        proposals = self.mask_generator.generate(small)
         
         objects = []
-        for i, (mask, score) in enumerate(masks):
-            if score < 0.8:  # Filter low confidence detections
+        for i, proposal in enumerate(proposals):
+            mask, score = proposal["segmentation"], proposal["predicted_iou"]
+            if score < MIN_MASK_SCORE:  # Filter low confidence detections
                 continue
             
             # Calculate bounding box
@@ -55,13 +147,19 @@ class ObjectDetector:
                 
             x1, x2 = np.min(x_indices), np.max(x_indices)
             y1, y2 = np.min(y_indices), np.max(y_indices)
+            bbox = [int(x1), int(y1), int(x2), int(y2)]
+            frame_bbox = bbox_to_frame(bbox, mask.shape, image_array.shape)
+            area = int(round(len(y_indices) * scale))
+            if upsample_masks:
+                mask = upsample_mask(mask, image_array.shape)
+                bbox = frame_bbox
             
             objects.append({
                 "id": i,
                 "confidence": float(score),
-                "bbox": [int(x1), int(y1), int(x2), int(y2)],
-                "area": int(np.sum(mask)),
-                "mask": mask.tolist()
+                "bbox": frame_bbox,
+                "area": area,
+                "mask": encode_mask(mask, mask_encoding, bbox if crop_masks else None)
             })
         
         return objects
@@ -71,22 +169,57 @@ class ObjectDetector:
         # For now, return a placeholder. This will be replaced with actual classification
         return "unknown_object"
     
-    async def process_frame(self, image_data: str) -> Dict[str, Any]:
-        """Process a frame from the camera"""
+    async def process_frame(self, image_data: Union[str, np.ndarray],
+                            mask_encoding: Optional[str] = None,
+                            crop_masks: Optional[bool] = None,
+                            inference_size: Optional[int] = None,
+                            upsample_masks: Optional[bool] = None) -> Dict[str, Any]:
+        """Process a frame from the camera
+
+        Runs inference inline; servers should submit process_frame_sync to
+        an InferencePool instead so the event loop stays responsive.
+        """
+        return self.process_frame_sync(image_data, mask_encoding, crop_masks, inference_size, upsample_masks)
+
+    def process_frame_sync(self, image_data: Union[str, np.ndarray],
+                           mask_encoding: Optional[str] = None,
+                           crop_masks: Optional[bool] = None,
+                           inference_size: Optional[int] = None,
+                           upsample_masks: Optional[bool] = None) -> Dict[str, Any]:
+        """Decode, detect and classify a frame (blocking)
+
+        Args:
+            image_data: Base64 (data URL) image from a JSON message, or an
+                RGB array already decoded from a binary frame
+            inference_size, upsample_masks: Per-request overrides, e.g.
+                0 and True for a full-resolution "learn term" capture
+
+        The response's frame_size and mask_size ([height, width]) tell the
+        client how far to scale masks up to the frame.
+        """
         try:
             # Process image
-            image = self.process_image(image_data)
+            if isinstance(image_data, np.ndarray):
+                image = image_data
+            else:
+                image = self.process_image(image_data)
             
             # Detect objects
-            objects = self.detect_objects(image)
+            inference_size = self.inference_size if inference_size is None else inference_size
+            upsample_masks = self.upsample_masks if upsample_masks is None else upsample_masks
+            objects = self.detect_objects(image, mask_encoding, crop_masks, inference_size, upsample_masks)
             
             # Classify each object
             for obj in objects:
                 obj["class"] = self.classify_object(image, obj["bbox"])
             
+            frame_shape = np.asarray(image).shape
+            mask_shape = frame_shape if upsample_masks else inference_shape(frame_shape, inference_size)
             return {
                 "success": True,
-                "objects": objects
+                "objects": objects,
+                "frame_size": list(frame_shape[:2]),
+                "mask_size": list(mask_shape[:2])
             }
             
         except Exception as e:
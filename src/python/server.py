@@ -1,16 +1,26 @@
 import asyncio
 import logging
-from fastapi import FastAPI, WebSocket
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from object_detection import ObjectDetector
+from frame_protocol import hello_response, receive_message
+from inference_pool import InferencePool
+from detection_session import DetectionSession
 from typing import Dict, Any
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await pool.close()
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -22,31 +32,54 @@ app.add_middleware(
 )
 
 # Initialize object detector
-detector = ObjectDetector()
+# SAM_MODEL_TYPE=vit_b and SAM_QUANTIZE=1 trade some mask quality for speed on CPU;
+# SAM_INFERENCE_SIZE downscales frames (requests can ask for full resolution)
+detector = ObjectDetector(
+    model_type=os.getenv("SAM_MODEL_TYPE", "vit_h"),
+    quantize=os.getenv("SAM_QUANTIZE") == "1",
+    inference_size=int(os.getenv("SAM_INFERENCE_SIZE", "0")) or None
+)
+
+# SAM runs on a worker thread so pings and other connections aren't blocked.
+# One worker: the mask generator keeps per-image state on its SAM predictor.
+pool = InferencePool(workers=1, max_queue=16, max_in_flight=2)
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     logger.info("WebSocket connection established")
     
+    # Detect requests of this connection; hello may switch on latest-only mode
+    session = DetectionSession(pool, id(websocket), detector.process_frame_sync, websocket.send_json)
     try:
         while True:
             # Receive message
-            message = await websocket.receive_json()
+            message = await receive_message(websocket)
             
             # Process message based on type
             if message["type"] == "detect":
                 logger.info("Processing detection request")
-                result = await detector.process_frame(message["image"])
-                await websocket.send_json(result)
+                session.submit(message)
                 
+            elif message["type"] == "hello":
+                # Client asking which frame modes we speak (JSON is always on);
+                # latest_only: drop stale frames instead of queueing them
+                session.latest_only = bool(message.get("latest_only", session.latest_only))
+                await websocket.send_json({**hello_response(), "latest_only": session.latest_only})
+            
             elif message["type"] == "ping":
                 await websocket.send_json({"type": "pong"})
                 
+    except WebSocketDisconnect:
+        logger.info("WebSocket disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         if not websocket.client_state.DISCONNECTED:
             await websocket.close()
+    finally:
+        # Drop this client's queued work; a running inference finishes unseen
+        await session.close()
+        logger.info(f"Detection session closed: {session.stats()}")
 
 if __name__ == "__main__":
     import uvicorn
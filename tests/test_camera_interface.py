@@ -0,0 +1,338 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from lingualearn import camera_interface
+from lingualearn.camera_interface import CameraConfig, CameraInterface
+from lingualearn.frame_ring import FrameRing
+from lingualearn.pipeline import DropOldestQueue, PipelineConfig
+from lingualearn.scene_gate import SceneGate
+from lingualearn.tracker import ObjectTracker
+
+
+class FakeCamera:
+    """Delivers frames at `fps`, each filled with its frame number (mod 256), or `value` if set"""
+
+    def __init__(self, shape=(24, 32, 3), fps=200):
+        self.shape = shape
+        self.interval = 1 / fps
+        self.count = 0
+        self.buffers = set()
+        self.released = False
+        self.value = None
+
+    def set(self, prop, value):
+        return True
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        time.sleep(self.interval)
+        self.count += 1
+        if image is None:
+            image = np.empty(self.shape, dtype=np.uint8)
+        else:
+            self.buffers.add(image.ctypes.data)
+        image[...] = self.count % 256 if self.value is None else self.value
+        return True, image
+
+    def release(self):
+        self.released = True
+
+
+class FakeLearner:
+    def __init__(self):
+        self.frames = []
+
+    async def identify_object(self, frame, language):
+        self.frames.append(int(frame[0, 0, 0]))
+        await asyncio.sleep(0.01)
+        return [f"{language}:{frame[0, 0, 0]}"]
+
+
+@pytest.fixture
+def camera(monkeypatch):
+    fake = FakeCamera()
+    monkeypatch.setattr(camera_interface.cv2, "VideoCapture", lambda index: fake)
+    return fake
+
+
+def test_pinned_slots_are_not_overwritten():
+    ring = FrameRing((2, 2), slots=3)
+    for value in range(2):
+        slot, buffer = ring.write_slot()
+        buffer[...] = value
+        ring.commit(slot)
+
+    with ring.latest() as held:
+        for value in range(2, 10):
+            slot, buffer = ring.write_slot()
+            assert slot != held.slot
+            buffer[...] = value
+            ring.commit(slot)
+        assert held.sequence == 2 and (held.image == 1).all()
+
+    # Once readers pin every slot, new frames go to scratch and are dropped
+    pins = [ring.latest()]
+    for _ in range(2):
+        slot, _ = ring.write_slot()
+        ring.commit(slot)
+        pins.append(ring.latest())
+    slot, _ = ring.write_slot()
+    assert slot == -1
+    ring.commit(slot)
+    assert ring.dropped == 1 and ring.sequence == 12
+
+    pins[0].release()
+    assert ring.write_slot()[0] == pins[0].slot
+
+
+@pytest.mark.asyncio
+async def test_wait_for_wakes_on_commit_from_another_thread():
+    ring = FrameRing((2, 2), slots=4)
+
+    def writer():
+        for value in range(1, 4):
+            time.sleep(0.02)
+            slot, buffer = ring.write_slot()
+            buffer[...] = value
+            ring.commit(slot)
+
+    threading.Thread(target=writer).start()
+    with await ring.wait_for(1, timeout=2) as frame:
+        assert frame.sequence >= 2 and (frame.image == frame.sequence).all()
+    with pytest.raises(asyncio.TimeoutError):
+        await ring.wait_for(100, timeout=0.1)
+
+
+@pytest.mark.asyncio
+async def test_capture_runs_off_the_event_loop(camera):
+    interface = CameraInterface(FakeLearner(), CameraConfig(ring_slots=4))
+    await interface.start()
+
+    # The loop keeps ticking while the capture thread blocks in read()
+    ticks = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < 0.2:
+        await asyncio.sleep(0.001)
+        ticks += 1
+    assert ticks > 50
+
+    first = await interface.next_frame()
+    with first:
+        later = await interface.next_frame(after=first.sequence + 5, timeout=2)
+        with later:
+            assert later.sequence > first.sequence + 5
+            assert (first.image == first.sequence % 256).all()
+
+    await interface.stop()
+    assert camera.released
+    # Every frame after the first was read into one of the ring's buffers
+    assert camera.buffers <= {buffer.ctypes.data for buffer in interface.ring.buffers}
+    assert camera.count > 20
+
+
+@pytest.mark.asyncio
+async def test_capture_object_uses_a_fresh_frame(camera):
+    learner = FakeLearner()
+    interface = CameraInterface(learner)
+    await interface.start()
+
+    before = interface.ring.sequence
+    result = await interface.capture_object("xho")
+    assert result["sequence"] > before
+    assert result["terms"] == [f"xho:{result['sequence'] % 256}"]
+    assert (result["frame"] == result["sequence"] % 256).all()
+    assert interface.get_preview_frame().shape == camera.shape
+    await interface.stop()
+
+
+@pytest.mark.asyncio
+async def test_next_frame_requires_started_camera():
+    with pytest.raises(RuntimeError):
+        await CameraInterface(FakeLearner()).next_frame()
+
+
+class PipelineLearner:
+    """Detects one box per frame, tagged with the frame's fill value"""
+
+    def __init__(self, detect_seconds=0.0):
+        self.detect_seconds = detect_seconds
+        self.shapes = []
+        self.lookups = 0
+
+    def detect_objects(self, image):
+        time.sleep(self.detect_seconds)
+        self.shapes.append(image.shape)
+        return [{"object_class": 0, "confidence": 0.9, "bbox": (2, 3, 4, 5), "image_hash": int(image[0, 0, 0])}]
+
+    async def lookup_terms(self, detections, language):
+        self.lookups += len(detections)
+        return [{**d, "terms": [f"{language}:{d['image_hash']}"]} for d in detections]
+
+
+def test_drop_oldest_queue_releases_what_it_drops():
+    dropped = []
+    queue = DropOldestQueue(2, on_drop=dropped.append)
+    for item in range(5):
+        queue.put_nowait(item)
+    assert dropped == [0, 1, 2] and queue.dropped == 3
+    assert queue.drain() == [3, 4]
+    with pytest.raises(ValueError):
+        DropOldestQueue(0)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_paces_detection_to_target_fps(camera):
+    learner = PipelineLearner()
+    interface = CameraInterface(learner)
+    await interface.start()
+    results = []
+
+    async def stop_later():
+        await asyncio.sleep(0.6)
+        assert interface.pipeline.stats()["detect"]["frames"] > 0
+        interface.stop_pipeline()
+
+    config = PipelineConfig(target_fps=10, detect_width=16, scene_threshold=None)
+    stats, _ = await asyncio.gather(interface.run_pipeline("xho", results.append, config), stop_later())
+    await interface.stop()
+
+    # The camera runs at 200 fps; detection sticks to ~10
+    assert 3 <= len(results) <= 8
+    assert stats["detect"]["frames"] == len(results)
+    assert set(stats) == {"capture", "preprocess", "detect", "lookup", "end_to_end"}
+    # Frames were halved for detection and boxes scaled back to frame pixels
+    assert learner.shapes[0] == (12, 16, 3)
+    first = results[0]
+    assert first["objects"][0]["bbox"] == (4, 6, 8, 10)
+    assert first["objects"][0]["terms"] == [f"xho:{first['sequence'] % 256}"]
+    assert [r["sequence"] for r in results] == sorted({r["sequence"] for r in results})
+    assert interface.pipeline is None
+    assert not any(interface.ring._pins)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_drops_stale_frames_behind_slow_detection(camera):
+    interface = CameraInterface(PipelineLearner(detect_seconds=0.05))
+    await interface.start()
+    results = []
+
+    async def stop_camera():
+        await asyncio.sleep(0.5)
+        await interface.stop()
+
+    config = PipelineConfig(scene_threshold=None)
+    stats, _ = await asyncio.gather(interface.run_pipeline("xho", results.append, config), stop_camera())
+
+    # Capture kept going while frames sat in detection, and the extra ones were dropped
+    assert stats["capture"]["frames"] > 2 * stats["detect"]["frames"]
+    assert stats["preprocess"]["dropped"] + stats["detect"]["dropped"] > 0
+    assert results and all(r["latency_ms"] < 500 for r in results)
+    assert not any(interface.ring._pins)
+
+
+
+class FailingLearner(PipelineLearner):
+    def detect_objects(self, image):
+        if len(self.shapes) == 3:
+            raise ValueError("detector failed")
+        return super().detect_objects(image)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stops_and_reraises_when_a_stage_fails(camera):
+    interface = CameraInterface(FailingLearner())
+    await interface.start()
+    results = []
+    pipelines = []
+
+    def callback(result):
+        pipelines.append(interface.pipeline)
+        results.append(result)
+
+    with pytest.raises(ValueError, match="detector failed"):
+        await asyncio.wait_for(
+            interface.run_pipeline("xho", callback, PipelineConfig(scene_threshold=None)), timeout=5
+        )
+    await interface.stop()
+
+    assert len(results) == 3
+    assert pipelines[0]._in_flight == 0
+    assert interface.pipeline is None
+    assert not any(interface.ring._pins)
+
+def test_scene_gate_ignores_noise_and_catches_objects_and_drift():
+    gate = SceneGate(threshold=0.01, refresh_interval=5.0)
+    rng = np.random.default_rng(0)
+    scene = rng.integers(0, 200, (240, 320, 3), dtype=np.uint8)
+    assert gate.changed(gate.thumbnail(scene), now=0)
+    gate.update(gate.thumbnail(scene), now=0)
+
+    noisy = np.clip(scene + rng.normal(0, 8, scene.shape), 0, 255).astype(np.uint8)
+    assert not gate.changed(gate.thumbnail(noisy), now=1)
+
+    # An object covering ~2% of the frame
+    with_object = scene.copy()
+    with_object[100:145, 100:145] = 255
+    assert gate.changed(gate.thumbnail(with_object), now=1)
+
+    # Each step is small, but the drift from the detected frame adds up
+    assert not gate.changed(gate.thumbnail(scene + 10), now=1)
+    assert gate.changed(gate.thumbnail(scene + 30), now=1)
+
+    # An unchanged scene is still redetected after refresh_interval
+    assert gate.changed(gate.thumbnail(scene), now=5)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_reuses_detection_for_unchanged_scene(camera):
+    camera.value = 40
+    learner = PipelineLearner()
+    interface = CameraInterface(learner)
+    await interface.start()
+    results = []
+
+    async def change_scene():
+        await asyncio.sleep(0.3)
+        camera.value = 200
+        await asyncio.sleep(0.3)
+        interface.stop_pipeline()
+
+    stats, _ = await asyncio.gather(interface.run_pipeline("xho", results.append), change_scene())
+    await interface.stop()
+
+    # One detection per scene; every other frame reused the last result
+    assert len(learner.shapes) == 2 and stats["detect"]["frames"] == 2
+    assert stats["scene_gate"]["reused"] == len(results) - 2 > 20
+    hashes = [r["objects"][0]["image_hash"] for r in results]
+    assert hashes[0] == 40 and hashes[-1] == 200
+    assert [r["reused"] for r in results if r["objects"][0]["image_hash"] == 200][0] is False
+
+
+@pytest.mark.asyncio
+async def test_pipeline_tracks_between_detections_and_looks_up_once(camera):
+    learner = PipelineLearner()
+    interface = CameraInterface(learner)
+    await interface.start()
+    results = []
+
+    async def stop_later():
+        await asyncio.sleep(0.5)
+        interface.stop_pipeline()
+
+    config = PipelineConfig(target_fps=40, scene_threshold=None, tracker=ObjectTracker(), detect_every=3)
+    stats, _ = await asyncio.gather(interface.run_pipeline("xho", results.append, config), stop_later())
+    await interface.stop()
+
+    assert len(results) >= 9
+    assert stats["tracker"]["detector_runs"] == len(learner.shapes) == -(-len(results) // 3)
+    assert [r["objects"][0]["detected"] for r in results[:6]] == [True, False, False] * 2
+    # One object, one track, one term lookup
+    assert {r["objects"][0]["track_id"] for r in results} == {1}
+    assert learner.lookups == 1 and stats["tracker"]["term_lookups"] == 1
+    first_terms = results[0]["objects"][0]["terms"]
+    assert all(r["objects"][0]["terms"] == first_terms for r in results)
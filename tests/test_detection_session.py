@@ -0,0 +1,154 @@
+import asyncio
+import importlib.util
+import sys
+import threading
+import types
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def load(directory, name):
+    spec = importlib.util.spec_from_file_location(f"{directory.replace('/', '_')}_{name}",
+                                                  ROOT / directory / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def session_module(monkeypatch):
+    monkeypatch.syspath_prepend(str(ROOT / "backend"))
+    monkeypatch.delitem(sys.modules, "inference_pool", raising=False)
+    return load("backend", "detection_session")
+
+
+class Recorder:
+    def __init__(self):
+        self.release = threading.Event()
+        self.processed = []
+        self.sent = []
+
+    def process(self, image, mask_encoding=None, crop_masks=None, inference_size=None, upsample_masks=None):
+        self.release.wait(5)
+        self.processed.append(image)
+        return {"success": True, "objects": []}
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+def make_session(module, recorder, **kwargs):
+    from inference_pool import InferencePool
+    pool = InferencePool(workers=1, max_queue=4, max_in_flight=2)
+    return pool, module.DetectionSession(pool, "client", recorder.process, recorder.send, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_latest_only_replaces_waiting_frame(session_module):
+    recorder = Recorder()
+    pool, session = make_session(session_module, recorder, latest_only=True)
+
+    for i in range(1, 6):
+        session.submit({"type": "detect", "image": f"frame{i}", "sequence": i})
+        await asyncio.sleep(0.02)
+    recorder.release.set()
+    while session.completed < 2:
+        await asyncio.sleep(0.01)
+
+    # frame1 was running; 2-4 were replaced while waiting; 5 ran next
+    assert recorder.processed == ["frame1", "frame5"]
+    dropped = [m["sequence"] for m in recorder.sent if m.get("type") == "dropped"]
+    results = [m for m in recorder.sent if "success" in m]
+    assert dropped == [2, 3, 4]
+    assert [r["sequence"] for r in results] == [1, 5]
+    assert results[-1]["dropped_frames"] == 3
+    assert session.stats() == {"received": 5, "dropped": 3, "completed": 2}
+
+    timings = results[-1]["timings"]
+    assert set(timings) == {"queued_ms", "inference_ms", "total_ms"}
+    assert timings["total_ms"] >= timings["queued_ms"] + timings["inference_ms"] - 0.1
+    await session.close()
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_default_mode_runs_every_frame_and_numbers_them(session_module):
+    recorder = Recorder()
+    recorder.release.set()
+    pool, session = make_session(session_module, recorder)
+
+    session.submit({"type": "detect", "image": "a"})
+    session.submit({"type": "detect", "image": "b"})
+    while session.completed < 2:
+        await asyncio.sleep(0.01)
+
+    assert sorted(m["sequence"] for m in recorder.sent) == [1, 2]
+    assert all(m["dropped_frames"] == 0 for m in recorder.sent)
+    await session.close()
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_waiting_frame(session_module):
+    recorder = Recorder()
+    pool, session = make_session(session_module, recorder, latest_only=True)
+
+    session.submit({"type": "detect", "image": "running"})
+    await asyncio.sleep(0.05)
+    session.submit({"type": "detect", "image": "waiting"})
+    await asyncio.sleep(0.05)
+    await session.close()
+    recorder.release.set()
+    await asyncio.sleep(0.05)
+
+    assert recorder.processed == ["running"]
+    assert not [m for m in recorder.sent if "success" in m]
+    await pool.close()
+
+
+class SlowDetector:
+    def __init__(self, *args, **kwargs):
+        self.release = threading.Event()
+
+    def process_frame_sync(self, image_data, mask_encoding=None, crop_masks=None,
+                           inference_size=None, upsample_masks=None):
+        self.release.wait(5)
+        return {"success": True, "objects": [], "image": image_data}
+
+
+@pytest.mark.parametrize("directory", ["backend", "src/python"])
+def test_server_latest_only_mode(monkeypatch, directory):
+    monkeypatch.syspath_prepend(str(ROOT / directory))
+    monkeypatch.setitem(sys.modules, "object_detection", types.SimpleNamespace(ObjectDetector=SlowDetector))
+    for name in ("frame_protocol", "inference_pool", "detection_session"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    server = load(directory, "server")
+
+    with TestClient(server.app) as client, client.websocket_connect("/ws") as ws:
+        if directory == "backend":
+            assert ws.receive_json()["type"] == "connection"
+        ws.send_json({"type": "hello", "latest_only": True})
+        assert ws.receive_json()["latest_only"] is True
+
+        for i in range(1, 5):
+            ws.send_json({"type": "detect", "image": f"frame{i}", "sequence": i})
+        ws.send_json({"type": "ping"})
+        assert [ws.receive_json() for _ in range(3)] == [
+            {"type": "dropped", "sequence": 2},
+            {"type": "dropped", "sequence": 3},
+            {"type": "pong"}
+        ]
+
+        server.detector.release.set()
+        results = [ws.receive_json(), ws.receive_json()]
+        assert [(r["image"], r["sequence"]) for r in results] == [("frame1", 1), ("frame4", 4)]
+        assert results[1]["dropped_frames"] == 2
+        assert "inference_ms" in results[1]["timings"]
+
+
+def test_copies_are_identical():
+    assert (ROOT / "backend/detection_session.py").read_text() == (ROOT / "src/python/detection_session.py").read_text()
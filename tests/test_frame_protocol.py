@@ -0,0 +1,105 @@
+import importlib.util
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def load(directory):
+    spec = importlib.util.spec_from_file_location(f"{directory.replace('/', '_')}_frame_protocol",
+                                                  ROOT / directory / "frame_protocol.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(params=["backend", "src/python"])
+def protocol(request):
+    return load(request.param)
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, (48, 64, 3), dtype=np.uint8)
+    image[..., 0] //= 4  # Distinct channel means, to catch RGB/BGR swaps
+    return image
+
+
+def test_raw_rgb_round_trip(protocol, image):
+    header = protocol.FrameHeader(protocol.FORMAT_RGB, sequence=7, width=64, height=48,
+                                  mask_encoding="bitpack", crop_masks=True)
+    decoded_header, decoded = protocol.decode_frame(protocol.encode_frame(header, image.tobytes()))
+
+    assert decoded_header == header
+    assert np.array_equal(decoded, image)
+
+
+def test_full_resolution_flag(protocol, image):
+    header = protocol.FrameHeader(protocol.FORMAT_RGB, width=64, height=48, full_resolution=True)
+    decoded_header, _ = protocol.decode_frame(protocol.encode_frame(header, image.tobytes()))
+    assert decoded_header.full_resolution and decoded_header.crop_masks is None
+
+
+@pytest.mark.parametrize("fmt, ext", [(0, ".jpg"), (1, ".png")])
+def test_encoded_images_decode_to_rgb(protocol, image, fmt, ext):
+    # Client sends what the browser encoded, which is RGB; OpenCV writes BGR
+    ok, encoded = cv2.imencode(ext, cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
+    header, decoded = protocol.decode_frame(protocol.encode_frame(protocol.FrameHeader(fmt), encoded.tobytes()))
+
+    assert header.mask_encoding is None and header.crop_masks is None
+    assert decoded.shape == image.shape
+    if ext == ".png":
+        assert np.array_equal(decoded, image)
+    else:
+        # Lossy, but channel order must survive: compare per-channel means
+        np.testing.assert_allclose(decoded.mean(axis=(0, 1)), image.mean(axis=(0, 1)), atol=10)
+
+
+def test_malformed_frames_raise(protocol, image):
+    good = protocol.encode_frame(protocol.FrameHeader(protocol.FORMAT_RGB, width=64, height=48), image.tobytes())
+    for bad in [b"LLFR", b"XXXX" + good[4:], good[:-1], good[:5] + b"\x09" + good[6:],
+                protocol.encode_frame(protocol.FrameHeader(protocol.FORMAT_PNG), b"not a png")]:
+        with pytest.raises(ValueError):
+            protocol.decode_frame(bad)
+
+
+def test_receive_message_handles_both_modes(protocol, image):
+    app = FastAPI()
+
+    @app.websocket("/ws")
+    async def echo(websocket: WebSocket):
+        await websocket.accept()
+        try:
+            while True:
+                message = await protocol.receive_message(websocket)
+                if message["type"] == "hello":
+                    await websocket.send_json(protocol.hello_response())
+                elif message["type"] == "detect":
+                    await websocket.send_json({
+                        "shape": list(np.shape(message["image"])),
+                        "sequence": message.get("sequence"),
+                        "mask_encoding": message.get("mask_encoding")
+                    })
+        except WebSocketDisconnect:
+            pass
+
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_json({"type": "hello"})
+        assert ws.receive_json()["binary"] is True
+
+        ws.send_json({"type": "detect", "image": "data:image/jpeg;base64,"})
+        assert ws.receive_json()["sequence"] is None
+
+        header = protocol.FrameHeader(protocol.FORMAT_RGB, sequence=3, width=64, height=48, mask_encoding="rle")
+        ws.send_bytes(protocol.encode_frame(header, image.tobytes()))
+        assert ws.receive_json() == {"shape": [48, 64, 3], "sequence": 3, "mask_encoding": "rle"}
+
+
+def test_copies_are_identical():
+    assert (ROOT / "backend/frame_protocol.py").read_text() == (ROOT / "src/python/frame_protocol.py").read_text()
@@ -0,0 +1,75 @@
+import random
+import pytest
+from lingualearn.hamming_index import (
+    HammingIndex,
+    hamming_distance,
+    to_signed64,
+    to_unsigned64,
+)
+
+
+def _flip(value, bits):
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+@pytest.fixture
+def hashes():
+    rng = random.Random(7)
+    return {i: rng.getrandbits(64) for i in range(2000)}
+
+
+def test_signed_round_trip():
+    for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+        signed = to_signed64(value)
+        assert -(1 << 63) <= signed < 1 << 63
+        assert to_unsigned64(signed) == value
+
+
+def test_query_matches_brute_force(hashes):
+    index = HammingIndex()
+    for key, value in hashes.items():
+        index.add(key, value)
+
+    rng = random.Random(11)
+    for _ in range(50):
+        base = hashes[rng.randrange(len(hashes))]
+        query = _flip(base, rng.sample(range(64), rng.randrange(12)))
+        for radius in (0, 3, 10):
+            expected = sorted(
+                (hamming_distance(query, value), key)
+                for key, value in hashes.items()
+                if hamming_distance(query, value) <= radius
+            )
+            assert sorted(index.query(query, radius)) == expected
+
+
+def test_results_sorted_by_distance():
+    index = HammingIndex()
+    base = 0xDEADBEEFCAFEF00D
+    index.add("far", _flip(base, range(9)))
+    index.add("near", _flip(base, [3]))
+    index.add("exact", base)
+
+    assert [key for _, key in index.query(base, 10)] == ["exact", "near", "far"]
+
+
+def test_add_replaces_and_remove(hashes):
+    index = HammingIndex()
+    index.add("a", 0)
+    index.add("a", (1 << 64) - 1)
+    assert len(index) == 1
+    assert index.query(0, 5) == []
+
+    index.remove("a")
+    index.remove("missing")
+    assert "a" not in index
+    assert index.query((1 << 64) - 1, 0) == []
+
+
+def test_wide_radius_falls_back_to_scan():
+    index = HammingIndex()
+    index.add("a", 0)
+    index.add("b", (1 << 64) - 1)
+    assert len(index.query(0, 64)) == 2
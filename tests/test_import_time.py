@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Cumulative `python -X importtime` budgets for `import lingualearn` and
+# for the API bridge (mostly fastapi)
+IMPORT_BUDGET_US = 500_000
+BRIDGE_IMPORT_BUDGET_US = 1_500_000
+
+HEAVY_MODULES = {"torch", "cv2", "segment_anything", "whisper", "sounddevice", "spacy", "scipy"}
+
+
+def run(code, cwd=SRC):
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd,
+                          env={**os.environ, "PYTHONPATH": str(SRC)},
+                          capture_output=True, text=True, check=True)
+
+
+def cumulative_us(importtime_output, module):
+    for line in importtime_output.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f"{module} not in importtime output")
+
+
+def test_import_lingualearn_within_budget():
+    result = run("import lingualearn")
+    assert cumulative_us(result.stderr, "lingualearn") < IMPORT_BUDGET_US
+
+
+def test_import_api_bridge_within_budget():
+    result = run("import lingualearn.api.bridge")
+    assert cumulative_us(result.stderr, "lingualearn.api.bridge") < BRIDGE_IMPORT_BUDGET_US
+
+
+def test_api_import_defers_heavy_modules():
+    result = run("import sys, lingualearn.api.bridge\nprint('\\n'.join(sys.modules))")
+    loaded = {name.split(".")[0] for name in result.stdout.split()}
+    assert not loaded & HEAVY_MODULES
+
+
+def test_deferred_modules_import_cleanly_on_first_use(tmp_path):
+    # A fresh interpreter, so nothing has imported torch ahead of the deferral
+    result = run(
+        "from lingualearn.api.bridge import LinguaLearnAPI\n"
+        "api = LinguaLearnAPI()\n"
+        "print(api.sam.device, api.sam.model_type)\n"
+        "api.kb.close()",
+        cwd=tmp_path
+    )
+    device, model_type = result.stdout.split()
+    assert device in {"cpu", "cuda"} and model_type == "vit_h"
+
+
+def test_missing_optional_module_fails_on_use():
+    from lingualearn.lazy_import import lazy_import
+    module = lazy_import("lingualearn_missing_dependency")
+    with pytest.raises(ImportError, match="not installed"):
+        module.load_model
@@ -0,0 +1,137 @@
+import asyncio
+import importlib.util
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def load(directory, name):
+    spec = importlib.util.spec_from_file_location(f"{directory.replace('/', '_')}_{name}",
+                                                  ROOT / directory / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def pool_module():
+    return load("backend", "inference_pool")
+
+
+@pytest.mark.asyncio
+async def test_blocking_jobs_leave_event_loop_free(pool_module):
+    pool = pool_module.InferencePool(workers=1)
+    job = asyncio.create_task(pool.submit("a", time.sleep, 0.2))
+
+    # The loop keeps ticking while the worker thread sleeps
+    start = time.perf_counter()
+    ticks = 0
+    while not job.done():
+        await asyncio.sleep(0.01)
+        ticks += 1
+    assert ticks >= 10
+    assert time.perf_counter() - start >= 0.2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_per_client_limit_and_queue_bound(pool_module):
+    pool = pool_module.InferencePool(workers=1, max_queue=3, max_in_flight=2)
+    release = threading.Event()
+
+    first = [asyncio.create_task(pool.submit("a", release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    with pytest.raises(pool_module.PoolBusy):
+        await pool.submit("a", release.wait)
+
+    # One of a's jobs is running, the other queued: room for two more
+    queued = [asyncio.create_task(pool.submit(client, release.wait)) for client in ("b", "c")]
+    await asyncio.sleep(0.05)
+    with pytest.raises(pool_module.PoolBusy):
+        await pool.submit("d", release.wait)
+
+    release.set()
+    assert await asyncio.gather(*first, *queued) == [True] * 4
+    assert pool.stats.rejected == 2
+    assert pool.stats.completed == 4
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_cancel_client_skips_queued_jobs(pool_module):
+    pool = pool_module.InferencePool(workers=1, max_in_flight=4)
+    release = threading.Event()
+    ran = []
+
+    def job(name):
+        release.wait()
+        ran.append(name)
+        return name
+
+    running = asyncio.create_task(pool.submit("a", job, "running"))
+    queued = [asyncio.create_task(pool.submit("a", job, f"queued{i}")) for i in range(2)]
+    other = asyncio.create_task(pool.submit("b", job, "other"))
+    await asyncio.sleep(0.05)
+
+    assert pool.cancel_client("a") == 3
+    release.set()
+    assert await other == "other"
+    for task in [running, *queued]:
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    # The running job finished on its thread; the queued ones never ran
+    assert sorted(ran) == ["other", "running"]
+    assert pool.stats.cancelled == 3
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_exceptions_propagate(pool_module):
+    pool = pool_module.InferencePool()
+    with pytest.raises(ZeroDivisionError):
+        await pool.submit("a", lambda: 1 / 0)
+    assert pool.stats.failed == 1
+    await pool.close()
+
+
+class SlowDetector:
+    def __init__(self, *args, **kwargs):
+        self.release = threading.Event()
+
+    def process_frame_sync(self, image_data, mask_encoding=None, crop_masks=None,
+                           inference_size=None, upsample_masks=None):
+        self.release.wait(5)
+        return {"success": True, "objects": [], "image": image_data}
+
+
+@pytest.mark.parametrize("directory", ["backend", "src/python"])
+def test_server_answers_pings_during_detection(monkeypatch, directory):
+    monkeypatch.syspath_prepend(str(ROOT / directory))
+    monkeypatch.setitem(sys.modules, "object_detection", types.SimpleNamespace(ObjectDetector=SlowDetector))
+    for name in ("frame_protocol", "inference_pool", "detection_session"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    server = load(directory, "server")
+
+    with TestClient(server.app) as client, client.websocket_connect("/ws") as ws:
+        if directory == "backend":
+            assert ws.receive_json()["type"] == "connection"
+        ws.send_json({"type": "detect", "image": "a"})
+        ws.send_json({"type": "detect", "image": "b"})
+        ws.send_json({"type": "detect", "image": "c"})
+        ws.send_json({"type": "ping"})
+
+        # Third detect exceeds the in-flight limit; the ping isn't stuck behind SAM
+        assert ws.receive_json()["busy"] is True
+        assert ws.receive_json() == {"type": "pong"}
+
+        server.detector.release.set()
+        results = [ws.receive_json(), ws.receive_json()]
+        assert sorted(r["image"] for r in results) == ["a", "b"]
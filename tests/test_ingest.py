@@ -0,0 +1,138 @@
+import sqlite3
+
+import cv2
+import numpy as np
+import pytest
+from lingualearn import object_learning
+from lingualearn.ingest import IngestCheckpoint, decode_unit, ingest, main, plan_units
+from lingualearn.model_registry import ModelRegistry
+from lingualearn.object_learning import ObjectLearner, ObjectTerm
+
+
+class CentreDetector:
+    """Stand-in YOLO: one box over the middle half of every frame"""
+
+    def setInputParams(self, **kwargs):
+        pass
+
+    def detect(self, frame):
+        height, width = frame.shape[:2]
+        box = [width // 4, height // 4, width // 2, height // 2]
+        return np.array([[7]]), np.array([[0.9]], dtype=np.float32), np.array([box])
+
+
+@pytest.fixture(autouse=True)
+def fake_yolo(monkeypatch):
+    monkeypatch.setattr(object_learning.cv2, "dnn_DetectionModel", lambda *args: CentreDetector())
+    monkeypatch.setattr(object_learning, "models", ModelRegistry())
+
+
+def scene(seed, size=(120, 160)):
+    """A distinct random-blocks image per seed"""
+    rng = np.random.default_rng(seed)
+    return cv2.resize(rng.integers(0, 255, (6, 8, 3), dtype=np.uint8), size[::-1],
+                      interpolation=cv2.INTER_NEAREST)
+
+
+@pytest.fixture
+def photos(tmp_path):
+    directory = tmp_path / "photos"
+    (directory / "day2").mkdir(parents=True)
+    for i in range(5):
+        cv2.imwrite(str(directory / f"img{i}.png"), scene(i))
+    # The same object again, and a file that isn't an image
+    cv2.imwrite(str(directory / "day2" / "again.png"), scene(0))
+    (directory / "notes.txt").write_text("not an image")
+    return directory
+
+
+def candidates(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT object_class, language, source, frame_index, timestamp_s, bbox, crop FROM object_candidates"
+        ).fetchall()
+
+
+@pytest.mark.asyncio
+async def test_images_are_deduped_and_bulk_written(tmp_path, photos):
+    learner = ObjectLearner(str(tmp_path / "terms.db"))
+    # One of the objects already has a term
+    await learner._store_term(ObjectTerm("cup", "indebe", "xho", None, None, None,
+                                         learner._compute_image_hash(scene(3)[30:90, 40:120])))
+
+    stats = await ingest(learner, [str(photos)], "xho", images_per_unit=4)
+
+    assert stats.frames == 6 and stats.objects == 6 and stats.units == 2
+    assert (stats.candidates, stats.duplicates, stats.known) == (4, 1, 1)
+    rows = candidates(learner.db_path)
+    assert len(rows) == 4
+    object_class, language, source, frame_index, _, bbox, crop = rows[0]
+    assert (object_class, language, frame_index, bbox) == ("7", "xho", 0, "40,30,80,60")
+    assert source.endswith(".png") and cv2.imdecode(np.frombuffer(crop, np.uint8), cv2.IMREAD_COLOR).shape == (60, 80, 3)
+
+    # A later run dedupes against what's stored
+    again = await ingest(learner, [str(photos / "img1.png")], "xho", crops=False)
+    assert again.duplicates == 1 and again.candidates == 0
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_resumes_after_interruption(tmp_path, photos):
+    learner = ObjectLearner(str(tmp_path / "terms.db"))
+    checkpoint_path = str(tmp_path / "progress.jsonl")
+
+    def interrupt(unit, stats):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        await ingest(learner, [str(photos)], "xho", images_per_unit=2,
+                     checkpoint=IngestCheckpoint(checkpoint_path), on_unit=interrupt)
+    with open(checkpoint_path, "a") as f:
+        f.write('{"keys": ["trunc')  # a line cut short by the crash
+
+    checkpoint = IngestCheckpoint(checkpoint_path)
+    assert len(checkpoint.done) == 2 and checkpoint.totals.frames == 2
+    stats = await ingest(learner, [str(photos)], "xho", images_per_unit=2, checkpoint=checkpoint)
+
+    assert stats.units == 2 and stats.frames == 4
+    assert checkpoint.totals.frames == 6 and checkpoint.totals.candidates == len(candidates(learner.db_path)) == 5
+    assert plan_units([str(photos)], done=checkpoint.done) == []
+
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_cancels_pending_decodes(tmp_path, photos):
+    learner = ObjectLearner(str(tmp_path / "terms.db"))
+    checkpoint = IngestCheckpoint(str(tmp_path / "progress.jsonl"))
+
+    def interrupt(unit, stats):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        await ingest(learner, [str(photos)], "xho", workers=1, images_per_unit=1,
+                     checkpoint=checkpoint, on_unit=interrupt)
+    assert len(checkpoint.done) == 1
+
+def test_video_is_segmented_and_sampled(tmp_path):
+    path = str(tmp_path / "field.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (160, 120))
+    for i in range(25):
+        writer.write(scene(i // 10))  # a new scene every second
+    writer.release()
+
+    units = plan_units([path], segment_frames=10)
+    assert [(u.start, u.stop) for u in units] == [(0, 10), (10, 20), (20, 25)]
+    frames = [f for unit in units for f in decode_unit(unit, width=80, sample_fps=2)]
+    assert [f.frame_index for f in frames] == [0, 5, 10, 15, 20]
+    assert frames[1].timestamp_s == pytest.approx(0.5) and frames[0].image.shape == (60, 80, 3)
+
+
+def test_cli_decodes_on_worker_processes(tmp_path, photos, capsys):
+    db_path = str(tmp_path / "terms.db")
+    stats = main([str(photos), "--language", "zul", "--db", db_path, "--workers", "2"])
+    assert stats.candidates == 5
+    output = capsys.readouterr().out
+    assert "frames/s" in output and "objects/s" in output
+
+    # Everything is checkpointed, so a rerun has nothing to do
+    assert main([str(photos), "--language", "zul", "--db", db_path, "--workers", "2"]).frames == 0
+    assert "Resuming" in capsys.readouterr().out
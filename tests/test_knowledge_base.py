@@ -0,0 +1,296 @@
+import pytest
+import asyncio
+import sqlite3
+import time
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+from lingualearn.knowledge_base import (
+    KnowledgeBase,
+    TranslationEntry,
+    SCHEMA_MIGRATIONS,
+    SELECT_RULES_SQL,
+    SELECT_TRANSLATION_SQL,
+)
+
+
+@pytest.fixture
+def knowledge_base(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "translations.db"), pool_size=2)
+    yield kb
+    kb.close()
+
+
+@pytest.fixture
+def entry():
+    return TranslationEntry(
+        source_text="book",
+        target_text="incwadi",
+        source_lang="en",
+        target_lang="xho",
+        confidence_score=0.6,
+    )
+
+
+@pytest.mark.asyncio
+async def test_add_and_get_translation(knowledge_base, entry):
+    assert await knowledge_base.add_translation(entry) is True
+
+    result = await knowledge_base.get_translation("book", "en", "xho")
+    assert result is not None
+    assert result.target_text == "incwadi"
+    assert result.confidence_score == 0.6
+
+
+@pytest.mark.asyncio
+async def test_missing_translation(knowledge_base):
+    assert await knowledge_base.get_translation("tree", "en", "xho") is None
+
+
+@pytest.mark.asyncio
+async def test_update_confidence_visible_to_readers(knowledge_base, entry):
+    await knowledge_base.add_translation(entry)
+    # Warm every pooled reader before the write so none of them is fresh
+    for _ in range(4):
+        await knowledge_base.get_translation("book", "en", "xho")
+
+    await knowledge_base.update_confidence("book", "incwadi", "en", "xho", success=True)
+
+    for _ in range(4):
+        result = await knowledge_base.get_translation("book", "en", "xho")
+        assert result.confidence_score == 0.7
+        assert result.usage_count == 1
+
+
+@pytest.mark.asyncio
+async def test_contextual_rules(knowledge_base):
+    await knowledge_base.learn_contextual_rule("en", "xho", "grammar", {"source_pattern": "NOUN VERB"})
+
+    # New rules start at zero confidence
+    assert await knowledge_base.get_contextual_rules("en", "xho") == []
+    rules = await knowledge_base.get_contextual_rules("en", "xho", min_confidence=0.0)
+    assert rules == [{"type": "grammar", "content": {"source_pattern": "NOUN VERB"}, "confidence": 0.0}]
+
+
+def test_database_uses_wal(knowledge_base):
+    with knowledge_base._engine.read_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+@pytest.mark.asyncio
+async def test_in_memory_database(entry):
+    with KnowledgeBase(":memory:") as kb:
+        await kb.add_translation(entry)
+        result = await kb.get_translation("book", "en", "xho")
+        assert result.target_text == "incwadi"
+
+
+def test_context_manager_closes_connections(tmp_path):
+    with KnowledgeBase(str(tmp_path / "translations.db")) as kb:
+        writer = kb._engine._writer
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        writer.execute("SELECT 1")
+    # Closing twice is harmless
+    kb.close()
+
+
+@pytest.mark.asyncio
+async def test_async_context_manager(tmp_path, entry):
+    async with KnowledgeBase(str(tmp_path / "translations.db")) as kb:
+        await kb.add_translation(entry)
+    with pytest.raises(RuntimeError):
+        await kb.get_translation("book", "en", "xho")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_and_reads(knowledge_base):
+    entries = [
+        TranslationEntry(source_text=f"word{i}", target_text=f"igama{i}", source_lang="en", target_lang="xho")
+        for i in range(200)
+    ]
+    results = await asyncio.gather(*(knowledge_base.add_translation(e) for e in entries))
+    assert all(results)
+
+    found = await asyncio.gather(*(knowledge_base.get_translation(e.source_text, "en", "xho") for e in entries))
+    assert [f.target_text for f in found] == [e.target_text for e in entries]
+
+
+@pytest.mark.slow
+def test_websocket_ping_latency_during_bulk_writes(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "translations.db"))
+    app = FastAPI()
+    batch_size = 3000
+
+    @app.websocket("/ws")
+    async def websocket_endpoint(websocket: WebSocket):
+        await websocket.accept()
+        batch = None
+        while True:
+            message = await websocket.receive_json()
+            if message["type"] == "import":
+                batch = asyncio.ensure_future(asyncio.gather(*(
+                    kb.add_translation(TranslationEntry(
+                        source_text=f"word{i}", target_text=f"igama{i}", source_lang="en", target_lang="xho"
+                    ))
+                    for i in range(batch_size)
+                )))
+                await websocket.send_json({"type": "started"})
+            elif message["type"] == "ping":
+                await websocket.send_json({"type": "pong", "importing": not batch.done()})
+            elif message["type"] == "close":
+                await batch
+                break
+
+    latencies = []
+    with TestClient(app) as client, client.websocket_connect("/ws") as websocket:
+        websocket.send_json({"type": "import"})
+        assert websocket.receive_json()["type"] == "started"
+        while True:
+            start = time.perf_counter()
+            websocket.send_json({"type": "ping"})
+            response = websocket.receive_json()
+            if not response["importing"]:
+                break
+            latencies.append(time.perf_counter() - start)
+        websocket.send_json({"type": "close"})
+
+    kb.close()
+    assert len(latencies) >= 10
+    latencies.sort()
+    # The writes never run on the loop, so pings are served between them
+    assert latencies[len(latencies) // 2] < 0.005
+
+
+@pytest.mark.asyncio
+async def test_add_translations_bulk(knowledge_base):
+    entries = [
+        TranslationEntry(source_text=f"word{i}", target_text=f"igama{i}", source_lang="en", target_lang="xho")
+        for i in range(500)
+    ]
+    assert await knowledge_base.add_translations_bulk(entries) == 500
+    assert await knowledge_base.add_translations_bulk([]) == 0
+
+    result = await knowledge_base.get_translation("word499", "en", "xho")
+    assert result.target_text == "igama499"
+
+
+@pytest.mark.asyncio
+async def test_add_translations_bulk_is_atomic(knowledge_base, entry):
+    bad = TranslationEntry(source_text=None, target_text="x", source_lang="en", target_lang="xho")
+    assert await knowledge_base.add_translations_bulk([entry, bad]) == 0
+    assert await knowledge_base.get_translation("book", "en", "xho") is None
+
+
+@pytest.mark.asyncio
+async def test_learn_contextual_rules_bulk(knowledge_base):
+    written = await knowledge_base.learn_contextual_rules_bulk([
+        ("en", "xho", "grammar", {"source_pattern": "NOUN VERB"}),
+        ("en", "xho", "idiom", {"source_idiom": "break a leg"}),
+    ])
+    assert written == 2
+    rules = await knowledge_base.get_contextual_rules("en", "xho", min_confidence=0.0)
+    assert {r["type"] for r in rules} == {"grammar", "idiom"}
+
+
+@pytest.mark.asyncio
+async def test_write_behind_groups_commits(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "translations.db"), write_behind_ms=20)
+    commits = 0
+    write = kb._engine.write
+
+    async def counting_write(fn, *args):
+        nonlocal commits
+        commits += 1
+        return await write(fn, *args)
+
+    kb._engine.write = counting_write
+    entries = [
+        TranslationEntry(source_text=f"word{i}", target_text=f"igama{i}", source_lang="en", target_lang="xho")
+        for i in range(100)
+    ]
+    results = await asyncio.gather(*(kb.add_translation(e) for e in entries))
+    await kb.update_confidence("word0", "igama0", "en", "xho", success=True)
+
+    assert all(results)
+    assert commits == 2
+    result = await kb.get_translation("word0", "en", "xho")
+    assert result.confidence_score == 0.1
+    kb.close()
+
+
+@pytest.mark.asyncio
+async def test_write_behind_isolates_failing_write(tmp_path, entry):
+    kb = KnowledgeBase(str(tmp_path / "translations.db"), write_behind_ms=20)
+    bad = TranslationEntry(source_text=None, target_text="x", source_lang="en", target_lang="xho")
+
+    results = await asyncio.gather(kb.add_translation(entry), kb.add_translation(bad))
+
+    assert results == [True, False]
+    assert (await kb.get_translation("book", "en", "xho")).target_text == "incwadi"
+    kb.close()
+
+
+
+@pytest.mark.asyncio
+async def test_close_commits_queued_write_behind_writes(tmp_path):
+    db_path = str(tmp_path / "translations.db")
+    kb = KnowledgeBase(db_path, write_behind_ms=10000)
+    writes = [
+        asyncio.ensure_future(kb.add_translation(TranslationEntry(
+            source_text=f"word{i}", target_text=f"igama{i}", source_lang="en", target_lang="xho"
+        )))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    # One batch already handed to its commit task, one still waiting on the timer
+    kb._write_behind._start_flush()
+    writes.append(asyncio.ensure_future(kb.update_confidence("word0", "igama0", "en", "xho", success=True)))
+    await asyncio.sleep(0)
+
+    kb.close()
+    assert await asyncio.gather(*writes) == [True, True, True, None]
+
+    async with KnowledgeBase(db_path, write_behind_ms=10000) as reopened:
+        assert (await reopened.get_translation("word0", "en", "xho")).confidence_score == 0.1
+        pending = asyncio.ensure_future(reopened.add_translation(TranslationEntry(
+            source_text="book", target_text="incwadi", source_lang="en", target_lang="xho"
+        )))
+        await asyncio.sleep(0)
+    assert await pending
+    with KnowledgeBase(db_path) as kb:
+        assert (await kb.get_translation("book", "en", "xho")).target_text == "incwadi"
+
+def _query_plan(kb, sql, params):
+    with kb._engine.read_connection() as conn:
+        return " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def test_translation_lookup_uses_covering_index(knowledge_base):
+    plan = _query_plan(knowledge_base, SELECT_TRANSLATION_SQL, ("book", "en", "xho"))
+    assert "USING COVERING INDEX idx_translations_lookup" in plan
+    # The index order already satisfies ORDER BY confidence_score DESC
+    assert "TEMP B-TREE" not in plan
+
+
+def test_rules_lookup_uses_covering_index(knowledge_base):
+    plan = _query_plan(knowledge_base, SELECT_RULES_SQL, ("en", "xho", 0.5))
+    assert "USING COVERING INDEX idx_rules_lookup" in plan
+
+
+def test_schema_migrates_unversioned_database(tmp_path, entry):
+    db_path = str(tmp_path / "translations.db")
+    with sqlite3.connect(db_path) as conn:
+        for statement in SCHEMA_MIGRATIONS[0]:
+            conn.execute(statement)
+    conn.close()
+
+    with KnowledgeBase(db_path) as kb:
+        with kb._engine.read_connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == len(SCHEMA_MIGRATIONS)
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_translations_lookup", "idx_rules_lookup"} <= indexes
+
+    # Reopening an up-to-date database is a no-op
+    with KnowledgeBase(db_path) as kb:
+        with kb._engine.read_connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == len(SCHEMA_MIGRATIONS)
@@ -0,0 +1,41 @@
+import pytest
+from lingualearn.knowledge_base import KnowledgeBase
+from lingualearn.learning_engine import LearningEngine, TranslationPattern
+
+
+@pytest.fixture
+def knowledge_base(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "translations.db"))
+    yield kb
+    kb.close()
+
+
+@pytest.mark.asyncio
+async def test_process_translation_records_entry(knowledge_base):
+    engine = LearningEngine(knowledge_base)
+    await engine.process_translation("book", "incwadi", "en", "xho", feedback_score=0.8)
+
+    result = await knowledge_base.get_translation("book", "en", "xho")
+    assert result.target_text == "incwadi"
+    assert result.confidence_score == 0.8
+
+
+@pytest.mark.asyncio
+async def test_patterns_stored_in_one_batch(knowledge_base, monkeypatch):
+    engine = LearningEngine(knowledge_base)
+    grammar = TranslationPattern("grammar", "NOUN VERB", "VERB NOUN", [("a", "b")])
+    idiom = TranslationPattern("idiom", "break a leg", "qhubeka kakuhle", [])
+    monkeypatch.setattr(engine, "_extract_grammar_patterns", lambda *args: [grammar, grammar])
+    monkeypatch.setattr(engine, "_extract_idioms", lambda *args: [idiom])
+
+    batches = []
+
+    async def record_bulk(rules):
+        batches.append(list(rules))
+        return len(batches[-1])
+
+    monkeypatch.setattr(knowledge_base, "learn_contextual_rules_bulk", record_bulk)
+    await engine.process_translation("good luck", "ithamsanqa", "en", "xho")
+
+    assert len(batches) == 1
+    assert [rule[2] for rule in batches[0]] == ["grammar", "grammar", "idiom"]
@@ -0,0 +1,69 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def load(directory):
+    spec = importlib.util.spec_from_file_location(f"{directory.replace('/', '_')}_mask_encoding",
+                                                  ROOT / directory / "mask_encoding.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(params=["backend", "src/python"])
+def encoding(request):
+    return load(request.param)
+
+
+@pytest.fixture
+def masks():
+    rng = np.random.default_rng(0)
+    ys, xs = np.mgrid[:72, :128]
+    blob = (xs - 60) ** 2 / 900 + (ys - 30) ** 2 / 300 <= 1
+    noisy = rng.random((72, 128)) < 0.3
+    edge = np.zeros((72, 128), dtype=bool)
+    edge[0, :] = edge[:, -1] = True
+    return [blob, noisy, edge, np.zeros((72, 128), dtype=bool), np.ones((72, 128), dtype=bool)]
+
+
+def test_rle_matches_coco_layout(encoding):
+    mask = np.array([[0, 1, 1],
+                     [0, 1, 0]], dtype=bool)
+    # Column-major: 0 0 | 1 1 | 1 0
+    assert encoding.encode_rle(mask) == {"size": [2, 3], "counts": [2, 3, 1]}
+    assert encoding.encode_rle(np.ones((2, 2), dtype=bool))["counts"] == [0, 4]
+
+
+@pytest.mark.parametrize("name", ["rle", "bitpack"])
+def test_round_trip(encoding, masks, name):
+    for mask in masks:
+        encoded = json.loads(json.dumps(encoding.encode_mask(mask, name)))
+        assert np.array_equal(encoding.decode_mask(encoded), mask)
+
+
+@pytest.mark.parametrize("name", ["rle", "bitpack"])
+def test_cropped_round_trip(encoding, masks, name):
+    mask = masks[0]
+    ys, xs = np.where(mask)
+    bbox = [xs.min(), ys.min(), xs.max(), ys.max()]
+    encoded = encoding.encode_mask(mask, name, bbox)
+
+    assert encoded["offset"] == [int(xs.min()), int(ys.min())]
+    assert encoded["size"] == [int(ys.max() - ys.min() + 1), int(xs.max() - xs.min() + 1)]
+    assert np.array_equal(encoding.decode_mask(encoded, mask.shape), mask)
+
+
+def test_list_encoding_and_unknown(encoding, masks):
+    assert encoding.encode_mask(masks[0], "list") == masks[0].tolist()
+    with pytest.raises(ValueError):
+        encoding.encode_mask(masks[0], "png")
+
+
+def test_copies_are_identical():
+    assert (ROOT / "backend/mask_encoding.py").read_text() == (ROOT / "src/python/mask_encoding.py").read_text()
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from lingualearn.mask_geometry import mask_geometry
+
+ndimage = pytest.importorskip("scipy.ndimage")
+
+
+def reference_perimeter(mask):
+    """The original SAMObjectDetector._calculate_perimeter"""
+    struct = ndimage.generate_binary_structure(2, 2)
+    boundary = ndimage.binary_dilation(mask, struct) & ~ndimage.binary_erosion(mask, struct)
+    return float(np.sum(boundary))
+
+
+def test_matches_reference_on_random_masks():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        height, width = rng.integers(1, 40, 2)
+        masks = rng.random((4, height, width)) < rng.random()
+        geometry = mask_geometry(masks)
+
+        for i, mask in enumerate(masks):
+            assert geometry.area[i] == mask.sum()
+            assert geometry.perimeter[i] == reference_perimeter(mask)
+            if mask.any():
+                ys, xs = np.where(mask)
+                assert tuple(geometry.bbox[i]) == (xs.min(), ys.min(), xs.max(), ys.max())
+                np.testing.assert_allclose(geometry.centroid[i], (xs.mean(), ys.mean()))
+
+
+def test_objects_touching_the_frame_edge():
+    mask = np.zeros((10, 12), dtype=bool)
+    mask[0:4, 8:12] = True
+    geometry = mask_geometry(mask)
+
+    assert tuple(geometry.bbox[0]) == (8, 0, 11, 3)
+    assert geometry.perimeter[0] == reference_perimeter(mask)
+
+
+def test_empty_masks():
+    masks = np.zeros((2, 5, 5), dtype=bool)
+    masks[1, 2, 2] = True
+    geometry = mask_geometry(masks)
+
+    assert len(geometry) == 2
+    assert geometry.area.tolist() == [0, 1]
+    assert tuple(geometry.bbox[0]) == (-1, -1, -1, -1)
+    assert np.isnan(geometry.centroid[0]).all()
+    assert geometry.perimeter.tolist() == [0.0, 9.0]
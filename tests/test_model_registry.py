@@ -0,0 +1,91 @@
+import threading
+import time
+
+import torch
+from lingualearn import sam_integration
+from lingualearn.model_registry import ModelKey, ModelRegistry
+from lingualearn.sam_integration import SAMObjectDetector
+import segment_anything
+from segment_anything.build_sam import _build_sam
+
+
+class CountingLoader:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return object()
+
+
+def test_models_load_once_per_key():
+    registry = ModelRegistry()
+    loader = CountingLoader()
+    key = ModelKey("spacy", "xx_ent_wiki_sm")
+
+    first = registry.get(key, loader)
+    assert registry.get(ModelKey("spacy", "xx_ent_wiki_sm"), loader) is first
+    assert loader.calls == 1
+
+    # A different checkpoint or device is a different model
+    registry.get(key._replace(device="cuda"), loader)
+    assert loader.calls == 2
+    assert registry.records()[0].hits == 1
+
+
+def test_concurrent_requests_share_one_load():
+    registry = ModelRegistry()
+    loader = CountingLoader(delay=0.1)
+    key = ModelKey("whisper", "base")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get(key, loader))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.calls == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_warm_up_loads_in_background():
+    registry = ModelRegistry()
+    loader = CountingLoader(delay=0.05)
+    key = ModelKey("yolo", "yolov4-tiny")
+
+    future = registry.warm_up(key, loader)
+    model = future.result(timeout=5)
+    assert registry.is_loaded(key)
+    assert registry.get(key, loader) is model
+    assert loader.calls == 1
+
+    assert registry.release(key)
+    assert not registry.is_loaded(key)
+
+
+def test_memory_usage_counts_torch_parameters():
+    registry = ModelRegistry()
+    key = ModelKey("test", "linear")
+    registry.get(key, lambda: torch.nn.Linear(10, 4))
+    assert registry.memory_usage()[key] == (10 * 4 + 4) * 4
+
+
+def test_sam_detectors_share_lazily_loaded_weights(monkeypatch):
+    loads = []
+
+    def counting_sam(checkpoint=None):
+        loads.append(checkpoint)
+        return _build_sam(encoder_embed_dim=16, encoder_depth=1, encoder_num_heads=1,
+                          encoder_global_attn_indexes=[0])
+
+    monkeypatch.setitem(segment_anything.sam_model_registry, "vit_h", counting_sam)
+    monkeypatch.setattr(sam_integration, "models", ModelRegistry())
+
+    first, second = SAMObjectDetector(), SAMObjectDetector()
+    assert loads == []
+
+    assert first.sam is second.sam
+    assert first.predictor is not second.predictor
+    assert loads == ["sam_vit_h_4b8939.pth"]
@@ -0,0 +1,111 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def load(directory, name):
+    spec = importlib.util.spec_from_file_location(f"{directory.replace('/', '_')}_{name}",
+                                                  ROOT / directory / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeMaskGenerator:
+    """Stands in for SamAutomaticMaskGenerator: segments the central quarter of
+    whatever image it is given, plus a low-confidence mask to be filtered"""
+
+    def generate(self, image):
+        self.shape = image.shape
+        height, width = self.shape[:2]
+        mask = np.zeros((height, width), dtype=bool)
+        mask[height // 4:3 * height // 4, width // 4:3 * width // 4] = True
+        weak = np.ones((height, width), dtype=bool)
+        return [
+            {"segmentation": mask, "area": int(mask.sum()), "predicted_iou": 0.9, "stability_score": 0.97},
+            {"segmentation": weak, "area": int(weak.sum()), "predicted_iou": 0.5, "stability_score": 0.96},
+        ]
+
+
+@pytest.fixture(params=["backend", "src/python"])
+def detection(request, monkeypatch):
+    monkeypatch.syspath_prepend(str(ROOT / request.param))
+    monkeypatch.delitem(sys.modules, "mask_encoding", raising=False)
+    module = load(request.param, "object_detection")
+    detector = module.ObjectDetector.__new__(module.ObjectDetector)
+    detector.mask_generator = FakeMaskGenerator()
+    detector.mask_encoding = "rle"
+    detector.crop_masks = False
+    detector.inference_size = 640
+    detector.upsample_masks = False
+    mask_encoding = sys.modules["mask_encoding"]
+    return module, detector, mask_encoding
+
+
+def frame():
+    return np.zeros((720, 1280, 3), dtype=np.uint8)
+
+
+def test_downscaled_inference_reports_frame_coordinates(detection):
+    module, detector, mask_encoding = detection
+    result = detector.process_frame_sync(frame())
+
+    assert detector.mask_generator.shape == (360, 640, 3)
+    assert result["frame_size"] == [720, 1280] and result["mask_size"] == [360, 640]
+    assert len(result["objects"]) == 1
+    obj = result["objects"][0]
+    assert obj["bbox"] == [320, 180, 959, 539]
+    assert obj["area"] == 640 * 360
+    assert mask_encoding.decode_mask(obj["mask"]).shape == (360, 640)
+
+
+def test_per_request_full_resolution(detection):
+    module, detector, mask_encoding = detection
+    result = detector.process_frame_sync(frame(), inference_size=0)
+
+    assert detector.mask_generator.shape == (720, 1280, 3)
+    assert result["mask_size"] == [720, 1280]
+    assert result["objects"][0]["bbox"] == [320, 180, 959, 539]
+
+
+def test_upsampled_masks_match_the_frame(detection):
+    module, detector, mask_encoding = detection
+    result = detector.process_frame_sync(frame(), crop_masks=True, upsample_masks=True)
+
+    assert detector.mask_generator.shape == (360, 640, 3)
+    assert result["mask_size"] == [720, 1280]
+    obj = result["objects"][0]
+    mask = mask_encoding.decode_mask(obj["mask"], frame_size=(720, 1280))
+    assert mask.sum() == obj["area"]
+    ys, xs = np.nonzero(mask)
+    assert [xs.min(), ys.min(), xs.max(), ys.max()] == obj["bbox"]
+
+
+def test_small_frames_are_not_upscaled(detection):
+    module, detector, _ = detection
+    small = np.zeros((240, 320, 3), dtype=np.uint8)
+    assert module.downscale(small, 640) is small
+    assert module.inference_shape((1080, 1920, 3), 1024) == (576, 1024)
+    assert module.bbox_to_frame([0, 0, 99, 49], (50, 100), (101, 201)) == [0, 0, 200, 100]
+
+
+def test_real_sam_mask_generator_api(detection, monkeypatch):
+    from tests.test_sam_integration import tiny_sam
+    module, _, _ = detection
+    monkeypatch.setitem(module.sam_model_registry, "vit_h", tiny_sam)
+    detector = module.ObjectDetector(inference_size=64)
+    detector.mask_generator.points_per_batch = 16
+    detector.mask_generator.point_grids = [detector.mask_generator.point_grids[0][::64]]
+
+    image = frame()
+    image[200:500, 400:900] = 255
+    result = detector.process_frame_sync(image)
+    assert result["success"], result.get("error")
+    assert result["mask_size"] == [36, 64]
+    for obj in result["objects"]:
+        assert obj["confidence"] >= module.MIN_MASK_SCORE
@@ -0,0 +1,180 @@
+import sqlite3
+import threading
+import numpy as np
+import pytest
+from lingualearn import object_learning
+from lingualearn.model_registry import ModelRegistry
+from lingualearn.object_learning import ObjectCandidate, ObjectLearner, ObjectTerm, OBJECT_SCHEMA_MIGRATIONS
+
+
+class FakeDetector:
+    def __init__(self):
+        self.classes = np.zeros(0, dtype=np.int32)
+        self.scores = np.zeros(0, dtype=np.float32)
+        self.boxes = np.zeros((0, 4), dtype=np.int32)
+        self.calls = 0
+
+    def setInputParams(self, **kwargs):
+        pass
+
+    def detect(self, frame):
+        self.calls += 1
+        return self.classes, self.scores, self.boxes
+
+
+@pytest.fixture(autouse=True)
+def fake_yolo(monkeypatch):
+    # The YOLO weights are not shipped with the repo
+    monkeypatch.setattr(object_learning.cv2, "dnn_DetectionModel", lambda *args: FakeDetector())
+    monkeypatch.setattr(object_learning, "models", ModelRegistry())
+
+
+@pytest.fixture
+def scene():
+    """Frame with three distinct objects and their (x, y, w, h) boxes"""
+    rng = np.random.default_rng(5)
+    frame = np.full((240, 320, 3), 127, dtype=np.uint8)
+    boxes = np.array([[10, 10, 80, 60], [120, 40, 60, 100], [220, 150, 90, 80]], dtype=np.int32)
+    for x, y, w, h in boxes:
+        frame[y:y + h, x:x + w] = np.kron(rng.integers(0, 255, (4, 4, 3)), np.ones((h // 4 + 1, w // 4 + 1, 1)))[:h, :w]
+    return frame, boxes
+
+
+@pytest.fixture
+def learner(tmp_path):
+    with ObjectLearner(str(tmp_path / "object_terms.db")) as learner:
+        yield learner
+
+
+def make_term(local_term, image_hash, language="xho", dialect="coastal", confidence=0.5):
+    return ObjectTerm(
+        object_name="cup",
+        local_term=local_term,
+        language=language,
+        region=None,
+        context=None,
+        dialect=dialect,
+        image_hash=image_hash,
+        confidence=confidence,
+    )
+
+
+def test_image_hash_is_64_bit_int(learner):
+    image = np.random.default_rng(0).integers(0, 255, (64, 48, 3), dtype=np.uint8)
+    value = learner._compute_image_hash(image)
+    assert isinstance(value, int)
+    assert 0 <= value < 1 << 64
+
+
+@pytest.mark.asyncio
+async def test_find_terms_within_radius(learner):
+    base = 0xF0F0F0F0F0F0F0F0
+    await learner._store_term(make_term("ikomityi", base, confidence=0.4))
+    await learner._store_term(make_term("indebe", base ^ 0b111, dialect="inland", confidence=0.9))
+    await learner._store_term(make_term("far", ~base & ((1 << 64) - 1), dialect="x"))
+    await learner._store_term(make_term("other-language", base, language="zul"))
+
+    terms = await learner._find_terms(base, "xho")
+    assert [t.local_term for t in terms] == ["indebe", "ikomityi"]
+    assert terms[1].image_hash == base
+
+
+@pytest.mark.asyncio
+async def test_index_follows_replaced_terms(learner):
+    await learner._store_term(make_term("ikomityi", 0))
+    await learner._store_term(make_term("ikomityi", (1 << 64) - 1))
+
+    assert await learner._find_terms(0, "xho") == []
+    assert len(await learner._find_terms((1 << 64) - 1, "xho")) == 1
+
+
+@pytest.mark.asyncio
+async def test_index_loaded_on_startup(tmp_path, learner):
+    await learner._store_term(make_term("ikomityi", 1 << 63))
+
+    reopened = ObjectLearner(learner.db_path)
+    terms = await reopened._find_terms((1 << 63) | 1, "xho")
+    assert [t.local_term for t in terms] == ["ikomityi"]
+
+
+@pytest.mark.asyncio
+async def test_legacy_bit_string_hashes_migrated(tmp_path):
+    db_path = str(tmp_path / "object_terms.db")
+    legacy_hash = "10" * 32
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(OBJECT_SCHEMA_MIGRATIONS[0][0])
+        conn.execute(
+            "INSERT INTO object_terms (object_name, local_term, language, image_hash) VALUES (?, ?, ?, ?)",
+            ("cup", "ikomityi", "xho", legacy_hash),
+        )
+    conn.close()
+
+    learner = ObjectLearner(db_path)
+    terms = await learner._find_terms(int(legacy_hash, 2), "xho")
+    assert [t.local_term for t in terms] == ["ikomityi"]
+
+
+@pytest.mark.asyncio
+async def test_identify_objects_returns_terms_per_box(learner, scene):
+    frame, boxes = scene
+    detector = learner.object_detector
+    detector.classes = np.array([[41], [41], [73]], dtype=np.int32)
+    detector.boxes = boxes
+
+    # Learn a term for the cup in the first box only
+    detector.scores = np.array([[0.9], [0.2], [0.1]], dtype=np.float32)
+    learned = await learner.learn_object_term(frame, make_term("indebe", 0))
+    assert learned["success"]
+
+    detector.scores = np.array([[0.7], [0.95], [0.3]], dtype=np.float32)
+    detector.calls = 0
+    results = await learner.identify_objects(frame, "xho")
+
+    assert detector.calls == 1
+    # The low-confidence box is dropped and the rest come back best first
+    assert [r["bbox"] for r in results] == [(120, 40, 60, 100), (10, 10, 80, 60)]
+    assert results[0]["terms"] == []
+    assert [t.local_term for t in results[1]["terms"]] == ["indebe"]
+    assert results[1]["image_hash"] == learned["term"].image_hash
+
+
+@pytest.mark.asyncio
+async def test_identify_objects_without_detections(learner, scene):
+    frame, _ = scene
+    assert await learner.identify_objects(frame, "xho") == []
+
+
+@pytest.mark.asyncio
+async def test_find_terms_many_shares_matches(learner):
+    await learner._store_term(make_term("ikomityi", 0))
+    results = await learner._find_terms_many([0, 1, (1 << 64) - 1], "xho")
+    assert [[t.local_term for t in terms] for terms in results] == [["ikomityi"], ["ikomityi"], []]
+    assert await learner._find_terms_many([0], "zul") == [[]]
+
+
+@pytest.mark.asyncio
+async def test_lookups_reuse_the_learner_connections(learner, monkeypatch):
+    await learner._store_term(make_term("ikomityi", 0))
+    assert await learner.add_candidates_bulk([ObjectCandidate("chair", "xho", 0, "clip.mp4")]) == 1
+
+    def no_new_connections(*args, **kwargs):
+        raise AssertionError("opened a new connection")
+
+    loop_thread = threading.get_ident()
+    threads = []
+    select_terms = learner._select_terms
+
+    def record_thread(conn, ids):
+        threads.append(threading.get_ident())
+        return select_terms(conn, ids)
+
+    monkeypatch.setattr(sqlite3, "connect", no_new_connections)
+    monkeypatch.setattr(learner, "_select_terms", record_thread)
+    results = await learner._find_terms_many([0], "xho")
+    assert [t.local_term for t in results[0]] == ["ikomityi"]
+    assert threads and loop_thread not in threads
+
+    learner.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        with learner._engine.write_connection() as conn:
+            conn.execute("SELECT 1")
@@ -0,0 +1,65 @@
+import cv2
+import numpy as np
+import pytest
+from lingualearn.hamming_index import hamming_distance
+from lingualearn.phash import box_phashes, frames_box_phashes, image_phashes, phash_patches
+
+
+def reference_phash(image):
+    small = cv2.resize(image, (32, 32), interpolation=cv2.INTER_LINEAR)
+    gray = np.float32(small) @ np.float32([0.114, 0.587, 0.299])
+    low = cv2.dct(gray)[:8, :8]
+    bits = (low > np.median(low)).flatten()
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    # Smooth structure so the hash is stable under small changes
+    base = cv2.resize(rng.integers(0, 255, (12, 16, 3), dtype=np.uint8), (320, 240))
+    return base
+
+
+@pytest.fixture
+def boxes():
+    return np.array([[0, 0, 100, 80], [50, 60, 120, 150], [200, 10, 90, 90]])
+
+
+def test_matches_reference_definition(frame):
+    crops = [frame[:80, :100], frame[60:210, 50:170], frame]
+    hashes = image_phashes(crops)
+    assert hashes.dtype == np.uint64
+    assert [int(h) for h in hashes] == [reference_phash(c) for c in crops]
+
+
+def test_box_hashes_match_crops(frame, boxes):
+    hashes = box_phashes(frame, boxes)
+    crops = [frame[y:y + h, x:x + w] for x, y, w, h in boxes]
+    assert list(hashes) == list(image_phashes(crops))
+
+
+def test_boxes_clipped_to_frame(frame):
+    hashes = box_phashes(frame, np.array([[280, 200, 100, 100], [400, 400, 10, 10]]))
+    assert int(hashes[0]) == reference_phash(frame[200:, 280:])
+    assert len(hashes) == 2
+
+
+def test_many_frames_in_one_batch(frame, boxes):
+    other = cv2.flip(frame, 1)
+    per_frame = frames_box_phashes([frame, other, frame], [boxes, boxes[:1], np.zeros((0, 4))])
+    assert [len(h) for h in per_frame] == [3, 1, 0]
+    assert list(per_frame[0]) == list(box_phashes(frame, boxes))
+    assert per_frame[1][0] == box_phashes(other, boxes[:1])[0]
+
+
+def test_empty_inputs():
+    assert phash_patches(np.zeros((0, 32, 32))).shape == (0,)
+    assert image_phashes([]).shape == (0,)
+    assert frames_box_phashes([], []) == []
+
+
+def test_similar_images_have_close_hashes(frame):
+    noisy = np.clip(frame.astype(np.int16) + np.random.default_rng(1).integers(-8, 8, frame.shape), 0, 255)
+    a, b = image_phashes([frame, noisy.astype(np.uint8)])
+    assert hamming_distance(int(a), int(b)) <= 6
@@ -0,0 +1,223 @@
+import numpy as np
+import pytest
+import torch
+import segment_anything
+from segment_anything.build_sam import _build_sam
+from lingualearn import sam_integration
+from lingualearn.model_registry import ModelRegistry
+from lingualearn.sam_integration import EmbeddingCache, ImageEmbedding, SAMObjectDetector, image_content_hash
+
+
+def tiny_sam(checkpoint=None):
+    """A real SAM with a one-block, 16-channel image encoder"""
+    torch.manual_seed(0)
+    return _build_sam(
+        encoder_embed_dim=16,
+        encoder_depth=1,
+        encoder_num_heads=1,
+        encoder_global_attn_indexes=[0],
+    )
+
+
+def make_detector(monkeypatch, **kwargs):
+    monkeypatch.setitem(segment_anything.sam_model_registry, "vit_h", tiny_sam)
+    monkeypatch.setattr(sam_integration, "models", ModelRegistry())
+    detector = SAMObjectDetector(**kwargs)
+    detector.encoder_calls = 0
+
+    def count(*_):
+        detector.encoder_calls += 1
+    detector.sam.image_encoder.register_forward_hook(count)
+    return detector
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    return make_detector(monkeypatch)
+
+
+def make_image(value):
+    image = np.full((48, 64, 3), value, dtype=np.uint8)
+    image[10:30, 20:40] = 255 - value
+    return image
+
+
+def embedding(nbytes):
+    return ImageEmbedding(torch.zeros(nbytes // 4), (1, 1), (1, 1))
+
+
+def test_content_hash_depends_on_pixels_and_shape():
+    image = make_image(1)
+    assert image_content_hash(image) == image_content_hash(image.copy())
+    assert image_content_hash(image) != image_content_hash(make_image(2))
+    assert image_content_hash(image) != image_content_hash(image.reshape(64, 48, 3))
+    # Non-contiguous views hash by content
+    assert image_content_hash(image[:, ::2]) == image_content_hash(image[:, ::2].copy())
+
+
+def test_cache_evicts_least_recently_used_by_bytes():
+    cache = EmbeddingCache(max_bytes=100)
+    cache.put("a", embedding(40))
+    cache.put("b", embedding(40))
+    cache.get("a")
+    cache.put("c", embedding(40))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.nbytes == 80
+
+    cache.put("huge", embedding(400))
+    assert len(cache) == 2
+
+
+def test_repeated_points_on_same_image_skip_encoder(detector):
+    image = make_image(3)
+    detector.set_image(image)
+    first = detector.detect_object_at_point((5, 5))
+
+    for point in [(5, 5), (30, 20), (50, 40)]:
+        detector.set_image(image.copy())
+        detector.detect_object_at_point(point)
+
+    assert detector.encoder_calls == 1
+    detector.set_image(image.copy())
+    again = detector.detect_object_at_point((5, 5))
+    assert np.array_equal(first.mask, again.mask)
+
+
+def test_switching_images_restores_cached_embedding(detector):
+    first, second = make_image(10), make_image(200)
+    detector.set_image(first)
+    detector.set_image(second)
+    detector.set_image(first)
+
+    assert detector.encoder_calls == 2
+    assert detector.embedding_cache.hits == 1
+    assert detector.predictor.original_size == (48, 64)
+
+
+def test_zero_budget_disables_cache(monkeypatch):
+    detector = make_detector(monkeypatch, cache_bytes=0)
+    first, second = make_image(10), make_image(200)
+    for image in [first, second, first]:
+        detector.set_image(image)
+
+    assert detector.encoder_calls == 3
+    assert len(detector.embedding_cache) == 0
+
+
+def test_batched_points_match_single_prompts(detector):
+    detector.set_image(make_image(3))
+    points = [(5, 5), (30, 20), (50, 40), (63, 0)]
+    detector.point_batch_size = 3
+
+    batched = detector.detect_objects_at_points(points)
+    for point, obj in zip(points, batched):
+        masks, scores, _ = detector.predictor.predict(
+            point_coords=np.array([point]),
+            point_labels=np.array([1]),
+            multimask_output=True
+        )
+        best = int(np.argmax(scores))
+        if obj is None:
+            assert not masks[best].any()
+            continue
+        assert np.array_equal(obj.mask, masks[best])
+        assert obj.confidence == pytest.approx(float(scores[best]), abs=1e-5)
+
+
+def test_points_require_an_image(detector):
+    with pytest.raises(RuntimeError):
+        detector.detect_objects_at_points([(1, 1)])
+    detector.set_image(make_image(3))
+    assert detector.detect_objects_at_points([]) == []
+
+
+def test_detect_all_objects_reuses_the_image_embedding(detector):
+    with pytest.raises(RuntimeError):
+        detector.detect_all_objects()
+
+    detector.points_per_side = 4
+    detector.set_image(make_image(3))
+    objects = detector.detect_all_objects()
+    assert detector.encoder_calls == 1
+    assert all(obj.confidence >= 0.5 for obj in objects)
+    assert [obj.confidence for obj in objects] == sorted((obj.confidence for obj in objects), reverse=True)
+
+
+def test_detect_all_objects_drops_weak_and_duplicate_masks(detector, monkeypatch):
+    square = np.zeros((48, 64), dtype=bool)
+    square[10:30, 20:48] = True  # holds the grid points (24, 18) and (40, 18)
+    shifted = np.roll(square, 1, axis=1)
+    corner = np.zeros((48, 64), dtype=bool)
+    corner[0:8, 0:8] = True
+    prompts = []
+
+    def decode(points):
+        prompts.extend(map(tuple, points))
+        masks, scores = [], []
+        for x, y in points:
+            if square[int(y), int(x)]:
+                masks.append(square if x < 30 else shifted)
+                scores.append(0.9 if x < 30 else 0.8)
+            else:
+                masks.append(corner)
+                scores.append(0.3)
+        return np.array(masks), np.array(scores, dtype=np.float32)
+
+    detector.points_per_side = 4
+    detector.point_batch_size = 3
+    detector.set_image(make_image(3))
+    monkeypatch.setattr(detector, "_decode_points", decode)
+    objects = detector.detect_all_objects()
+
+    assert len(prompts) == 16 and prompts[0] == (8.0, 6.0)
+    assert len(objects) == 1
+    assert objects[0].confidence == pytest.approx(0.9)
+    assert np.array_equal(objects[0].mask, square)
+
+
+def test_attributes_use_precomputed_geometry(detector):
+    detector.set_image(make_image(3))
+    obj = detector.detect_object_at_point((30, 20))
+    if obj is None:
+        pytest.skip("random decoder produced an empty mask")
+
+    attributes = detector.get_object_attributes(obj)
+    assert obj.perimeter is not None
+    assert attributes["perimeter"] == detector._calculate_perimeter(obj.mask)
+    assert obj.area == int(obj.mask.sum())
+
+
+def test_model_type_selects_its_checkpoint(monkeypatch):
+    loaded = []
+    monkeypatch.setitem(segment_anything.sam_model_registry, "vit_b", lambda checkpoint=None: loaded.append(checkpoint) or tiny_sam())
+    monkeypatch.setattr(sam_integration, "models", ModelRegistry())
+
+    detector = SAMObjectDetector(model_type="vit_b")
+    detector.sam
+    assert loaded == ["sam_vit_b_01ec64.pth"]
+    assert SAMObjectDetector(model_type="vit_b", checkpoint="custom.pth").checkpoint == "custom.pth"
+
+    with pytest.raises(ValueError):
+        SAMObjectDetector(model_type="vit_x")
+
+
+def test_quantized_encoder_is_a_separate_model(monkeypatch):
+    plain = make_detector(monkeypatch)
+    quantized = SAMObjectDetector(quantize=True)
+    assert quantized.model_key != plain.model_key
+
+    encoder_types = {type(m) for m in quantized.sam.image_encoder.modules()}
+    assert torch.ao.nn.quantized.dynamic.Linear in encoder_types
+    assert torch.nn.Linear not in encoder_types
+    assert torch.ao.nn.quantized.dynamic.Linear not in {type(m) for m in plain.sam.modules()}
+
+    # The int8 encoder's embedding stays close to the float one
+    image = make_image(3)
+    plain.set_image(image)
+    quantized.set_image(image)
+    error = (plain.predictor.features - quantized.predictor.features).norm() / plain.predictor.features.norm()
+    assert error < 0.1
+    obj = quantized.detect_object_at_point((30, 20))
+    assert obj is None or obj.mask.shape == (48, 64)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from lingualearn.tracker import (
+    AssociationStrategy, CentroidAssociation, IoUAssociation, ObjectTracker, OpticalFlowPropagator, box_iou
+)
+
+
+def detection(bbox, object_class=1, image_hash=0):
+    return {"object_class": object_class, "confidence": 0.9, "bbox": bbox, "image_hash": image_hash}
+
+
+def test_box_iou():
+    iou = box_iou([[0, 0, 10, 10]], [[0, 0, 10, 10], [5, 0, 10, 10], [20, 20, 5, 5], [0, 0, 0, 0]])
+    assert iou[0] == pytest.approx([1.0, 50 / 150, 0.0, 0.0])
+
+
+def test_association_strategies_must_define_scores():
+    with pytest.raises(TypeError):
+        AssociationStrategy()
+
+
+def test_ids_follow_moving_objects_and_expire():
+    tracker = ObjectTracker(IoUAssociation(min_iou=0.3), max_misses=1)
+    first = tracker.update([detection((0, 0, 20, 20)), detection((100, 100, 20, 20))])
+    assert [t.track_id for t in first] == [1, 2]
+
+    # Both move a little; a third object and a same-place object of another class appear
+    tracks = tracker.update([
+        detection((104, 102, 20, 20)), detection((3, 2, 20, 20)),
+        detection((50, 50, 10, 10)), detection((0, 0, 20, 20), object_class=2)
+    ])
+    by_id = {t.track_id: tuple(t.bbox) for t in tracks}
+    assert by_id[1] == (3, 2, 20, 20) and by_id[2] == (104, 102, 20, 20)
+    assert len(tracks) == 4 and tracker.created == 4
+
+    # Track 2 survives one missed detection, not two
+    tracker.update([detection((3, 2, 20, 20))])
+    assert 2 in tracker.tracks and 2 not in [t.track_id for t in tracker.active]
+    tracker.update([detection((3, 2, 20, 20))])
+    assert 2 not in tracker.tracks
+    assert tracker.get(1).hits == 4
+
+
+def test_centroid_association_matches_fast_small_objects():
+    fast = [detection((0, 0, 10, 10))], [detection((12, 0, 10, 10))]
+    iou_tracker = ObjectTracker(IoUAssociation())
+    centroid_tracker = ObjectTracker(CentroidAssociation(max_distance=1.0))
+    for tracker in (iou_tracker, centroid_tracker):
+        for detections in fast:
+            tracker.update(detections)
+    assert [t.track_id for t in iou_tracker.active] == [2]
+    assert [t.track_id for t in centroid_tracker.active] == [1]
+
+
+def test_optical_flow_moves_boxes_between_detections():
+    rng = np.random.default_rng(0)
+    background = np.full((120, 160), 90, dtype=np.uint8)
+    patch = np.kron(rng.integers(0, 255, (8, 8)), np.ones((4, 4))).astype(np.uint8)
+
+    def frame(x, y):
+        image = background.copy()
+        image[y:y + 32, x:x + 32] = patch
+        return image
+
+    tracker = ObjectTracker(propagator=OpticalFlowPropagator())
+    tracker.update([detection((20, 30, 32, 32))], frame(20, 30))
+    for step in range(1, 4):
+        (track,) = tracker.propagate(frame(20 + 4 * step, 30 + 2 * step))
+    assert not track.detected and track.track_id == 1
+    assert track.bbox[:2] == pytest.approx((32, 36), abs=1.0)
+
+    # Without a propagator boxes hold still
+    still = ObjectTracker()
+    still.update([detection((20, 30, 32, 32))], frame(20, 30))
+    assert tuple(still.propagate(frame(32, 36))[0].bbox[:2]) == (20, 30)
@@ -0,0 +1,165 @@
+import pytest
+from lingualearn.knowledge_base import KnowledgeBase, TranslationEntry
+from lingualearn.learning_engine import LearningEngine
+from lingualearn.translation_cache import MISSING, CacheConfig, CachedKnowledgeBase, TranslationCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cached_kb(tmp_path):
+    kb = CachedKnowledgeBase(KnowledgeBase(str(tmp_path / "translations.db")))
+    yield kb
+    kb.close()
+
+
+@pytest.fixture
+def entry():
+    return TranslationEntry(
+        source_text="book",
+        target_text="incwadi",
+        source_lang="en",
+        target_lang="xho",
+        confidence_score=0.6,
+    )
+
+
+def test_lru_eviction():
+    cache = TranslationCache(CacheConfig(max_size=2))
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.get("b") is MISSING
+    assert cache.stats.evictions == 1
+
+
+def test_ttl_and_negative_ttl():
+    clock = FakeClock()
+    cache = TranslationCache(CacheConfig(ttl=10, negative_ttl=1), clock=clock)
+    cache.put("hit", "value")
+    cache.put("miss", None)
+
+    clock.now = 2
+    assert cache.get("hit") == "value"
+    assert cache.get("miss") is MISSING  # negative entry expired
+    clock.now = 11
+    assert cache.get("hit") is MISSING
+    assert cache.stats.expirations == 2
+
+
+def test_negative_caching_can_be_disabled():
+    cache = TranslationCache(CacheConfig(negative_ttl=0))
+    cache.put("miss", None)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_repeated_lookups_hit_cache(cached_kb, entry):
+    await cached_kb.add_translation(entry)
+
+    for _ in range(5):
+        result = await cached_kb.get_translation("book", "en", "xho")
+        assert result.target_text == "incwadi"
+
+    assert cached_kb.stats.misses == 1
+    assert cached_kb.stats.hits == 4
+
+
+@pytest.mark.asyncio
+async def test_negative_result_cached_until_added(cached_kb, entry):
+    assert await cached_kb.get_translation("book", "en", "xho") is None
+    assert await cached_kb.get_translation("book", "en", "xho") is None
+    assert cached_kb.stats.hits == 1
+
+    await cached_kb.add_translation(entry)
+    result = await cached_kb.get_translation("book", "en", "xho")
+    assert result.target_text == "incwadi"
+
+
+@pytest.mark.asyncio
+async def test_update_confidence_invalidates(cached_kb, entry):
+    await cached_kb.add_translation(entry)
+    await cached_kb.get_translation("book", "en", "xho")
+    await cached_kb.update_confidence("book", "incwadi", "en", "xho", success=True)
+
+    result = await cached_kb.get_translation("book", "en", "xho")
+    assert result.confidence_score == 0.7
+    assert cached_kb.stats.invalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_per_key(cached_kb, entry):
+    await cached_kb.add_translation(entry)
+    await cached_kb.get_translation("book", "en", "xho")
+    await cached_kb.get_translation("book", "en", "zul")
+
+    await cached_kb.add_translations_bulk([
+        TranslationEntry(source_text="book", target_text="incwadi", source_lang="en", target_lang="zul")
+    ])
+
+    assert len(cached_kb.cache) == 1
+    assert (await cached_kb.get_translation("book", "en", "zul")).target_text == "incwadi"
+
+
+@pytest.mark.asyncio
+async def test_cached_entries_are_copies(cached_kb, entry):
+    await cached_kb.add_translation(entry)
+    first = await cached_kb.get_translation("book", "en", "xho")
+    first.target_text = "changed"
+
+    second = await cached_kb.get_translation("book", "en", "xho")
+    assert second.target_text == "incwadi"
+
+
+@pytest.mark.asyncio
+async def test_learning_engine_uses_cached_kb(cached_kb):
+    engine = LearningEngine(cached_kb)
+    await cached_kb.get_translation("book", "en", "xho")
+    await engine.process_translation("book", "incwadi", "en", "xho")
+
+    result = await cached_kb.get_translation("book", "en", "xho")
+    assert result.target_text == "incwadi"
+    assert cached_kb.stats_dict()["size"] == 1
+
+
+def test_api_serves_lookups_through_the_cache(tmp_path, monkeypatch):
+    from lingualearn.api import bridge
+
+    class FakeLearner:
+        def __init__(self, kb):
+            self.kb = kb
+            self.sam = None
+
+    monkeypatch.setattr(bridge, "EnhancedObjectLearner", FakeLearner)
+    monkeypatch.setattr(bridge, "VoiceInput", lambda: None)
+    monkeypatch.chdir(tmp_path)
+    api = bridge.LinguaLearnAPI()
+    try:
+        assert isinstance(api.kb, CachedKnowledgeBase)
+        assert api.object_learner.kb is api.kb
+    finally:
+        api.kb.close()
+
+
+@pytest.mark.asyncio
+async def test_saving_an_object_term_keeps_the_knowledge_base_contract(cached_kb, entry):
+    from lingualearn.enhanced_object_learning import EnhancedObjectTerm
+    await cached_kb.add_translation(entry)
+    await cached_kb.get_translation("book", "en", "xho")
+
+    term = EnhancedObjectTerm("cup", "indebe", "xho", None, None, None, 0)
+    assert await cached_kb.add_translation(term) is False
+    # Nothing was invalidated
+    assert cached_kb.stats.invalidations == 0
+    assert (await cached_kb.get_translation("book", "en", "xho")).target_text == "incwadi"
+    assert cached_kb.stats.hits == 1
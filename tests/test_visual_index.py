@@ -0,0 +1,153 @@
+import random
+
+import numpy as np
+import pytest
+from lingualearn import enhanced_object_learning
+from lingualearn.enhanced_object_learning import EnhancedObjectLearner, EnhancedObjectTerm
+from lingualearn.sam_integration import SegmentedObject
+from lingualearn.visual_index import VisualFeatureIndex
+
+
+def make_term(local_term, attrs, language="xho"):
+    return EnhancedObjectTerm(
+        object_name="cup",
+        local_term=local_term,
+        language=language,
+        region=None,
+        context=None,
+        dialect=None,
+        image_hash=0,
+        visual_attributes=attrs,
+    )
+
+
+def random_attrs(rng):
+    return {
+        "area": rng.randint(0, 5000),
+        "circularity": rng.random(),
+        "aspect_ratio": rng.uniform(0.2, 3),
+    }
+
+
+class FakeKB:
+    def __init__(self, terms=()):
+        self.terms = list(terms)
+        self.loads = 0
+
+    async def get_all_terms(self):
+        self.loads += 1
+        return list(self.terms)
+
+    async def add_translation(self, term):
+        self.terms.append(term)
+
+
+class FakeSAM:
+    def __init__(self, objects=(), attrs=()):
+        self.objects = list(objects)
+        self.attrs = list(attrs)
+
+    def set_image(self, image):
+        pass
+
+    def detect_object_at_point(self, point):
+        return self.objects[0]
+
+    def detect_all_objects(self):
+        return self.objects
+
+    def get_object_attributes(self, obj):
+        return next(a for o, a in zip(self.objects, self.attrs) if o is obj)
+
+
+def make_object(confidence=0.9):
+    return SegmentedObject(
+        mask=np.ones((2, 2), dtype=bool),
+        confidence=confidence,
+        bbox=(0, 0, 1, 1),
+        center_point=(0, 0),
+        area=4,
+    )
+
+
+@pytest.fixture
+def learner(monkeypatch):
+    def build(terms=(), objects=(), attrs=()):
+        monkeypatch.setattr(enhanced_object_learning, "SAMObjectDetector", lambda: FakeSAM(objects, attrs))
+        return EnhancedObjectLearner(FakeKB(terms))
+    return build
+
+
+def test_similarity_matches_scalar_formula():
+    rng = random.Random(0)
+    terms = [make_term(f"t{i}", random_attrs(rng)) for i in range(50)]
+    queries = [random_attrs(rng) for _ in range(5)]
+    index = VisualFeatureIndex(initial_capacity=4)
+    for term in terms:
+        index.add(term)
+
+    learner = EnhancedObjectLearner.__new__(EnhancedObjectLearner)
+    expected = [
+        [learner._calculate_visual_similarity(q, t.visual_attributes) for t in terms]
+        for q in queries
+    ]
+    actual = index.similarity(np.array([[q["area"], q["circularity"], q["aspect_ratio"]] for q in queries]))
+    np.testing.assert_allclose(actual, expected)
+
+
+def test_search_threshold_top_k_and_order():
+    rng = random.Random(1)
+    terms = [make_term(f"t{i}", random_attrs(rng)) for i in range(200)]
+    index = VisualFeatureIndex()
+    for term in terms:
+        index.add(term)
+    query = random_attrs(rng)
+
+    everything = index.search([query], threshold=0.5)[0]
+    scores = [score for score, _ in everything]
+    assert scores == sorted(scores, reverse=True)
+    assert all(score >= 0.5 for score in scores)
+
+    top = index.search([query], threshold=0.5, top_k=5)[0]
+    assert [score for score, _ in top] == scores[:5]
+
+
+def test_search_language_filter_and_skipped_terms():
+    attrs = {"area": 100, "circularity": 0.5, "aspect_ratio": 1.0}
+    index = VisualFeatureIndex()
+    assert index.add(make_term("incwadi", attrs, "xho"))
+    assert index.add(make_term("incwadi", attrs, "zul"))
+    assert not index.add(make_term("none", None))
+    assert len(index) == 2
+
+    results = index.search([attrs, None], language="zul")
+    assert [term.language for _, term in results[0]] == ["zul"]
+    assert results[1] == []
+    assert index.search([attrs], language="eng") == [[]]
+
+
+@pytest.mark.asyncio
+async def test_learner_loads_index_once_and_updates_incrementally(learner):
+    attrs = {"area": 100, "circularity": 0.5, "aspect_ratio": 1.0}
+    obj = make_object()
+    learner = learner([make_term("indebe", attrs)], [obj], [attrs])
+
+    result = await learner.learn_from_image(np.zeros((4, 4, 3)), (1, 1), make_term("ikomityi", None))
+    assert result["success"]
+    assert sorted(t.local_term for t in result["similar_terms"]) == ["ikomityi", "indebe"]
+
+    identified = await learner.identify_objects(np.zeros((4, 4, 3)), "xho")
+    assert len(identified[0]["terms"]) == 2
+    assert learner.kb.loads == 1
+    assert len(learner._feature_index) == 2
+
+
+@pytest.mark.asyncio
+async def test_identify_objects_skips_low_confidence(learner):
+    attrs = {"area": 100, "circularity": 0.5, "aspect_ratio": 1.0}
+    confident, unsure = make_object(0.9), make_object(0.1)
+    learner = learner([make_term("indebe", attrs)], [confident, unsure], [attrs, attrs])
+
+    identified = await learner.identify_objects(np.zeros((4, 4, 3)), "xho")
+    assert len(identified) == 1
+    assert identified[0]["terms"][0].local_term == "indebe"